@@ -0,0 +1,42 @@
+"""profiles and skills tables
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "profiles",
+        sa.Column("user_id", sa.String(64), primary_key=True),
+        sa.Column("name", sa.String(200)),
+        sa.Column("degree", sa.String(200)),
+        sa.Column("semester", sa.String(50)),
+        sa.Column("interests", sa.JSON(), nullable=False),
+        sa.Column("language", sa.String(10), nullable=False),
+        sa.Column("nickname", sa.String(100)),
+        sa.Column("career_paths", sa.JSON(), nullable=False),
+    )
+    op.create_table(
+        "skills",
+        sa.Column("user_id", sa.String(64), sa.ForeignKey("profiles.user_id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("name_key", sa.String(200), primary_key=True),
+        sa.Column("name", sa.String(200), nullable=False),
+        sa.Column("score", sa.Integer(), nullable=False),
+        sa.Column("evidence", sa.JSON(), nullable=False),
+        sa.Column("last_updated", sa.String(40)),
+        sa.Column("position", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_skills_name_key", "skills", ["name_key"])
+
+def downgrade():
+    op.drop_index("ix_skills_name_key", table_name="skills")
+    op.drop_table("skills")
+    op.drop_table("profiles")
@@ -0,0 +1,26 @@
+"""conversations table
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "conversations",
+        sa.Column("user_id", sa.String(64), sa.ForeignKey("profiles.user_id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("turns", sa.JSON(), nullable=False),
+        sa.Column("summary", sa.Text(), nullable=False),
+        sa.Column("summarized_turns", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.String(40)),
+    )
+
+def downgrade():
+    op.drop_table("conversations")
@@ -0,0 +1,27 @@
+"""devices table
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "devices",
+        sa.Column("user_id", sa.String(64), primary_key=True),
+        sa.Column("tier", sa.String(20), nullable=False),
+        sa.Column("ram_mb", sa.Integer(), nullable=False),
+        sa.Column("cpu_cores", sa.Integer(), nullable=False),
+        sa.Column("local_tokens_per_sec", sa.JSON(), nullable=False),
+        sa.Column("registered_at", sa.Float(), nullable=False),
+    )
+
+def downgrade():
+    op.drop_table("devices")
@@ -0,0 +1,26 @@
+"""game_stats table
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "game_stats",
+        sa.Column("user_id", sa.String(64), sa.ForeignKey("profiles.user_id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("challenges_attempted", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("challenges_correct", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("challenge_points", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("chat_sessions", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+def downgrade():
+    op.drop_table("game_stats")
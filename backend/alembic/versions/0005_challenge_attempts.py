@@ -0,0 +1,26 @@
+"""challenge_attempts table
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "challenge_attempts",
+        sa.Column("user_id", sa.String(64), sa.ForeignKey("profiles.user_id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("day", sa.String(10), primary_key=True),
+        sa.Column("challenge_id", sa.String(100), primary_key=True),
+        sa.Column("correct", sa.Boolean(), nullable=False),
+        sa.Column("answered_at", sa.String(40)),
+    )
+
+def downgrade():
+    op.drop_table("challenge_attempts")
@@ -0,0 +1,51 @@
+"""rename skills stored under the old title-cased keyword names
+
+The keyword list used to store ``kw.title()`` ("Sql", "Ai", "Ml", ...). The skills
+taxonomy stores canonical names instead, and "ai"/"ml" now fold into
+"Artificial Intelligence"/"Machine Learning". Rows already under the canonical key
+keep the higher score.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+RENAMES = {
+    "sql": "SQL",
+    "javascript": "JavaScript",
+    "gcp": "GCP",
+    "aws": "AWS",
+    "llm": "LLM",
+    "nlp": "NLP",
+    "generative ai": "Generative AI",
+    "ai": "Artificial Intelligence",
+    "ml": "Machine Learning",
+}
+
+def upgrade():
+    conn = op.get_bind()
+    for old_key, name in RENAMES.items():
+        new_key = name.lower()
+        if new_key == old_key:
+            conn.execute(sa.text("UPDATE skills SET name = :name WHERE name_key = :key"), {"name": name, "key": old_key})
+            continue
+        params = {"old": old_key, "new": new_key, "name": name}
+        conn.execute(sa.text(
+            "UPDATE skills SET score = MAX(score, (SELECT o.score FROM skills o WHERE o.user_id = skills.user_id AND o.name_key = :old)) "
+            "WHERE name_key = :new AND user_id IN (SELECT user_id FROM skills WHERE name_key = :old)"
+        ), params)
+        conn.execute(sa.text(
+            "DELETE FROM skills WHERE name_key = :old AND user_id IN (SELECT user_id FROM skills WHERE name_key = :new)"
+        ), params)
+        conn.execute(sa.text("UPDATE skills SET name_key = :new, name = :name WHERE name_key = :old"), params)
+
+def downgrade():
+    # Data-only migration; the old names are not restored
+    pass
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from . import routes_profile, routes_chat, routes_device, routes_skills, routes_opportunities, routes_challenges, routes_parsing, routes_gamification, routes_system
+from . import routes_profile, routes_chat, routes_device, routes_skills, routes_opportunities, routes_challenges, routes_parsing, routes_gamification, routes_system, routes_sync
 
 api_router = APIRouter()
 api_router.include_router(routes_device.router, prefix="/device", tags=["device"])
@@ -10,4 +10,5 @@ api_router.include_router(routes_opportunities.router, prefix="/opportunities",
 api_router.include_router(routes_challenges.router, prefix="/challenges", tags=["challenges"])
 api_router.include_router(routes_parsing.router, prefix="/parse", tags=["parsing"])
 api_router.include_router(routes_gamification.router, prefix="/gamification", tags=["gamification"])
+api_router.include_router(routes_sync.router, prefix="/sync", tags=["sync"])
 api_router.include_router(routes_system.router, tags=["system"])
@@ -0,0 +1,27 @@
+from functools import lru_cache
+from typing import Any, List, Mapping, Optional
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+@lru_cache(maxsize=None)
+def _adapter(tp) -> TypeAdapter:
+    return TypeAdapter(tp)
+
+class ModelResponse(Response):
+    """JSON for models that were validated when built (profile store, catalog, registries).
+
+    Returning a Response makes FastAPI skip the ``response_model`` pass (re-validating the
+    object, then ``jsonable_encoder``); pydantic-core dumps the bytes directly instead.
+    Keep ``response_model`` on the route so the OpenAPI schema stays the same.
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, content: Any, status_code: int = 200, headers: Optional[Mapping[str, str]] = None):
+        super().__init__(content, status_code=status_code, headers=headers)
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, list):
+            # Homogeneous lists of one model type (skills, opportunities, challenges)
+            return _adapter(List[type(content[0])]).dump_json(content) if content else b"[]"
+        return _adapter(type(content)).dump_json(content)
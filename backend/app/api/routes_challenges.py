@@ -1,7 +1,12 @@
-from fastapi import APIRouter
+from datetime import datetime, timezone
+from fastapi import APIRouter, Header, HTTPException, Response
 from pydantic import BaseModel
-import uuid
-from typing import List
+from typing import List, Optional
+from ..schemas.common import ChallengeResult, Skill
+from ..services.challenges import challenge_service, grade, DIFFICULTY_POINTS, SKILL_STEP
+from ..services.gamification import gamification_engine, CHALLENGE_ATTEMPTED, SKILL_UPSERTED
+from ..services.profile_store import profile_store
+from .responses import ModelResponse
 
 router = APIRouter()
 
@@ -11,10 +16,54 @@ class Challenge(BaseModel):
     question: str
     difficulty: str
 
+class ChallengeSubmission(BaseModel):
+    user_id: str
+    challenge_id: str
+    answer: str
+
 @router.get("/daily", response_model=List[Challenge])
-async def get_daily():
-    # Placeholder fixed set
-    return [
-        Challenge(id=str(uuid.uuid4()), topic="sql", question="What does SELECT * do?", difficulty="easy"),
-        Challenge(id=str(uuid.uuid4()), topic="python", question="Explain list comprehension.", difficulty="medium"),
-    ]
+async def get_daily(user_id: Optional[str] = None, if_none_match: Optional[str] = Header(None)):
+    skills = []
+    if user_id:
+        profile = await profile_store.get(user_id)
+        if profile is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        skills = profile.skills
+    daily = challenge_service.daily(user_id, skills)
+    headers = {
+        "ETag": daily.etag,
+        "Cache-Control": f"{'private' if user_id else 'public'}, max-age={daily.expires_in}",
+    }
+    if if_none_match and daily.etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return ModelResponse([Challenge(id=c.id, topic=c.topic, question=c.question, difficulty=c.difficulty) for c in daily.challenges], headers=headers)
+
+@router.post("/submit", response_model=ChallengeResult)
+async def submit_answer(payload: ChallengeSubmission):
+    challenge = challenge_service.get(payload.challenge_id)
+    if challenge is None:
+        raise HTTPException(status_code=404, detail=f"Challenge not found: {payload.challenge_id}")
+    profile = await profile_store.get(payload.user_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    # Points and quiz evidence only come from the user's own set, once per challenge per day
+    if not challenge_service.in_daily(payload.user_id, challenge.id, profile.skills):
+        raise HTTPException(status_code=403, detail=f"Challenge {challenge.id} is not in today's set for this user")
+    correct = grade(challenge, payload.answer)
+    if not await challenge_service.record_attempt(payload.user_id, challenge.id, correct):
+        raise HTTPException(status_code=409, detail=f"Challenge {challenge.id} was already answered today")
+    await gamification_engine.ensure_user(profile)
+    score_delta = DIFFICULTY_POINTS[challenge.difficulty] if correct else 0
+    impacts = []
+    skill = next((s for s in profile.skills if s.name.lower() == challenge.topic), None)
+    if correct and skill is not None and skill.score < 100:
+        updated = Skill(
+            name=skill.name, score=min(100, skill.score + SKILL_STEP[challenge.difficulty]),
+            evidence=list(skill.evidence) + [f"quiz:{challenge.id}"],
+            last_updated=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        )
+        await profile_store.upsert_skills(payload.user_id, [updated])
+        gamification_engine.emit(payload.user_id, SKILL_UPSERTED, {"skills": [(updated.name, updated.score)]})
+        impacts.append(f"{updated.name}:+{updated.score - skill.score}")
+    await gamification_engine.record(payload.user_id, CHALLENGE_ATTEMPTED, {"correct": correct, "score_delta": score_delta})
+    return ChallengeResult(challenge_id=challenge.id, correct=correct, score_delta=score_delta, skill_impacts=impacts)
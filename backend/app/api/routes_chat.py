@@ -1,57 +1,203 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
-from ..schemas.common import ChatRequest, ChatResponse
-from .routes_profile import PROFILES
-from ..services.model_router import ModelRouter
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional
+import asyncio
+import orjson
+from ..schemas.common import ChatRequest, ChatResponse, Message
+from ..services.admission import admission, priority_for
+from ..services.conversation import assemble_prompt, context_prefixes, conversation_memory
+from ..services.device_registry import device_registry
+from ..services.metrics import span
+from ..services.model_router import model_router, ModelDecision
 from ..services.language import TranslationService
-from ..services.ollama_client import ollama_client
-from .routes_profile import PROFILES
+from ..services.ollama_client import Served, ollama_client
+from ..services.response_cache import response_cache
+from ..services.retrieval import retriever
+from ..services.profile_store import profile_store
+from ..services.gamification import gamification_engine, CHAT_SESSION
+from .responses import ModelResponse
 
 router = APIRouter()
-model_router = ModelRouter()
 translator = TranslationService()
 
+UNREACHABLE_HINT = (
+    "Model server unreachable. Ensure Ollama is running and .env MODEL_SERVER_PRIMARY points to the correct host (e.g. http://127.0.0.1:11434). "
+)
+
 class ChatRequestExtended(ChatRequest):
     requested_model: Optional[str] = None
     device_tier: Optional[str] = None
     allow_local: bool = True
+    accept_local: bool = False  # client can run the model itself: a 'local' placement returns the prompt instead of an answer
 
-@router.post("/ask", response_model=ChatResponse)
-async def chat(req: ChatRequestExtended):
-    if req.user_id not in PROFILES:
+@dataclass
+class PreparedChat:
+    user_id: str
+    decision: ModelDecision
+    detection: str
+    prompt: str
+    query: str  # normalized English query
+    fingerprint: str  # skill/interest (+ history and passages) context digest, part of the cache key
+    priority: int  # admission queue priority (lower first)
+    citations: List[str]  # sources of the retrieved passages injected into the prompt
+    served_by: Optional[str] = None  # backend that answered ('cache' for a cache hit), known from the first token
+    fallback: bool = False
+
+async def _prepare(req: ChatRequestExtended) -> PreparedChat:
+    profile = await profile_store.get(req.user_id)
+    if profile is None:
         raise HTTPException(status_code=404, detail="Profile not found")
-    profile = PROFILES[req.user_id]
+    admission.check_rate(req.user_id)
+    await gamification_engine.ensure_user(profile)
+    await gamification_engine.record(req.user_id, CHAT_SESSION)
     # Language handling
     detection = translator.detect_language(req.query)
     normalized_query = req.query
     if detection != 'en':
-        trans = translator.translate(req.query, 'en')
+        trans = translator.translate(req.query, 'en', detected=detection)
         normalized_query = trans['translated']
-    decision = model_router.decide(req.requested_model, req.device_tier or "budget", req.allow_local)
-    # Placeholder model response using normalized English query
-    # Build lightweight context (skills + interests first few)
-    top_skills = sorted(profile.skills, key=lambda s: s.score, reverse=True)[:5]
-    skill_summary = ", ".join(f"{s.name}:{s.score}" for s in top_skills) or "None"
-    interests = ", ".join(profile.interests[:5]) if profile.interests else "None"
-    system_context = (
-        "You are CareerIQ, a concise career and skill advisor. "
-        "User language may be non-English; respond in same language. "
-        f"Known skills (score 0-100): {skill_summary}. Interests: {interests}. "
-        "Provide actionable suggestions (careers, next skills, brief resources)."
+    # Registered device plan saves clients resending device_tier; an explicit tier still wins
+    plan = await device_registry.get(req.user_id)
+    tier = req.device_tier or (plan.tier if plan is not None else "budget")
+    local_tps = plan.local_tokens_per_sec if plan is not None and plan.tier == tier else None
+    # Only clients that can generate on-device get a 'local' placement; everyone else is served by a backend
+    decision = model_router.decide(req.requested_model, tier, req.allow_local and req.accept_local, local_tps)
+    conversation, passages = await asyncio.gather(
+        conversation_memory.get(req.user_id), retriever.retrieve(normalized_query),
     )
-    generation_prompt = f"{system_context}\n\nUser Query: {normalized_query}\nAnswer:"            
-    raw_answer = await ollama_client.generate(decision.model, generation_prompt)
-    # If generation failed, provide clearer guidance
-    if raw_answer.startswith("(generation error"):
-        raw_answer = (
-            "Model server unreachable. Ensure Ollama is running and .env MODEL_SERVER_PRIMARY points to the correct host (e.g. http://127.0.0.1:11434). "
-            + raw_answer
-        )
-    # If user language not English translate back
-    final_answer = raw_answer
-    if detection != 'en':
-        back = translator.translate(raw_answer, detection)
-        final_answer = back['translated']
-    answer = f"[Model {decision.model} via {decision.route}] {final_answer}"
-    return ChatResponse(answer=answer, used_model=decision.model, citations=[])
+    with span("chat.build_prompt"):
+        # Cached per user until the profile changes; history and passages trimmed to the model's token budget
+        prefix = context_prefixes.get(profile)
+        generation_prompt, fingerprint, used = assemble_prompt(prefix, conversation, normalized_query, decision.model, passages)
+    return PreparedChat(
+        user_id=req.user_id,
+        decision=decision,
+        detection=detection,
+        prompt=generation_prompt,
+        query=normalized_query,
+        fingerprint=fingerprint,
+        priority=priority_for(tier),
+        citations=[p.citation for p in used],
+    )
+
+async def _raw_tokens(prepared: PreparedChat) -> AsyncIterator[str]:
+    model = prepared.decision.model
+    if response_cache is not None:
+        cached = await response_cache.get(model, prepared.fingerprint, prepared.query)
+        if cached is not None:
+            prepared.served_by = "cache"
+            yield cached
+            await conversation_memory.append(prepared.user_id, prepared.query, cached)
+            return
+    if prepared.decision.route == "local":
+        # The device runs the model: callers hand it the prompt, and it posts the finished turn to /history
+        return
+    parts = []
+    async for token in ollama_client.stream(model, prepared.prompt, prepared.decision.route, prepared.priority):
+        if isinstance(token, Served):
+            prepared.served_by, prepared.fallback = token.backend, token.fallback
+            continue
+        parts.append(token)
+        yield token
+    answer = "".join(parts)
+    # Only cache/remember clean completions
+    if answer and "(generation error" not in answer:
+        if response_cache is not None:
+            await response_cache.put(model, prepared.fingerprint, prepared.query, answer)
+        await conversation_memory.append(prepared.user_id, prepared.query, answer)
+
+async def _answer_tokens(prepared: PreparedChat) -> AsyncIterator[str]:
+    first = True
+    async for token in _raw_tokens(prepared):
+        # If generation failed, provide clearer guidance
+        if first and token.startswith("(generation error"):
+            token = UNREACHABLE_HINT + token
+        first = False
+        # If user language not English translate back (placeholder translation is per chunk)
+        if prepared.detection != 'en':
+            token = translator.translate(token, prepared.detection, detected='en')['translated']
+        yield token
+
+def _event(obj) -> bytes:
+    return orjson.dumps(obj) + b"\n"
+
+def _model_tag(prepared: PreparedChat) -> str:
+    # Name where the answer came from, not just the planned route (cache hits, failovers)
+    return f"[Model {prepared.decision.model} via {prepared.served_by or prepared.decision.route}]"
+
+def _on_device(prepared: PreparedChat) -> bool:
+    return prepared.decision.route == "local" and prepared.served_by is None
+
+@router.post("/ask", response_model=ChatResponse)
+async def chat(req: ChatRequestExtended):
+    prepared = await _prepare(req)
+    final_answer = "".join([token async for token in _answer_tokens(prepared)])
+    if _on_device(prepared):
+        return ChatResponse(answer="", used_model=prepared.decision.model, citations=prepared.citations, route="local", prompt=prepared.prompt)
+    answer = f"{_model_tag(prepared)} {final_answer}"
+    return ChatResponse(answer=answer, used_model=prepared.decision.model, citations=prepared.citations, route=prepared.served_by or prepared.decision.route)
+
+@router.post("/stream")
+async def chat_stream(req: ChatRequestExtended):
+    """Stream the answer as NDJSON events: one 'meta', then 'token's (or one 'local' prompt), then 'done'."""
+    prepared = await _prepare(req)
+    decision = prepared.decision
+    tokens = _answer_tokens(prepared)
+    # Pull the first token before committing to a 200 so admission rejections still surface as 429/503
+    first = await anext(tokens, None)
+
+    async def events() -> AsyncIterator[bytes]:
+        backend = model_router.backends.get(decision.route)
+        meta = {"type": "meta", "used_model": decision.model, "route": decision.route, "tag": _model_tag(prepared)}
+        if prepared.served_by is not None:
+            # Where the answer really came from; differs from route when the routed backend failed over
+            meta["served_by"], meta["fallback"] = prepared.served_by, prepared.fallback
+        if backend is not None and backend.installed is not None:
+            # From the health monitor: False means the first token waits on a cold model load
+            meta["model_loaded"] = backend.is_loaded(decision.model)
+        yield _event(meta)
+        if _on_device(prepared):
+            yield _event({"type": "local", "model": decision.model, "prompt": prepared.prompt})
+        if first is not None:
+            yield _event({"type": "token", "content": first})
+        async for token in tokens:
+            yield _event({"type": "token", "content": token})
+        yield _event({"type": "done", "citations": prepared.citations})
+
+    headers = {"X-CareerIQ-Model": decision.model, "X-CareerIQ-Route": decision.route, "Cache-Control": "no-cache"}
+    return StreamingResponse(events(), media_type="application/x-ndjson", headers=headers)
+
+class ConversationHistory(BaseModel):
+    summary: List[str]
+    summarized_turns: int
+    turns: List[Message]
+
+@router.get("/history/{user_id}", response_model=ConversationHistory)
+async def chat_history(user_id: str):
+    if not await profile_store.exists(user_id):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    conv = await conversation_memory.get(user_id)
+    return ModelResponse(ConversationHistory(
+        summary=list(conv.summary),
+        summarized_turns=conv.summarized_turns,
+        turns=[Message(role=t.role, content=t.content) for t in conv.turns],
+    ))
+
+class DeviceTurn(BaseModel):
+    query: str
+    answer: str
+
+@router.post("/history/{user_id}")
+async def record_device_turn(user_id: str, turn: DeviceTurn):
+    """Remember a turn the device generated itself (route 'local'), so later prompts include it."""
+    if not await profile_store.exists(user_id):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    await conversation_memory.append(user_id, turn.query, turn.answer)
+    return {"user_id": user_id, "recorded": True}
+
+@router.delete("/history/{user_id}")
+async def clear_chat_history(user_id: str):
+    await conversation_memory.clear(user_id)
+    return {"user_id": user_id, "cleared": True}
@@ -1,6 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, Optional
+from ..services.device_registry import DevicePlan, device_registry
+from ..services.model_capabilities import capability_table
+from .responses import ModelResponse
 
 router = APIRouter()
 
@@ -16,22 +19,25 @@ class DeviceModelPlan(BaseModel):
     local_models: list[str]
     server_models: list[str]
     override_allowed: bool = True
+    local_tokens_per_sec: Dict[str, float] = {}
+
+def _plan_out(plan: DevicePlan) -> DeviceModelPlan:
+    return DeviceModelPlan(
+        tier=plan.tier,
+        local_models=plan.local_models,
+        server_models=list(capability_table.models),
+        local_tokens_per_sec=plan.local_tokens_per_sec,
+    )
 
 @router.post("/register", response_model=DeviceModelPlan)
-def register_device(info: DeviceInfo):
-    # Basic heuristic mapping
-    antutu = info.antutu_estimate or (info.cpu_cores * 50000 + info.ram_mb * 50)
-    if antutu >= 500000:
-        tier = "premium"
-        local = ["gemma3:270m", "smollm:135m"]
-    elif antutu >= 300000:
-        tier = "mid_range"
-        local = ["smollm:135m"]
-    elif antutu >= 100000:
-        tier = "budget"
-        local = []
-    else:
-        tier = "legacy"
-        local = []
-    server = ["smollm:135m", "gemma3:270m", "llama3.2:1b", "llama3.2:3b"]
-    return DeviceModelPlan(tier=tier, local_models=local, server_models=server)
+async def register_device(info: DeviceInfo):
+    # Tier thresholds and per-model feasibility come from the capability table
+    plan = await device_registry.register(info.user_id, info.ram_mb, info.cpu_cores, info.antutu_estimate)
+    return _plan_out(plan)
+
+@router.get("/{user_id}", response_model=DeviceModelPlan)
+async def get_device_plan(user_id: str):
+    plan = await device_registry.get(user_id)
+    if plan is None:
+        raise HTTPException(status_code=404, detail="Device not registered")
+    return ModelResponse(_plan_out(plan))
@@ -1,13 +1,33 @@
-from fastapi import APIRouter, HTTPException
-from .routes_profile import PROFILES
-from ..services.gamification import GamificationEngine
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from ..services.gamification import gamification_engine, cohort_key
+from ..services.profile_store import profile_store
 
 router = APIRouter()
-engine = GamificationEngine()
 
 @router.get("/status/{user_id}")
 async def gamification_status(user_id: str):
-    if user_id not in PROFILES:
+    profile = await profile_store.get(user_id)
+    if profile is None:
         raise HTTPException(status_code=404, detail="Profile not found")
-    profile = PROFILES[user_id]
-    return engine.evaluate(profile)
+    return await gamification_engine.evaluate(profile)
+
+@router.get("/leaderboard")
+async def leaderboard(degree: Optional[str] = None, semester: Optional[str] = None, limit: int = Query(10, ge=1, le=100)):
+    cohort = cohort_key(degree, semester)
+    return {"cohort": cohort, "size": gamification_engine.cohort_size(cohort), "top": gamification_engine.top(cohort, limit)}
+
+@router.get("/rank/{user_id}")
+async def user_rank(user_id: str, degree: Optional[str] = None, semester: Optional[str] = None):
+    profile = await profile_store.get(user_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    stats = await gamification_engine.ensure_user(profile)
+    cohort = cohort_key(degree, semester)
+    return {
+        "user_id": user_id,
+        "cohort": cohort,
+        "rank": gamification_engine.rank(user_id, cohort),
+        "size": gamification_engine.cohort_size(cohort),
+        "points": stats.points,
+    }
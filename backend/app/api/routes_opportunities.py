@@ -1,7 +1,11 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from typing import List
 import uuid
+from ..schemas.common import Opportunity as MatchedOpportunity
+from ..services.opportunity_matching import opportunity_matcher
+from ..services.profile_store import profile_store
+from .responses import ModelResponse
 
 router = APIRouter()
 
@@ -12,6 +16,13 @@ class Opportunity(BaseModel):
     match_score: int
     url: str
 
+class OpportunityMatchPage(BaseModel):
+    user_id: str
+    page: int
+    page_size: int
+    total: int
+    items: List[MatchedOpportunity]
+
 MOCK_OPPS = [
     Opportunity(id=str(uuid.uuid4()), title="Data Analyst Intern", company="StartupX", match_score=82, url="https://example.com/1"),
     Opportunity(id=str(uuid.uuid4()), title="Junior Python Developer", company="TechNova", match_score=76, url="https://example.com/2"),
@@ -20,4 +31,27 @@ MOCK_OPPS = [
 
 @router.get("/list", response_model=List[Opportunity])
 async def list_opportunities():
-    return MOCK_OPPS
+    return ModelResponse(MOCK_OPPS)
+
+@router.get("/match/{user_id}", response_model=OpportunityMatchPage)
+async def match_opportunities(user_id: str, page: int = Query(1, ge=1), page_size: int = Query(20, ge=1, le=100)):
+    profile = await profile_store.get(user_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    await opportunity_matcher.ensure_fresh()
+    matches, total = opportunity_matcher.match_page(
+        [(s.name, s.score) for s in profile.skills], (page - 1) * page_size, page_size
+    )
+    items = [
+        MatchedOpportunity(
+            id=entry.id,
+            title=entry.title,
+            company=entry.company,
+            location=entry.location,
+            match_score=score,
+            source=entry.source,
+            url=entry.url,
+        )
+        for entry, score in matches
+    ]
+    return ModelResponse(OpportunityMatchPage(user_id=user_id, page=page, page_size=page_size, total=total, items=items))
@@ -1,18 +1,129 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
-from ..services.parsing import ResumeParser
-from .routes_profile import PROFILES
+from fastapi.responses import StreamingResponse
+from ..services.parse_pool import parse_pool
+from ..services.parsing import DocumentTooLarge, SpooledDocument, UnreadableDocument, spool_to_disk
+from ..core.config import get_settings
+from ..services.profile_store import profile_store
 from ..schemas.common import Skill
-from typing import List
+from typing import AsyncIterator, BinaryIO, List, Tuple, Union
+import asyncio
+import io
+import json
+import os
+import zipfile
 
 router = APIRouter()
-parser = ResumeParser()
+settings = get_settings()
+
+async def _spool(src: BinaryIO) -> SpooledDocument:
+    # Chunked copy + hash off the event loop; never holds the whole upload in memory
+    return await asyncio.to_thread(spool_to_disk, src, settings.resume_max_bytes)
+
+def _discard(doc: SpooledDocument):
+    try:
+        os.unlink(doc.path)
+    except OSError:
+        pass
 
 @router.post("/resume", response_model=List[Skill])
 async def parse_resume(user_id: str, file: UploadFile = File(...)):
-    if user_id not in PROFILES:
+    if not await profile_store.exists(user_id):
         raise HTTPException(status_code=404, detail="Profile not found")
-    content = await file.read()
-    text = parser.extract_text(content, file.filename)
-    inferred = parser.infer_skills(text)
+    try:
+        doc = await _spool(file.file)
+    except DocumentTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    try:
+        # Parsing runs in the process pool so large files don't block the event loop
+        inferred = await parse_pool.parse(doc, file.filename)
+    except DocumentTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnreadableDocument as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    finally:
+        _discard(doc)
     # Return as Skill models (scores already 0-100 scale assumption)
     return [Skill(**s) for s in inferred]
+
+async def _documents(uploads: List[Tuple[str, BinaryIO]]) -> AsyncIterator[Tuple[str, Union[SpooledDocument, Exception]]]:
+    """Yield (filename, spooled document | error) for each upload, expanding zip archives."""
+    count = 0
+    for filename, handle in uploads:
+        if filename.lower().endswith(".zip"):
+            try:
+                archive = zipfile.ZipFile(handle)
+            except zipfile.BadZipFile as e:
+                yield filename, e
+                continue
+            with archive:
+                for info in archive.infolist():
+                    if info.is_dir():
+                        continue
+                    count += 1
+                    if count > settings.resume_batch_max_files:
+                        yield f"{filename}/{info.filename}", ValueError("batch file limit reached")
+                        return
+                    try:
+                        with archive.open(info) as member:
+                            yield f"{filename}/{info.filename}", await _spool(member)
+                    except Exception as e:
+                        yield f"{filename}/{info.filename}", e
+            continue
+        count += 1
+        if count > settings.resume_batch_max_files:
+            yield filename, ValueError("batch file limit reached")
+            return
+        try:
+            yield filename, await _spool(handle)
+        except Exception as e:
+            yield filename, e
+
+async def _parse_one(index: int, filename: str, doc: Union[SpooledDocument, Exception]) -> dict:
+    if isinstance(doc, Exception):
+        return {"index": index, "filename": filename, "ok": False, "error": str(doc)}
+    try:
+        skills = await parse_pool.parse(doc, filename)
+        return {"index": index, "filename": filename, "ok": True, "skills": [Skill(**s).model_dump() for s in skills]}
+    except Exception as e:
+        return {"index": index, "filename": filename, "ok": False, "error": str(e)}
+    finally:
+        _discard(doc)
+
+async def _batch_results(uploads: List[Tuple[str, BinaryIO]]) -> AsyncIterator[bytes]:
+    # Bounded window: only a few documents are spooled ahead of the pool
+    window = settings.resume_parse_workers * 2
+    pending = set()
+    total = failed = 0
+    try:
+        async for filename, doc in _documents(uploads):
+            pending.add(asyncio.create_task(_parse_one(total, filename, doc)))
+            total += 1
+            while len(pending) >= window:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    failed += not result["ok"]
+                    yield (json.dumps(result) + "\n").encode()
+        for task in asyncio.as_completed(pending):
+            result = await task
+            failed += not result["ok"]
+            yield (json.dumps(result) + "\n").encode()
+        pending = set()
+        yield (json.dumps({"done": True, "total": total, "failed": failed}) + "\n").encode()
+    finally:
+        for task in pending:
+            task.cancel()
+        for _, handle in uploads:
+            handle.close()
+
+@router.post("/resume/batch")
+async def parse_resume_batch(user_id: str, files: List[UploadFile] = File(...)):
+    """Parse many resumes (or zip archives of resumes); streams one NDJSON result per file."""
+    if not await profile_store.exists(user_id):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    uploads = []
+    for upload in files:
+        # FastAPI closes form uploads when the handler returns; keep the spooled files for the stream
+        uploads.append((upload.filename or "upload", upload.file))
+        upload.file = io.BytesIO()
+    return StreamingResponse(_batch_results(uploads), media_type="application/x-ndjson")
@@ -2,8 +2,10 @@ from fastapi import APIRouter, HTTPException
 import logging
 from pydantic import BaseModel
 from typing import List
-from ..schemas.common import Skill, Profile
-from .routes_profile import PROFILES
+from ..schemas.common import Skill
+from ..services.gamification import gamification_engine, SKILL_UPSERTED
+from ..services.profile_store import profile_store
+from .responses import ModelResponse
 
 router = APIRouter()
 
@@ -13,18 +15,20 @@ class SkillUpsertRequest(BaseModel):
 
 @router.post("/upsert", response_model=List[Skill])
 async def upsert_skills(payload: SkillUpsertRequest):
-    if payload.user_id not in PROFILES:
-        logging.warning(f"Skill upsert for missing profile id={payload.user_id}; existing={list(PROFILES.keys())}")
-        raise HTTPException(status_code=404, detail=f"Profile not found: {payload.user_id}. Existing IDs: {list(PROFILES.keys())}")
-    profile: Profile = PROFILES[payload.user_id]
-    existing = {s.name.lower(): s for s in profile.skills}
-    for skill in payload.skills:
-        existing[skill.name.lower()] = skill
-    profile.skills = list(existing.values())
-    return profile.skills
+    skills = await profile_store.upsert_skills(payload.user_id, payload.skills)
+    if skills is None:
+        logging.warning(f"Skill upsert for missing profile id={payload.user_id}")
+        raise HTTPException(status_code=404, detail=f"Profile not found: {payload.user_id}")
+    if payload.user_id in gamification_engine.stats:
+        gamification_engine.emit(payload.user_id, SKILL_UPSERTED, {"skills": [(s.name, s.score) for s in payload.skills]})
+    else:
+        # First event for this user in this process: seed aggregates from the stored profile
+        await gamification_engine.ensure_user(await profile_store.get(payload.user_id))
+    return skills
 
 @router.get("/{user_id}", response_model=List[Skill])
 async def list_skills(user_id: str):
-    if user_id not in PROFILES:
+    skills = await profile_store.list_skills(user_id)
+    if skills is None:
         raise HTTPException(status_code=404, detail=f"Profile not found: {user_id}")
-    return PROFILES[user_id].skills
+    return ModelResponse(skills)
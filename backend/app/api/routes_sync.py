@@ -0,0 +1,57 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from typing import AsyncIterator, List
+from ..services.gamification import gamification_engine
+from ..services.profile_store import profile_store
+from ..services.sync import SyncError, sync_service
+
+router = APIRouter()
+
+class SyncExportRequest(BaseModel):
+    have: List[str] = []  # chunk hashes the client already stores
+
+def _http_error(e: SyncError) -> HTTPException:
+    detail = {"error": e.detail, "missing": e.missing} if e.missing else e.detail
+    return HTTPException(status_code=e.status_code, detail=detail)
+
+async def _lines(request: Request) -> AsyncIterator[bytes]:
+    # Body arrives in arbitrary pieces; re-split on newlines without buffering the whole upload
+    pending = b""
+    async for piece in request.stream():
+        pending += piece
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
+@router.get("/{user_id}/manifest")
+async def sync_manifest(user_id: str):
+    chunks = await sync_service.snapshot(user_id)
+    if chunks is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return sync_service.manifest(chunks)
+
+@router.post("/{user_id}/export")
+async def sync_export(user_id: str, req: SyncExportRequest):
+    """NDJSON: 'manifest', then encrypted 'chunk's the client lacks, then 'done'."""
+    chunks = await sync_service.snapshot(user_id)
+    if chunks is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    headers = {"ETag": f'"{sync_service.manifest(chunks)["state_hash"]}"', "Cache-Control": "no-store"}
+    return StreamingResponse(sync_service.export_events(user_id, chunks, set(req.have)), media_type="application/x-ndjson", headers=headers)
+
+@router.post("/{user_id}/import")
+async def sync_import(user_id: str, request: Request):
+    """NDJSON upload: a 'manifest' line plus 'chunk' lines for hashes missing from the server's manifest.
+
+    409 lists the chunk hashes the server still needs.
+    """
+    try:
+        result = await sync_service.import_events(user_id, _lines(request))
+    except SyncError as e:
+        raise _http_error(e)
+    # The restored skills replace the old ones, so points/badges/cohorts are rebuilt rather than seeded
+    gamification_engine.reseed(await profile_store.get(user_id))
+    return result
@@ -1,24 +1,39 @@
 from fastapi import APIRouter
-import httpx
-from ..core.config import get_settings
+from ..services.admission import admission
+from ..services.health_monitor import health_monitor
+from ..services.model_router import model_router
+from ..services.ollama_client import ollama_client
+from ..services.response_cache import response_cache
+from ..services.retrieval import retriever
 
 router = APIRouter()
-settings = get_settings()
-
-async def _probe(host: str, model: str = "gemma3:270m"):
-    url = f"{host}/api/generate"
-    payload = {"model": model, "prompt": "ping", "stream": False}
-    try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            r = await client.post(url, json=payload)
-            r.raise_for_status()
-            return {"host": host, "ok": True}
-    except Exception as e:
-        return {"host": host, "ok": False, "error": str(e)}
 
 @router.get("/system/model/health")
-async def model_health():
-    primary = await _probe(settings.model_server_primary)
-    secondary = await _probe(settings.model_server_secondary) if settings.model_server_secondary else None
-    localhost = await _probe("http://127.0.0.1:11434")
-    return {"primary": primary, "secondary": secondary, "localhost": localhost}
+async def model_health(refresh: bool = False):
+    # Served from the background monitor's last round; probe inline only if asked or nothing ran yet
+    if refresh or not health_monitor.probes:
+        await health_monitor.refresh()
+    snapshot = health_monitor.snapshot()
+    backends = snapshot.pop("backends")
+    return {"primary": None, "secondary": None, "localhost": None, **backends, "monitor": snapshot}
+
+@router.get("/system/model/router")
+async def model_routing_stats():
+    # Per-backend load/latency/breaker state plus the most recent routing decisions
+    return {**model_router.snapshot(), "coalescing": ollama_client.flights.stats()}
+
+@router.get("/system/admission")
+async def admission_stats():
+    # Slots in use per backend, wait-queue depth and wait times, rejections by reason
+    return admission.stats()
+
+@router.get("/system/cache")
+async def cache_stats():
+    if response_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **response_cache.stats()}
+
+@router.get("/system/retrieval")
+async def retrieval_stats():
+    # Loaded index metadata (passages, terms, sources, build id) and budget timeouts
+    return retriever.stats()
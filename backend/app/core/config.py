@@ -9,6 +9,83 @@ class Settings(BaseSettings):
     allow_origins: list[str] = ["*"]
     model_server_primary: str = "http://192.168.1.100:11434"
     model_server_secondary: str = "http://192.168.1.101:11434"
+    # Profile storage: 'memory' (process-local dict) | 'sqlite' (SQLAlchemy async, see alembic/)
+    profile_store_backend: str = "memory"
+    database_url: str = "sqlite+aiosqlite:///./data/careeriq.sqlite3"
+    database_auto_create: bool = True
+    # Pooled HTTP client limits (applied per model host)
+    model_server_max_connections: int = 20
+    model_server_max_keepalive: int = 10
+    model_server_keepalive_expiry: float = 30.0
+    # Load-aware routing: concurrent generations each host handles comfortably
+    model_server_primary_capacity: int = 16
+    model_server_secondary_capacity: int = 3
+    model_server_ewma_alpha: float = 0.3
+    # Circuit breaker: open after N consecutive failures, half-open retry after timeout (s)
+    model_server_failure_threshold: int = 3
+    model_server_reset_timeout: float = 15.0
+    # Share one upstream generation between identical concurrent (model, prompt) requests
+    model_server_coalesce: bool = True
+    # Background health monitor: probes every host's /api/tags + /api/ps concurrently
+    model_health_monitor: bool = True
+    model_health_interval: float = 15.0
+    model_health_timeout: float = 2.0
+    # Admission control: per-backend slots = capacity above; bounded priority wait queue beyond that
+    admission_max_queue: int = 64
+    admission_queue_timeout: float = 10.0  # seconds a request may wait for a slot before 503
+    # Per-user token bucket on chat requests (0 disables)
+    rate_limit_per_minute: float = 30.0
+    rate_limit_burst: int = 10
+    # Skills taxonomy (JSON with names + aliases); empty = bundled app/data/skills_taxonomy.json
+    skills_taxonomy_path: str = ""
+    # Resume parsing: process-pool size and batch upload limits
+    resume_parse_workers: int = 2
+    resume_batch_max_files: int = 500
+    resume_max_bytes: int = 5 * 1024 * 1024
+    resume_max_pages: int = 10
+    resume_max_text_chars: int = 200_000
+    resume_parse_cache_entries: int = 512  # parse results cached by content hash
+    # Model capability table (RAM footprint, tokens/s by device tier); empty = bundled app/data/model_capabilities.json
+    model_capabilities_path: str = ""
+    # Opportunity catalog (JSON/CSV); empty = bundled app/data/opportunities.json
+    opportunities_catalog_path: str = ""
+    # Daily challenges: question bank (JSON); empty = bundled app/data/challenge_bank.json
+    challenge_bank_path: str = ""
+    challenge_daily_count: int = 3
+    # Background top-up of thin (topic, difficulty) pools via the LLM; off by default
+    challenge_llm_generation: bool = False
+    challenge_llm_model: str = "llama3.2:1b"
+    challenge_pool_min_size: int = 5
+    # /metrics and per-request Server-Timing breakdown via the X-CareerIQ-Profile: 1 header
+    metrics_enabled: bool = True
+    metrics_profiling: bool = True
+    # Conversation memory: ring buffer per user (persisted with the profile store), rolling summary of older turns
+    conversation_max_turns: int = 20
+    conversation_history_tokens: int = 1024  # cap on history in the prompt, below the model's own context budget
+    conversation_summary_tokens: int = 160
+    conversation_cache_users: int = 10_000  # users whose history/context prefix stay in memory
+    # Local BM25 retrieval for chat grounding; build with `python -m app.services.retrieval build`
+    retrieval_enabled: bool = True
+    retrieval_index_path: str = "data/retrieval_index"
+    retrieval_documents_path: str = ""  # empty = the repo's documents/ folder
+    retrieval_resources_path: str = ""  # empty = bundled app/data/career_resources.json
+    retrieval_chunk_words: int = 100
+    retrieval_top_k: int = 3
+    retrieval_budget_ms: float = 50.0  # answer without passages if retrieval takes longer
+    retrieval_min_score: float = 2.0  # BM25 score below which a passage is not worth the prompt tokens
+    retrieval_context_tokens: int = 512  # prompt budget for passages
+    # Encrypted client-state sync: compressed, Fernet-encrypted chunks addressed by keyed content hash
+    sync_chunk_bytes: int = 4096  # target plaintext chunk size (content-defined, 0.5x-2x)
+    sync_max_bytes: int = 5 * 1024 * 1024  # cap on one import upload
+    sync_key_cache_size: int = 10_000  # per-user derived keys kept in memory
+    # Language detection LRU (normalized text -> language code)
+    language_cache_size: int = 4096
+    # Chat response cache: 'memory' | 'sqlite' | 'off'
+    response_cache_backend: str = "memory"
+    response_cache_path: str = "data/response_cache.sqlite3"
+    response_cache_max_entries: int = 2000
+    response_cache_ttl: float = 6 * 3600
+    response_cache_fuzzy_threshold: int = 95  # rapidfuzz token_sort_ratio cutoff (same content words required); 0 disables fuzzy hits
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,74 @@
+from sqlalchemy import JSON, Boolean, Float, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+class Base(DeclarativeBase):
+    pass
+
+class ProfileRow(Base):
+    __tablename__ = "profiles"
+
+    user_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    name: Mapped[str | None] = mapped_column(String(200))
+    degree: Mapped[str | None] = mapped_column(String(200))
+    semester: Mapped[str | None] = mapped_column(String(50))
+    interests: Mapped[list] = mapped_column(JSON, default=list)
+    language: Mapped[str] = mapped_column(String(10), default="en")
+    nickname: Mapped[str | None] = mapped_column(String(100))
+    career_paths: Mapped[list] = mapped_column(JSON, default=list)
+
+class SkillRow(Base):
+    __tablename__ = "skills"
+
+    user_id: Mapped[str] = mapped_column(String(64), ForeignKey("profiles.user_id", ondelete="CASCADE"), primary_key=True)
+    # Lowercased name: skills are unique per user case-insensitively
+    name_key: Mapped[str] = mapped_column(String(200), primary_key=True)
+    name: Mapped[str] = mapped_column(String(200))
+    score: Mapped[int] = mapped_column(Integer)
+    evidence: Mapped[list] = mapped_column(JSON, default=list)
+    last_updated: Mapped[str | None] = mapped_column(String(40))
+    # Insertion order, so listing preserves the order skills were first added
+    position: Mapped[int] = mapped_column(Integer, default=0)
+
+    __table_args__ = (Index("ix_skills_name_key", "name_key"),)
+
+class ConversationRow(Base):
+    __tablename__ = "conversations"
+
+    user_id: Mapped[str] = mapped_column(String(64), ForeignKey("profiles.user_id", ondelete="CASCADE"), primary_key=True)
+    # Ring buffer of recent turns as [{"role", "content"}], oldest first; older turns live on in `summary`
+    turns: Mapped[list] = mapped_column(JSON, default=list)
+    summary: Mapped[str] = mapped_column(Text, default="")
+    summarized_turns: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[str | None] = mapped_column(String(40))
+
+class DeviceRow(Base):
+    __tablename__ = "devices"
+
+    # No foreign key: devices register before the profile is created
+    user_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    tier: Mapped[str] = mapped_column(String(20))
+    ram_mb: Mapped[int] = mapped_column(Integer)
+    cpu_cores: Mapped[int] = mapped_column(Integer)
+    # Feasible on-device models -> expected tokens/s, from the capability table at registration
+    local_tokens_per_sec: Mapped[dict] = mapped_column(JSON, default=dict)
+    registered_at: Mapped[float] = mapped_column(Float)
+
+class GameStatsRow(Base):
+    __tablename__ = "game_stats"
+
+    # Event-derived counters only; skill aggregates and leaderboards are rebuilt from the profiles at startup
+    user_id: Mapped[str] = mapped_column(String(64), ForeignKey("profiles.user_id", ondelete="CASCADE"), primary_key=True)
+    challenges_attempted: Mapped[int] = mapped_column(Integer, default=0)
+    challenges_correct: Mapped[int] = mapped_column(Integer, default=0)
+    challenge_points: Mapped[int] = mapped_column(Integer, default=0)
+    chat_sessions: Mapped[int] = mapped_column(Integer, default=0)
+
+class ChallengeAttemptRow(Base):
+    __tablename__ = "challenge_attempts"
+
+    # One row per answered challenge per day; the primary key is what rejects a repeat submission
+    user_id: Mapped[str] = mapped_column(String(64), ForeignKey("profiles.user_id", ondelete="CASCADE"), primary_key=True)
+    day: Mapped[str] = mapped_column(String(10), primary_key=True)
+    challenge_id: Mapped[str] = mapped_column(String(100), primary_key=True)
+    correct: Mapped[bool] = mapped_column(Boolean, default=False)
+    answered_at: Mapped[str | None] = mapped_column(String(40))
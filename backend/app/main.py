@@ -1,11 +1,51 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+import asyncio
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from .core.config import get_settings
 from .api import api_router
+from .services.admission import AdmissionRejected
+from .services.metrics import metrics, MetricsMiddleware
+from .services.ollama_client import ollama_client
+from .services.parse_pool import parse_pool
+from .services.profile_store import profile_store
+from .services.opportunity_matching import opportunity_matcher
+from .services.challenges import challenge_service
+from .services.gamification import gamification_engine
+from .services.health_monitor import health_monitor
+from .services.retrieval import retriever
 
 settings = get_settings()
 
-app = FastAPI(title=settings.app_name)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared keep-alive pools to the model servers for the app lifetime
+    await ollama_client.startup()
+    if settings.model_health_monitor:
+        health_monitor.start()
+    await profile_store.startup()
+    # Leaderboards and points live in memory: rebuild them from the stored profiles and counters
+    await gamification_engine.startup(profile_store)
+    await opportunity_matcher.ensure_fresh()
+    # Memory-map the retrieval index off the startup path; the first chat would load it anyway
+    warm_index = asyncio.create_task(retriever.warm()) if settings.retrieval_enabled else None
+    top_up = asyncio.create_task(challenge_service.top_up()) if settings.challenge_llm_generation else None
+    try:
+        yield
+    finally:
+        if top_up is not None:
+            top_up.cancel()
+        if warm_index is not None:
+            await warm_index
+        retriever.close()
+        await health_monitor.stop()
+        await ollama_client.aclose()
+        parse_pool.shutdown()
+        await profile_store.aclose()
+
+# orjson for every JSON body; hot GETs return ModelResponse to also skip response_model re-validation
+app = FastAPI(title=settings.app_name, lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -15,6 +55,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware, profiling=settings.metrics_profiling)
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected(request: Request, exc: AdmissionRejected):
+    return ORJSONResponse(status_code=exc.status_code, content={"detail": exc.reason}, headers={"Retry-After": str(exc.retry_after)})
+
 app.include_router(api_router, prefix=settings.api_v1_prefix)
 
 @app.get("/health")
@@ -24,3 +71,9 @@ async def health():
 @app.get("/")
 async def root():
     return {"name": settings.app_name, "version": 1, "docs": "/docs", "api": settings.api_v1_prefix}
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    if not settings.metrics_enabled:
+        return PlainTextResponse("metrics disabled\n", status_code=404)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -50,6 +50,8 @@ class ChatResponse(BaseModel):
     answer: str
     used_model: str
     citations: List[str] = []
+    route: Optional[str] = None  # where the answer came from; 'local' = run `prompt` on the device
+    prompt: Optional[str] = None
 
 class ProfileCreate(BaseModel):
     user_id: str
@@ -0,0 +1,212 @@
+from __future__ import annotations
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional, Tuple
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from ..core.config import get_settings
+from .metrics import metrics
+
+settings = get_settings()
+
+# Lower runs first. Devices that can't fall back to on-device generation wait less.
+TIER_PRIORITY = {"legacy": 0, "budget": 0, "mid_range": 1, "premium": 2}
+DEFAULT_PRIORITY = 1
+BACKGROUND_PRIORITY = 9  # batch/background generation (e.g. challenge pool top-ups)
+
+def priority_for(tier: Optional[str]) -> int:
+    return TIER_PRIORITY.get(tier or "", DEFAULT_PRIORITY)
+
+class AdmissionRejected(Exception):
+    def __init__(self, status_code: int, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate  # tokens per second
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self) -> Tuple[bool, float]:
+        """(allowed, seconds until the next token)."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True, 0.0
+        return False, (1 - self.tokens) / self.rate
+
+class BackendGate:
+    """Concurrency limit for one backend; waiters are served by (priority, arrival)."""
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self.active = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, fut in self._waiters if not fut.done())
+
+    def try_acquire(self) -> bool:
+        if self.active < self.limit and not self.queued:
+            self.active += 1
+            return True
+        return False
+
+    async def acquire(self, priority: int, timeout: float):
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), timeout)
+        except BaseException:
+            if fut.done() and not fut.cancelled():
+                # Slot was handed over just as we gave up: pass it on
+                self.release()
+            else:
+                fut.cancel()
+            raise
+
+    def release(self):
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                # Hand the slot straight to the next waiter; active count is unchanged
+                fut.set_result(None)
+                return
+        self.active -= 1
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_queue: int = 64,
+        queue_timeout: float = 10.0,
+        rate_per_minute: float = 30.0,
+        burst: float = 10.0,
+        max_buckets: int = 50_000,
+    ):
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.max_buckets = max_buckets
+        self.gates: Dict[str, BackendGate] = {}
+        self.buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.admitted = 0
+        self.queued_total = 0
+        self.rejected: Dict[str, int] = {"rate_limited": 0, "queue_full": 0, "queue_timeout": 0}
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.recent_waits: Deque[float] = deque(maxlen=1000)  # seconds, requests that had to queue
+
+    def gate(self, backend) -> BackendGate:
+        gate = self.gates.get(backend.name)
+        if gate is None:
+            gate = self.gates[backend.name] = BackendGate(backend.name, backend.capacity)
+        return gate
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(g.queued for g in self.gates.values())
+
+    def check_rate(self, user_id: str):
+        if self.rate <= 0:
+            return
+        bucket = self.buckets.get(user_id)
+        if bucket is None:
+            bucket = self.buckets[user_id] = TokenBucket(self.rate, self.burst)
+            if len(self.buckets) > self.max_buckets:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(user_id)
+        allowed, wait = bucket.take()
+        if not allowed:
+            self.rejected["rate_limited"] += 1
+            raise AdmissionRejected(429, "rate limit exceeded", wait)
+
+    def try_acquire(self, candidates: List) -> Optional[object]:
+        """First candidate backend with a free slot, without waiting."""
+        for backend in candidates:
+            if self.gate(backend).try_acquire():
+                self.admitted += 1
+                return backend
+        return None
+
+    async def acquire(self, candidates: List, priority: int = DEFAULT_PRIORITY):
+        """Slot on the best candidate with spare capacity, else queue for the first one."""
+        # Fallback-only hosts take overflow only when no regular backend is up, not when one is merely busy
+        regular = [b for b in candidates if not b.fallback_only] or candidates
+        backend = self.try_acquire(regular)
+        if backend is not None:
+            return backend
+        backend = regular[0]
+        gate = self.gate(backend)
+        if self.queue_depth >= self.max_queue:
+            self.rejected["queue_full"] += 1
+            raise AdmissionRejected(503, "model servers busy", self._drain_estimate(backend, gate))
+        self.queued_total += 1
+        start = time.perf_counter()
+        try:
+            await gate.acquire(priority, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected["queue_timeout"] += 1
+            raise AdmissionRejected(503, "timed out waiting for a model server", self._drain_estimate(backend, gate))
+        waited = time.perf_counter() - start
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        self.recent_waits.append(waited)
+        self.admitted += 1
+        return backend
+
+    def release(self, backend):
+        self.gate(backend).release()
+
+    @staticmethod
+    def _drain_estimate(backend, gate: BackendGate) -> float:
+        # Rough time for the queue ahead to clear at the backend's observed latency
+        return (gate.queued + 1) / max(1, gate.limit) * (backend.ewma_latency or 1.0)
+
+    def stats(self) -> Dict:
+        waits = sorted(self.recent_waits)
+
+        def pct(p: float) -> float:
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))] * 1000, 1) if waits else 0.0
+
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "queued_total": self.queued_total,
+            "rejected": dict(self.rejected),
+            "wait_ms": {
+                "avg": round(self.wait_total / self.queued_total * 1000, 1) if self.queued_total else 0.0,
+                "p50": pct(0.5),
+                "p95": pct(0.95),
+                "max": round(self.wait_max * 1000, 1),
+            },
+            "backends": {name: {"active": g.active, "limit": g.limit, "queued": g.queued} for name, g in self.gates.items()},
+            "rate_limit": {"per_minute": self.rate * 60, "burst": self.burst, "tracked_users": len(self.buckets)},
+        }
+
+admission = AdmissionController(
+    max_queue=settings.admission_max_queue,
+    queue_timeout=settings.admission_queue_timeout,
+    rate_per_minute=settings.rate_limit_per_minute,
+    burst=settings.rate_limit_burst,
+)
+
+metrics.gauge("careeriq_admission_queue_depth", "Requests waiting for a model-server slot", lambda: admission.queue_depth)
+metrics.gauge("careeriq_admission_active", "Model-server slots in use per backend",
+              lambda: {(name,): g.active for name, g in admission.gates.items()}, ("backend",))
+metrics.gauge("careeriq_admission_admitted_total", "Generations admitted", lambda: admission.admitted, kind="counter")
+metrics.gauge("careeriq_admission_rejected_total", "Generations rejected by reason",
+              lambda: {(reason,): n for reason, n in admission.rejected.items()}, ("reason",), kind="counter")
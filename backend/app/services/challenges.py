@@ -0,0 +1,327 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+from functools import lru_cache
+from sqlalchemy.dialects.sqlite import insert
+from ..core.config import get_settings
+from ..db.models import ChallengeAttemptRow
+from .admission import BACKGROUND_PRIORITY
+from .ollama_client import ollama_client
+from .profile_store import SQLProfileRepository, profile_store
+
+settings = get_settings()
+
+DEFAULT_BANK_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "challenge_bank.json")
+
+DIFFICULTIES = ("easy", "medium", "hard")
+DIFFICULTY_POINTS = {"easy": 5, "medium": 10, "hard": 15}
+SKILL_STEP = {"easy": 1, "medium": 2, "hard": 3}  # skill score bump for a correct answer
+# Words that say nothing about an answer's content; keywords made only of these are dropped
+STOPWORDS = frozenset(
+    "a all an and any are as at be by can do don for i idea in is it know no none not of on or some t that the this to was with yes you".split()
+)
+
+_TOKEN = re.compile(r"\w+")
+
+@dataclass
+class BankChallenge:
+    id: str
+    topic: str
+    difficulty: str
+    question: str
+    expected_answer: str
+    keywords: Tuple[str, ...] = ()
+    source: str = "bank"
+
+@dataclass
+class DailySet:
+    day: str
+    challenges: List[BankChallenge]
+    etag: str
+    expires_in: int
+
+def clean_keywords(keywords: Iterable) -> Tuple[str, ...]:
+    """Lowercased keywords, minus any whose alternatives are all stopwords ("no", "all")."""
+    out = []
+    for k in keywords:
+        k = str(k).strip().lower()
+        words = _TOKEN.findall(k)
+        if words and not all(w in STOPWORDS for w in words):
+            out.append(k)
+    return tuple(out)
+
+def load_bank(path: str) -> List[BankChallenge]:
+    """Questions from JSON rows. A keyword is one or more ``|``-separated alternatives, each a
+    word or phrase matched on whole words; a trailing ``*`` makes its last word a stem ("aggregat*").
+    """
+    with open(path, encoding="utf-8") as f:
+        rows = json.load(f)
+    bank = []
+    for row in rows:
+        difficulty = row.get("difficulty", "easy").lower()
+        if difficulty not in DIFFICULTIES:
+            continue
+        bank.append(BankChallenge(
+            id=row["id"], topic=row["topic"].lower(), difficulty=difficulty, question=row["question"],
+            expected_answer=row.get("expected_answer", ""),
+            keywords=clean_keywords(row.get("keywords", ())),
+        ))
+    return bank
+
+def difficulty_for(score: int) -> str:
+    if score < 40:
+        return "easy"
+    if score < 70:
+        return "medium"
+    return "hard"
+
+def today(now: Optional[datetime] = None) -> str:
+    return (now or datetime.now(timezone.utc)).date().isoformat()
+
+def seconds_until_tomorrow(now: Optional[datetime] = None) -> int:
+    now = now or datetime.now(timezone.utc)
+    tomorrow = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+    return max(1, int((tomorrow - now).total_seconds()))
+
+@lru_cache(maxsize=4096)
+def _keyword_regex(keyword: str) -> re.Pattern:
+    alternatives = []
+    for alt in keyword.split("|"):
+        words = _TOKEN.findall(alt)
+        if not words:
+            continue
+        # Exact words (plural allowed) except a starred last word, which matches as a prefix
+        parts = [re.escape(w) + "(?:e?s)?" for w in words]
+        if alt.rstrip().endswith("*"):
+            parts[-1] = re.escape(words[-1]) + r"\w*"
+        alternatives.append(" ".join(parts))
+    return re.compile(r"(?<!\w)(?:" + "|".join(alternatives) + r")(?!\w)")
+
+def grade(challenge: BankChallenge, answer: str) -> bool:
+    """Correct when the answer's words cover at least two thirds of the keywords (all of one or two).
+
+    Questions without keywords (generated ones may have none) use the expected answer's
+    non-stopword words as keywords.
+    """
+    text = " ".join(_TOKEN.findall(answer.lower()))
+    if not text:
+        return False
+    keywords = challenge.keywords or clean_keywords(dict.fromkeys(_TOKEN.findall(challenge.expected_answer.lower())))
+    if not keywords:
+        return False
+    hits = sum(1 for k in keywords if _keyword_regex(k).search(text))
+    return hits * 3 >= len(keywords) * 2
+
+class ChallengePools:
+    """Questions bucketed by (topic, difficulty); ids are stable across restarts."""
+
+    def __init__(self, challenges: Iterable[BankChallenge] = ()):
+        self.pools: Dict[Tuple[str, str], List[BankChallenge]] = {}
+        self.by_id: Dict[str, BankChallenge] = {}
+        self.add(challenges)
+
+    def add(self, challenges: Iterable[BankChallenge]) -> int:
+        added = 0
+        for c in challenges:
+            if c.id in self.by_id:
+                continue
+            self.by_id[c.id] = c
+            self.pools.setdefault((c.topic, c.difficulty), []).append(c)
+            added += 1
+        return added
+
+    def topics(self) -> List[str]:
+        return sorted({topic for topic, _ in self.pools})
+
+    def size(self, topic: str, difficulty: str) -> int:
+        return len(self.pools.get((topic, difficulty), ()))
+
+    def pick(self, topic: str, difficulty: str, rng: random.Random, exclude: set) -> Optional[BankChallenge]:
+        # Requested difficulty first, then the nearest ones
+        start = DIFFICULTIES.index(difficulty)
+        for level in sorted(DIFFICULTIES, key=lambda d: abs(DIFFICULTIES.index(d) - start)):
+            options = [c for c in self.pools.get((topic, level), ()) if c.id not in exclude]
+            if options:
+                return rng.choice(options)
+        return None
+
+    def stats(self) -> Dict:
+        return {f"{t}/{d}": len(items) for (t, d), items in sorted(self.pools.items())}
+
+class AttemptRepository(ABC):
+    """Answered challenges per user and day; ``add`` is the one-attempt-per-day check."""
+
+    @abstractmethod
+    async def add(self, user_id: str, day: str, challenge_id: str, correct: bool) -> bool:
+        """Record the attempt; False if one was already recorded for this (user, day, challenge)."""
+
+class InMemoryAttemptRepository(AttemptRepository):
+    def __init__(self):
+        self.attempts: Dict[str, set] = {}  # day -> {(user, challenge_id)}
+
+    async def add(self, user_id: str, day: str, challenge_id: str, correct: bool) -> bool:
+        if day not in self.attempts:
+            # Only today's attempts matter
+            self.attempts = {day: set()}
+        attempts = self.attempts[day]
+        if (user_id, challenge_id) in attempts:
+            return False
+        attempts.add((user_id, challenge_id))
+        return True
+
+ATTEMPTS_T = ChallengeAttemptRow.__table__
+
+class SQLAttemptRepository(AttemptRepository):
+    """Stores attempts next to the profiles, so repeats are rejected across restarts and workers."""
+
+    def __init__(self, store: SQLProfileRepository):
+        self.store = store
+
+    async def add(self, user_id: str, day: str, challenge_id: str, correct: bool) -> bool:
+        engine = await self.store.engine()
+        stmt = insert(ATTEMPTS_T).values(
+            user_id=user_id, day=day, challenge_id=challenge_id, correct=correct,
+            answered_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        ).on_conflict_do_nothing()
+        async with engine.begin() as conn:
+            result = await conn.execute(stmt)
+        return result.rowcount == 1
+
+class ChallengeService:
+    def __init__(
+        self, path: Optional[str] = None, daily_count: int = 3, memo_size: int = 10_000,
+        attempts: Optional[AttemptRepository] = None,
+    ):
+        self.path = path or DEFAULT_BANK_PATH
+        self.pools = ChallengePools(load_bank(self.path))
+        self.daily_count = daily_count
+        self.memo_size = memo_size
+        self.attempts = attempts or InMemoryAttemptRepository()
+        # (day, user) -> first set served that day, so later skill changes don't reshuffle it
+        self._daily: "OrderedDict[Tuple[str, str], DailySet]" = OrderedDict()
+
+    def get(self, challenge_id: str) -> Optional[BankChallenge]:
+        return self.pools.by_id.get(challenge_id)
+
+    def daily(self, user_id: Optional[str] = None, skills: Sequence = (), now: Optional[datetime] = None) -> DailySet:
+        day = today(now)
+        key = (day, user_id or "")
+        cached = self._daily.get(key)
+        if cached is not None:
+            self._daily.move_to_end(key)
+            cached.expires_in = seconds_until_tomorrow(now)
+            return cached
+        picked = self._select(day, user_id or "", skills)
+        etag = hashlib.sha1("|".join([day] + [c.id for c in picked]).encode()).hexdigest()[:16]
+        result = DailySet(day=day, challenges=picked, etag=f'"{etag}"', expires_in=seconds_until_tomorrow(now))
+        if self._daily and next(iter(self._daily))[0] != day:
+            self._daily = OrderedDict((k, v) for k, v in self._daily.items() if k[0] == day)
+        self._daily[key] = result
+        while len(self._daily) > self.memo_size:
+            self._daily.popitem(last=False)
+        return result
+
+    def _select(self, day: str, user_id: str, skills: Sequence) -> List[BankChallenge]:
+        seed = hashlib.sha256(f"{day}|{user_id}".encode()).digest()
+        rng = random.Random(int.from_bytes(seed[:8], "big"))
+        topics = set(self.pools.topics())
+        picked: List[BankChallenge] = []
+        seen: set = set()
+        # Weakest skills first, each at a difficulty matching its score
+        for skill in sorted(skills, key=lambda s: (s.score, s.name.lower())):
+            if len(picked) >= self.daily_count:
+                break
+            topic = skill.name.lower()
+            if topic not in topics:
+                continue
+            c = self.pools.pick(topic, difficulty_for(skill.score), rng, seen)
+            if c is not None:
+                picked.append(c)
+                seen.add(c.id)
+        remaining = sorted(topics)
+        rng.shuffle(remaining)
+        for topic in remaining:
+            if len(picked) >= self.daily_count:
+                break
+            c = self.pools.pick(topic, "easy", rng, seen)
+            if c is not None:
+                picked.append(c)
+                seen.add(c.id)
+        return picked
+
+    def in_daily(self, user_id: str, challenge_id: str, skills: Sequence = (), now: Optional[datetime] = None) -> bool:
+        """Whether the challenge is in the user's set for today (the memoized one if already served)."""
+        return any(c.id == challenge_id for c in self.daily(user_id, skills, now).challenges)
+
+    async def record_attempt(self, user_id: str, challenge_id: str, correct: bool = False, now: Optional[datetime] = None) -> bool:
+        """True for the first attempt at a challenge today; False for a repeat."""
+        return await self.attempts.add(user_id, today(now), challenge_id, correct)
+
+    async def top_up(self, model: Optional[str] = None, min_size: Optional[int] = None) -> int:
+        """Fill thin (topic, difficulty) pools with LLM-generated questions."""
+        model = model or settings.challenge_llm_model
+        min_size = min_size or settings.challenge_pool_min_size
+        added = 0
+        for topic in self.pools.topics():
+            for difficulty in DIFFICULTIES:
+                missing = min_size - self.pools.size(topic, difficulty)
+                if missing <= 0:
+                    continue
+                try:
+                    text = await ollama_client.generate(
+                        model, _generation_prompt(topic, difficulty, missing), priority=BACKGROUND_PRIORITY
+                    )
+                except Exception as e:
+                    logging.warning(f"Challenge generation failed for {topic}/{difficulty}: {e}")
+                    continue
+                added += self.pools.add(_parse_generated(text, topic, difficulty)[:missing])
+        logging.info(f"Challenge pools topped up with {added} generated questions")
+        return added
+
+    def stats(self) -> Dict:
+        return {"challenges": len(self.pools.by_id), "pools": self.pools.stats(), "daily_sets_cached": len(self._daily)}
+
+def _generation_prompt(topic: str, difficulty: str, n: int) -> str:
+    return (
+        f"Write {n} {difficulty} interview-style questions about {topic} for university students. "
+        'Output one JSON object per line: {"question": ..., "answer": ..., "keywords": [3 short lowercase words from the answer]}. '
+        "No other text."
+    )
+
+def _parse_generated(text: str, topic: str, difficulty: str) -> List[BankChallenge]:
+    out = []
+    for line in text.splitlines():
+        line = line.strip().rstrip(",")
+        if not line.startswith("{"):
+            continue
+        try:
+            row = json.loads(line)
+            question, answer = str(row["question"]).strip(), str(row["answer"]).strip()
+        except (ValueError, KeyError, TypeError):
+            continue
+        if not question or not answer:
+            continue
+        digest = hashlib.sha1(question.lower().encode()).hexdigest()[:10]
+        out.append(BankChallenge(
+            id=f"{topic.replace(' ', '-')}-{difficulty}-llm-{digest}", topic=topic, difficulty=difficulty,
+            question=question, expected_answer=answer,
+            keywords=clean_keywords(row.get("keywords", ())),
+            source="llm",
+        ))
+    return out
+
+def build_attempt_repository() -> AttemptRepository:
+    if isinstance(profile_store, SQLProfileRepository):
+        return SQLAttemptRepository(profile_store)
+    return InMemoryAttemptRepository()
+
+challenge_service = ChallengeService(settings.challenge_bank_path or None, settings.challenge_daily_count, attempts=build_attempt_repository())
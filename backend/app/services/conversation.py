@@ -0,0 +1,279 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+import hashlib
+import re
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+from ..core.config import get_settings
+from ..db.models import ConversationRow
+from ..schemas.common import Profile
+from .model_capabilities import capability_table
+from .profile_store import SQLProfileRepository, profile_store
+from .response_cache import context_fingerprint
+from .retrieval import Passage
+
+settings = get_settings()
+
+CHARS_PER_TOKEN = 4  # rough average for English text; good enough for budgeting
+SNIPPET_CHARS = 160
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+@dataclass
+class Turn:
+    role: str  # 'user' | 'assistant'
+    content: str
+    tokens: int = 0
+
+    def __post_init__(self):
+        if not self.tokens:
+            self.tokens = estimate_tokens(self.content)
+
+@dataclass
+class Conversation:
+    turns: Deque[Turn]
+    summary: List[str] = field(default_factory=list)  # one line per folded-away turn, oldest first
+    summary_tokens: int = 0
+    summarized_turns: int = 0
+
+    def state(self) -> Dict:
+        return {
+            "turns": [{"role": t.role, "content": t.content} for t in self.turns],
+            "summary": "\n".join(self.summary),
+            "summarized_turns": self.summarized_turns,
+        }
+
+class ConversationRepository(ABC):
+    """Persistence for each user's ring buffer + rolling summary (one record per user)."""
+
+    @abstractmethod
+    async def load(self, user_id: str) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    async def save(self, user_id: str, state: Dict):
+        ...
+
+    @abstractmethod
+    async def clear(self, user_id: str):
+        ...
+
+class InMemoryConversationRepository(ConversationRepository):
+    def __init__(self):
+        self.states: Dict[str, Dict] = {}
+
+    async def load(self, user_id: str) -> Optional[Dict]:
+        return self.states.get(user_id)
+
+    async def save(self, user_id: str, state: Dict):
+        self.states[user_id] = state
+
+    async def clear(self, user_id: str):
+        self.states.pop(user_id, None)
+
+CONVERSATIONS_T = ConversationRow.__table__
+
+class SQLConversationRepository(ConversationRepository):
+    """Stores conversations next to the profiles, on the profile store's engine."""
+
+    def __init__(self, store: SQLProfileRepository):
+        self.store = store
+
+    async def load(self, user_id: str) -> Optional[Dict]:
+        engine = await self.store.engine()
+        async with engine.connect() as conn:
+            row = (await conn.execute(select(CONVERSATIONS_T).where(CONVERSATIONS_T.c.user_id == user_id))).first()
+        if row is None:
+            return None
+        return {"turns": row.turns or [], "summary": row.summary or "", "summarized_turns": row.summarized_turns or 0}
+
+    async def save(self, user_id: str, state: Dict):
+        engine = await self.store.engine()
+        values = {**state, "user_id": user_id, "updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+        stmt = insert(CONVERSATIONS_T).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CONVERSATIONS_T.c.user_id],
+            set_={k: stmt.excluded[k] for k in ("turns", "summary", "summarized_turns", "updated_at")},
+        )
+        async with engine.begin() as conn:
+            await conn.execute(stmt)
+
+    async def clear(self, user_id: str):
+        engine = await self.store.engine()
+        async with engine.begin() as conn:
+            await conn.execute(delete(CONVERSATIONS_T).where(CONVERSATIONS_T.c.user_id == user_id))
+
+def _snippet(text: str) -> str:
+    first = _SENTENCE_END.split(" ".join(text.split()), 1)[0]
+    return first if len(first) <= SNIPPET_CHARS else first[: SNIPPET_CHARS - 1] + "…"
+
+class ConversationMemory:
+    """Per-user bounded turn buffer; turns pushed out are folded into a capped extractive summary."""
+
+    def __init__(self, repo: ConversationRepository, max_turns: int = 20, summary_tokens: int = 160, cache_users: int = 10_000):
+        self.repo = repo
+        self.max_turns = max_turns
+        self.summary_tokens = summary_tokens
+        self.cache_users = cache_users
+        self._sessions: "OrderedDict[str, Conversation]" = OrderedDict()
+
+    async def get(self, user_id: str) -> Conversation:
+        conv = self._sessions.get(user_id)
+        if conv is not None:
+            self._sessions.move_to_end(user_id)
+            return conv
+        state = await self.repo.load(user_id) or {}
+        conv = Conversation(turns=deque(maxlen=self.max_turns), summarized_turns=state.get("summarized_turns", 0))
+        conv.turns.extend(Turn(t["role"], t["content"]) for t in state.get("turns", [])[-self.max_turns:])
+        conv.summary = [line for line in state.get("summary", "").split("\n") if line]
+        conv.summary_tokens = sum(estimate_tokens(line) for line in conv.summary)
+        self._sessions[user_id] = conv
+        if len(self._sessions) > self.cache_users:
+            self._sessions.popitem(last=False)
+        return conv
+
+    async def append(self, user_id: str, question: str, answer: str):
+        conv = await self.get(user_id)
+        for turn in (Turn("user", question), Turn("assistant", answer)):
+            if len(conv.turns) == conv.turns.maxlen:
+                self._fold(conv, conv.turns[0])
+            conv.turns.append(turn)
+        await self.repo.save(user_id, conv.state())
+
+    def _fold(self, conv: Conversation, turn: Turn):
+        line = f"{'User asked' if turn.role == 'user' else 'Advisor said'}: {_snippet(turn.content)}"
+        conv.summary.append(line)
+        conv.summary_tokens += estimate_tokens(line)
+        conv.summarized_turns += 1
+        # Rolling: the oldest summary lines go first once over budget
+        while conv.summary_tokens > self.summary_tokens and len(conv.summary) > 1:
+            conv.summary_tokens -= estimate_tokens(conv.summary.pop(0))
+
+    async def clear(self, user_id: str):
+        self._sessions.pop(user_id, None)
+        await self.repo.clear(user_id)
+
+    async def restore(self, user_id: str, state: Dict):
+        """Replace the stored conversation (``Conversation.state()`` shape); the next ``get`` reloads it."""
+        self._sessions.pop(user_id, None)
+        await self.repo.save(user_id, {
+            "turns": list(state.get("turns", []))[-self.max_turns:],
+            "summary": state.get("summary", ""),
+            "summarized_turns": int(state.get("summarized_turns", 0)),
+        })
+
+    @staticmethod
+    def window(conv: Conversation, budget: int) -> Tuple[List[str], List[Turn]]:
+        """Summary lines and the most recent turns that fit in ``budget`` tokens."""
+        summary: List[str] = []
+        if conv.summary and conv.summary_tokens <= budget // 4:
+            summary = conv.summary
+            budget -= conv.summary_tokens
+        picked: List[Turn] = []
+        for turn in reversed(conv.turns):
+            if turn.tokens > budget:
+                break
+            picked.append(turn)
+            budget -= turn.tokens
+        picked.reverse()
+        return summary, picked
+
+@dataclass
+class ContextPrefix:
+    text: str
+    tokens: int
+    fingerprint: str  # skill/interest digest, part of the response cache key
+
+class ContextPrefixCache:
+    """System prompt + skill/interest summary per user, rebuilt only after the profile changes."""
+
+    def __init__(self, max_users: int = 10_000):
+        self.max_users = max_users
+        self._prefixes: "OrderedDict[str, ContextPrefix]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, profile: Profile) -> ContextPrefix:
+        prefix = self._prefixes.get(profile.user_id)
+        if prefix is not None:
+            self._prefixes.move_to_end(profile.user_id)
+            self.hits += 1
+            return prefix
+        self.misses += 1
+        prefix = self._prefixes[profile.user_id] = self._build(profile)
+        if len(self._prefixes) > self.max_users:
+            self._prefixes.popitem(last=False)
+        return prefix
+
+    def invalidate(self, user_id: str):
+        self._prefixes.pop(user_id, None)
+
+    @staticmethod
+    def _build(profile: Profile) -> ContextPrefix:
+        # Build lightweight context (skills + interests first few)
+        top_skills = sorted(profile.skills, key=lambda s: s.score, reverse=True)[:5]
+        skill_summary = ", ".join(f"{s.name}:{s.score}" for s in top_skills) or "None"
+        interests = ", ".join(profile.interests[:5]) if profile.interests else "None"
+        text = (
+            "You are CareerIQ, a concise career and skill advisor. "
+            "User language may be non-English; respond in same language. "
+            f"Known skills (score 0-100): {skill_summary}. Interests: {interests}. "
+            "Provide actionable suggestions (careers, next skills, brief resources)."
+        )
+        return ContextPrefix(text=text, tokens=estimate_tokens(text), fingerprint=context_fingerprint(f"{skill_summary}|{interests}"))
+
+def fit_passages(passages: Sequence[Passage], budget: int) -> List[Passage]:
+    """Best-ranked passages first, as many as fit in ``budget`` tokens."""
+    picked: List[Passage] = []
+    for p in passages:
+        tokens = estimate_tokens(p.text) + 8
+        if tokens > budget:
+            break
+        picked.append(p)
+        budget -= tokens
+    return picked
+
+def assemble_prompt(
+    prefix: ContextPrefix, conv: Conversation, query: str, model: str, passages: Sequence[Passage] = (),
+) -> Tuple[str, str, List[Passage]]:
+    """Prompt within the model's token budget, the cache fingerprint for this context and the passages used."""
+    available = capability_table.context_tokens(model) - capability_table.policy.answer_tokens - prefix.tokens - estimate_tokens(query) - 16
+    # Retrieved passages are specific to this query, so they get their share before older history
+    notes = fit_passages(passages, max(0, min(settings.retrieval_context_tokens, available // 2)))
+    available -= sum(estimate_tokens(p.text) + 8 for p in notes)
+    summary, turns = ConversationMemory.window(conv, max(0, min(settings.conversation_history_tokens, available)))
+    if not summary and not turns and not notes:
+        # First turn: same prompt (and cache key) as a stateless chat
+        return f"{prefix.text}\n\nUser Query: {query}\nAnswer:", prefix.fingerprint, notes
+    parts = [prefix.text, ""]
+    if summary:
+        parts += ["Earlier in this conversation:", *summary, ""]
+    parts += [f"{'User' if t.role == 'user' else 'Advisor'}: {t.content}" for t in turns]
+    if notes:
+        parts += ([""] if parts[-1] else []) + ["Reference notes (cite as [n] when used):", *(f"[{i}] {p.title}: {p.text}" for i, p in enumerate(notes, 1))]
+    # Everything the prompt adds beyond the profile goes into the cache key: a follow-up only
+    # shares an answer with an identical history, never with another conversation
+    context = "\n".join(parts[1:])
+    parts.append(f"\nUser Query: {query}\nAnswer:")
+    digest = hashlib.sha1(context.encode("utf-8")).hexdigest()[:16]
+    return "\n".join(parts), context_fingerprint(f"{prefix.fingerprint}|{digest}"), notes
+
+def build_conversation_repository() -> ConversationRepository:
+    if isinstance(profile_store, SQLProfileRepository):
+        return SQLConversationRepository(profile_store)
+    return InMemoryConversationRepository()
+
+conversation_memory = ConversationMemory(
+    build_conversation_repository(),
+    max_turns=settings.conversation_max_turns,
+    summary_tokens=settings.conversation_summary_tokens,
+    cache_users=settings.conversation_cache_users,
+)
+context_prefixes = ContextPrefixCache(settings.conversation_cache_users)
+profile_store.on_change(context_prefixes.invalidate)
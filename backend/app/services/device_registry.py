@@ -0,0 +1,111 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+import time
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from ..db.models import DeviceRow
+from .model_capabilities import CapabilityTable, capability_table
+from .profile_store import SQLProfileRepository, profile_store
+
+@dataclass
+class DevicePlan:
+    user_id: str
+    tier: str
+    ram_mb: int
+    cpu_cores: int
+    local_tokens_per_sec: Dict[str, float] = field(default_factory=dict)  # feasible on-device models
+    registered_at: float = field(default_factory=time.time)
+
+    @property
+    def local_models(self) -> List[str]:
+        return sorted(self.local_tokens_per_sec, key=self.local_tokens_per_sec.get, reverse=True)
+
+class DeviceRepository(ABC):
+    """Persistence for device plans (one record per user)."""
+
+    @abstractmethod
+    async def load(self, user_id: str) -> Optional[DevicePlan]:
+        ...
+
+    @abstractmethod
+    async def save(self, plan: DevicePlan):
+        ...
+
+class InMemoryDeviceRepository(DeviceRepository):
+    def __init__(self):
+        self.plans: Dict[str, DevicePlan] = {}
+
+    async def load(self, user_id: str) -> Optional[DevicePlan]:
+        return self.plans.get(user_id)
+
+    async def save(self, plan: DevicePlan):
+        self.plans[plan.user_id] = plan
+
+DEVICES_T = DeviceRow.__table__
+
+class SQLDeviceRepository(DeviceRepository):
+    """Stores device plans next to the profiles, on the profile store's engine."""
+
+    def __init__(self, store: SQLProfileRepository):
+        self.store = store
+
+    async def load(self, user_id: str) -> Optional[DevicePlan]:
+        engine = await self.store.engine()
+        async with engine.connect() as conn:
+            row = (await conn.execute(select(DEVICES_T).where(DEVICES_T.c.user_id == user_id))).first()
+        if row is None:
+            return None
+        return DevicePlan(**row._asdict())
+
+    async def save(self, plan: DevicePlan):
+        engine = await self.store.engine()
+        stmt = insert(DEVICES_T).values(**asdict(plan))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DEVICES_T.c.user_id],
+            set_={c.name: stmt.excluded[c.name] for c in DEVICES_T.columns if c.name != "user_id"},
+        )
+        async with engine.begin() as conn:
+            await conn.execute(stmt)
+
+class DeviceRegistry:
+    """Each user's device plan, computed once at registration; chat requests read it from a process-local cache."""
+
+    def __init__(self, table: CapabilityTable, repo: DeviceRepository, cache_users: int = 10_000):
+        self.table = table
+        self.repo = repo
+        self.cache_users = cache_users
+        self.plans: Dict[str, DevicePlan] = {}
+
+    async def register(self, user_id: str, ram_mb: int, cpu_cores: int, antutu: Optional[int] = None) -> DevicePlan:
+        tier = self.table.classify(ram_mb, cpu_cores, antutu)
+        plan = DevicePlan(
+            user_id=user_id, tier=tier, ram_mb=ram_mb, cpu_cores=cpu_cores,
+            local_tokens_per_sec=self.table.local_plan(tier, ram_mb),
+        )
+        await self.repo.save(plan)
+        self._remember(plan)
+        return plan
+
+    async def get(self, user_id: str) -> Optional[DevicePlan]:
+        plan = self.plans.get(user_id)
+        if plan is None:
+            plan = await self.repo.load(user_id)
+            if plan is not None:
+                self._remember(plan)
+        return plan
+
+    def _remember(self, plan: DevicePlan):
+        self.plans.pop(plan.user_id, None)
+        self.plans[plan.user_id] = plan
+        if len(self.plans) > self.cache_users:
+            # Dicts keep insertion order: drop the least recently stored plan
+            self.plans.pop(next(iter(self.plans)))
+
+def build_device_repository() -> DeviceRepository:
+    if isinstance(profile_store, SQLProfileRepository):
+        return SQLDeviceRepository(profile_store)
+    return InMemoryDeviceRepository()
+
+device_registry = DeviceRegistry(capability_table, build_device_repository())
@@ -1,12 +1,34 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Iterator
+import base64, hashlib, hmac
 from cryptography.fernet import Fernet
-from typing import Optional
-import base64, hashlib
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from ..core.config import get_settings
+
+settings = get_settings()
+
+@dataclass(frozen=True)
+class UserKeys:
+    fernet: Fernet
+    mac_key: bytes  # keys content hashes so chunk ids reveal nothing without the server secret
+
+    def content_hash(self, data: bytes) -> str:
+        return hmac.new(self.mac_key, data, hashlib.sha256).hexdigest()[:32]
 
 class EncryptionService:
-    def __init__(self, master_key: str):
+    def __init__(self, master_key: str, cache_size: int = 10_000):
         # Derive 32-byte key
-        digest = hashlib.sha256(master_key.encode()).digest()
-        self._fernet = Fernet(base64.urlsafe_b64encode(digest))
+        self._master = hashlib.sha256(master_key.encode()).digest()
+        self._fernet = Fernet(base64.urlsafe_b64encode(self._master))
+        # HKDF per user is cheap but not free; sync touches the same user's keys for every chunk
+        self.for_user = lru_cache(maxsize=cache_size)(self._derive)
+
+    def _derive(self, user_id: str) -> UserKeys:
+        okm = HKDF(algorithm=hashes.SHA256(), length=64, salt=user_id.encode(), info=b"careeriq-sync-v1").derive(self._master)
+        return UserKeys(Fernet(base64.urlsafe_b64encode(okm[:32])), okm[32:])
 
     def encrypt(self, data: bytes) -> bytes:
         return self._fernet.encrypt(data)
@@ -14,4 +36,11 @@ class EncryptionService:
     def decrypt(self, token: bytes) -> bytes:
         return self._fernet.decrypt(token)
 
-# Prototype global instance (stateless server, future: per-user key derivation)
+    def encrypt_chunks(self, user_id: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Encrypt one chunk at a time so large states never sit in memory as a single token."""
+        fernet = self.for_user(user_id).fernet
+        for chunk in chunks:
+            yield fernet.encrypt(chunk)
+
+# Prototype global instance (stateless server); per-user keys are derived from it on demand
+encryption_service = EncryptionService(settings.encryption_key, settings.sync_key_cache_size)
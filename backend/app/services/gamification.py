@@ -1,5 +1,13 @@
-from dataclasses import dataclass
-from typing import List, Dict
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+import time
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from ..db.models import GameStatsRow
+from .leaderboard import Leaderboard
+from .profile_store import ProfileRepository, SQLProfileRepository, profile_store
 
 @dataclass
 class Badge:
@@ -13,14 +21,253 @@ BADGE_CATALOG = [
     Badge(code="challenge_start", name="Challenger", criteria="First challenge attempted")
 ]
 
+# Event kinds
+SKILL_UPSERTED = "skill_upserted"
+CHALLENGE_ATTEMPTED = "challenge_attempted"
+CHAT_SESSION = "chat_session"
+
+CHAT_SESSION_POINTS = 2
+
+# UserStats fields that only events can reproduce (skills come back from the profile store)
+COUNTERS = ("challenges_attempted", "challenges_correct", "challenge_points", "chat_sessions")
+
+@dataclass
+class GameEvent:
+    user_id: str
+    kind: str
+    payload: Dict
+    ts: float = field(default_factory=time.time)
+
+@dataclass
+class UserStats:
+    """Running aggregates; every event updates these in O(changed items)."""
+    skill_scores: Dict[str, int] = field(default_factory=dict)  # lowercased name -> score
+    skill_total: int = 0
+    challenges_attempted: int = 0
+    challenges_correct: int = 0
+    challenge_points: int = 0
+    chat_sessions: int = 0
+    badges: List[str] = field(default_factory=list)
+    points: int = 0
+    cohorts: Tuple[str, ...] = ("all",)
+
+    @property
+    def avg_skill(self) -> int:
+        return int(self.skill_total / len(self.skill_scores)) if self.skill_scores else 0
+
+    def counters(self) -> Dict[str, int]:
+        return {name: getattr(self, name) for name in COUNTERS}
+
+class GameStatsRepository(ABC):
+    """Persistence for the event-derived counters (one record per user, incremented in place)."""
+
+    @abstractmethod
+    async def load(self, user_id: str) -> Optional[Dict[str, int]]:
+        ...
+
+    @abstractmethod
+    async def load_all(self) -> Dict[str, Dict[str, int]]:
+        ...
+
+    @abstractmethod
+    async def add(self, user_id: str, deltas: Dict[str, int]):
+        ...
+
+class InMemoryGameStatsRepository(GameStatsRepository):
+    def __init__(self):
+        self.counters: Dict[str, Dict[str, int]] = {}
+
+    async def load(self, user_id: str) -> Optional[Dict[str, int]]:
+        return self.counters.get(user_id)
+
+    async def load_all(self) -> Dict[str, Dict[str, int]]:
+        return dict(self.counters)
+
+    async def add(self, user_id: str, deltas: Dict[str, int]):
+        counters = self.counters.setdefault(user_id, dict.fromkeys(COUNTERS, 0))
+        for name, delta in deltas.items():
+            counters[name] += delta
+
+GAME_STATS_T = GameStatsRow.__table__
+
+class SQLGameStatsRepository(GameStatsRepository):
+    """Stores counters next to the profiles, on the profile store's engine; increments are atomic across workers."""
+
+    def __init__(self, store: SQLProfileRepository):
+        self.store = store
+
+    async def load(self, user_id: str) -> Optional[Dict[str, int]]:
+        engine = await self.store.engine()
+        async with engine.connect() as conn:
+            row = (await conn.execute(select(GAME_STATS_T).where(GAME_STATS_T.c.user_id == user_id))).first()
+        return {name: getattr(row, name) for name in COUNTERS} if row is not None else None
+
+    async def load_all(self) -> Dict[str, Dict[str, int]]:
+        engine = await self.store.engine()
+        async with engine.connect() as conn:
+            rows = await conn.execute(select(GAME_STATS_T))
+            return {row.user_id: {name: getattr(row, name) for name in COUNTERS} for row in rows}
+
+    async def add(self, user_id: str, deltas: Dict[str, int]):
+        engine = await self.store.engine()
+        stmt = insert(GAME_STATS_T).values(user_id=user_id, **{name: deltas.get(name, 0) for name in COUNTERS})
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[GAME_STATS_T.c.user_id],
+            set_={name: GAME_STATS_T.c[name] + stmt.excluded[name] for name in deltas},
+        )
+        async with engine.begin() as conn:
+            await conn.execute(stmt)
+
+def cohort_key(degree: Optional[str] = None, semester: Optional[str] = None) -> str:
+    """The narrowest cohort for the given filters ('all' when none)."""
+    return cohort_keys(degree, semester)[-1]
+
+def cohort_keys(degree: Optional[str], semester: Optional[str]) -> Tuple[str, ...]:
+    keys = ["all"]
+    if degree:
+        keys.append(f"degree:{degree.lower()}")
+    if semester:
+        keys.append(f"semester:{semester.lower()}")
+    if degree and semester:
+        keys.append(f"degree:{degree.lower()}|semester:{semester.lower()}")
+    return tuple(keys)
+
 class GamificationEngine:
-    def evaluate(self, profile) -> Dict:
+    """Aggregates and cohort leaderboards in process memory.
+
+    Counters are persisted through ``repo`` and everything is rebuilt from the profile store
+    at startup. With several workers each one sees other workers' events only from its own
+    startup (or the user's first request there), so boards can lag between workers.
+    """
+
+    def __init__(self, log_size: int = 10_000, repo: Optional[GameStatsRepository] = None):
+        self.repo = repo or InMemoryGameStatsRepository()
+        self.stats: Dict[str, UserStats] = {}
+        self.boards: Dict[str, Leaderboard] = {}
+        # Recent events, newest last (bounded; aggregates hold the full history)
+        self.log: Deque[GameEvent] = deque(maxlen=log_size)
+
+    def register_user(self, user_id: str, degree: Optional[str] = None, semester: Optional[str] = None) -> UserStats:
+        stats = self.stats.get(user_id)
+        if stats is None:
+            stats = self.stats[user_id] = UserStats()
+        cohorts = cohort_keys(degree, semester)
+        if cohorts != stats.cohorts:
+            for key in set(stats.cohorts) - set(cohorts):
+                self.boards.get(key, Leaderboard()).discard(user_id)
+            stats.cohorts = cohorts
+        self._publish(user_id, stats)
+        return stats
+
+    async def startup(self, profiles: ProfileRepository):
+        """Rebuild every user's aggregates and the leaderboards from the stored profiles and counters."""
+        counters = await self.repo.load_all()
+        for profile in await profiles.list_profiles():
+            self.seed(profile, counters.get(profile.user_id))
+
+    async def ensure_user(self, profile) -> UserStats:
+        """Seed aggregates from a stored profile the first time this process sees it (e.g. created on another worker)."""
+        stats = self.stats.get(profile.user_id)
+        if stats is None:
+            stats = self.seed(profile, await self.repo.load(profile.user_id))
+        return stats
+
+    def seed(self, profile, counters: Optional[Dict[str, int]] = None) -> UserStats:
+        """Rebuild skill aggregates and cohorts from a profile; counters replace the in-memory ones when given."""
+        stats = self.register_user(profile.user_id, profile.degree, profile.semester)
+        stats.skill_scores, stats.skill_total = {}, 0
+        self._apply_skills(stats, [(s.name, s.score) for s in profile.skills])
+        for name, value in (counters or {}).items():
+            setattr(stats, name, value)
+        self._recompute(stats)
+        self._publish(profile.user_id, stats)
+        return stats
+
+    def reseed(self, profile) -> UserStats:
+        """Rebuild from a replaced (e.g. restored) profile; challenge/chat counts carry over."""
+        return self.seed(profile)
+
+    async def record(self, user_id: str, kind: str, payload: Optional[Dict] = None) -> UserStats:
+        """``emit`` and persist the counters the event changed."""
+        before = self.stats[user_id].counters() if user_id in self.stats else dict.fromkeys(COUNTERS, 0)
+        stats = self.emit(user_id, kind, payload)
+        deltas = {name: value - before[name] for name, value in stats.counters().items() if value != before[name]}
+        if deltas:
+            await self.repo.add(user_id, deltas)
+        return stats
+
+    def emit(self, user_id: str, kind: str, payload: Optional[Dict] = None) -> UserStats:
+        event = GameEvent(user_id=user_id, kind=kind, payload=payload or {})
+        self.log.append(event)
+        return self.apply(event)
+
+    def apply(self, event: GameEvent) -> UserStats:
+        stats = self.stats.get(event.user_id) or self.register_user(event.user_id)
+        if event.kind == SKILL_UPSERTED:
+            self._apply_skills(stats, event.payload.get("skills", ()))
+        elif event.kind == CHALLENGE_ATTEMPTED:
+            stats.challenges_attempted += 1
+            if event.payload.get("correct"):
+                stats.challenges_correct += 1
+                stats.challenge_points += int(event.payload.get("score_delta", 0))
+        elif event.kind == CHAT_SESSION:
+            stats.chat_sessions += 1
+        self._recompute(stats)
+        self._publish(event.user_id, stats)
+        return stats
+
+    @staticmethod
+    def _apply_skills(stats: UserStats, skills: Iterable[Tuple[str, int]]):
+        for name, score in skills:
+            key = name.lower()
+            stats.skill_total += score - stats.skill_scores.get(key, 0)
+            stats.skill_scores[key] = score
+
+    @staticmethod
+    def _recompute(stats: UserStats):
         badges = []
-        skill_count = len(profile.skills)
-        if skill_count >= 1:
+        if len(stats.skill_scores) >= 1:
             badges.append("first_skill")
-        if skill_count >= 5:
+        if len(stats.skill_scores) >= 5:
             badges.append("five_skills")
-        # Placeholder points based on average skill score
-        avg = int(sum(s.score for s in profile.skills)/len(profile.skills)) if profile.skills else 0
-        return {"points": avg * 10, "badges": badges}
+        if stats.challenges_attempted >= 1:
+            badges.append("challenge_start")
+        stats.badges = badges
+        stats.points = stats.avg_skill * 10 + stats.challenge_points + stats.chat_sessions * CHAT_SESSION_POINTS
+
+    def _publish(self, user_id: str, stats: UserStats):
+        for key in stats.cohorts:
+            board = self.boards.get(key)
+            if board is None:
+                board = self.boards[key] = Leaderboard()
+            board.update(user_id, stats.points)
+
+    async def evaluate(self, profile) -> Dict:
+        stats = await self.ensure_user(profile)
+        return {"points": stats.points, "badges": list(stats.badges), "rank": self.rank(profile.user_id)}
+
+    def rank(self, user_id: str, cohort: str = "all") -> Optional[int]:
+        board = self.boards.get(cohort)
+        return board.rank(user_id) if board is not None else None
+
+    def top(self, cohort: str = "all", n: int = 10) -> List[Dict]:
+        board = self.boards.get(cohort)
+        if board is None:
+            return []
+        out: List[Dict] = []
+        for i, (uid, pts) in enumerate(board.top(n)):
+            # Competition ranking, as in rank(): tied users share the rank of the first of them
+            rank = out[-1]["rank"] if out and out[-1]["points"] == pts else i + 1
+            out.append({"rank": rank, "user_id": uid, "points": pts})
+        return out
+
+    def cohort_size(self, cohort: str = "all") -> int:
+        board = self.boards.get(cohort)
+        return len(board) if board is not None else 0
+
+def build_game_stats_repository() -> GameStatsRepository:
+    if isinstance(profile_store, SQLProfileRepository):
+        return SQLGameStatsRepository(profile_store)
+    return InMemoryGameStatsRepository()
+
+gamification_engine = GamificationEngine(repo=build_game_stats_repository())
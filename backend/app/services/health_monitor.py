@@ -0,0 +1,134 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import asyncio
+import logging
+import time
+from ..core.config import get_settings
+from .metrics import metrics
+from .model_router import model_router, model_tag
+from .ollama_client import ollama_client
+
+settings = get_settings()
+
+@dataclass
+class HostHealth:
+    host: str
+    ok: bool
+    latency_ms: float
+    checked_at: float
+    installed: List[str] = field(default_factory=list)  # /api/tags
+    loaded: List[str] = field(default_factory=list)  # /api/ps (models resident in memory)
+    error: Optional[str] = None
+
+    def as_dict(self, now: float) -> Dict:
+        return {
+            "host": self.host,
+            "ok": self.ok,
+            "latency_ms": self.latency_ms,
+            "age_s": round(now - self.checked_at, 1),
+            "installed": self.installed,
+            "loaded": self.loaded,
+            "error": self.error,
+        }
+
+class HealthMonitor:
+    """Probes every model host concurrently on an interval with the cheap listing endpoints.
+
+    Results feed the router (breaker state, installed/loaded models) and are served from
+    ``snapshot`` so health checks never wait on a model server.
+    """
+
+    def __init__(self, interval: float = 15.0, timeout: float = 2.0):
+        self.interval = interval
+        self.timeout = timeout
+        self.hosts: Dict[str, HostHealth] = {}  # host URL -> last result
+        self.probes = 0
+        self._task: Optional[asyncio.Task] = None
+        self._refresh: Optional[asyncio.Task] = None
+
+    async def _probe_host(self, host: str) -> HostHealth:
+        client = ollama_client.client_for(host)
+        start = time.perf_counter()
+        try:
+            tags, ps = await asyncio.gather(
+                client.get("/api/tags", timeout=self.timeout),
+                client.get("/api/ps", timeout=self.timeout),
+                return_exceptions=True,
+            )
+            if isinstance(tags, BaseException):
+                raise tags
+            tags.raise_for_status()
+            installed = sorted(model_tag(m["name"]) for m in tags.json().get("models", []))
+            loaded: List[str] = []
+            # /api/ps is newer than /api/tags; older servers just don't report residency
+            if not isinstance(ps, BaseException) and ps.status_code == 200:
+                loaded = sorted(model_tag(m["name"]) for m in ps.json().get("models", []))
+            latency = time.perf_counter() - start
+            return HostHealth(host, True, round(latency * 1000, 1), time.time(), installed, loaded)
+        except Exception as e:
+            latency = time.perf_counter() - start
+            return HostHealth(host, False, round(latency * 1000, 1), time.time(), error=str(e) or type(e).__name__)
+
+    async def probe_all(self) -> Dict[str, HostHealth]:
+        # Single-laptop setups point several backends at one host: probe it once
+        hosts = sorted({b.host for b in model_router.backends.values()})
+        results = await asyncio.gather(*(self._probe_host(h) for h in hosts))
+        self.hosts = {r.host: r for r in results}
+        self.probes += 1
+        for backend in model_router.backends.values():
+            r = self.hosts[backend.host]
+            model_router.record_probe(
+                backend.name, r.ok, r.latency_ms / 1000, r.error,
+                installed=set(r.installed) if r.ok else None, loaded=set(r.loaded) if r.ok else set(),
+            )
+        return self.hosts
+
+    async def refresh(self) -> Dict[str, HostHealth]:
+        """Probe now; concurrent callers share the same round."""
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(self.probe_all())
+        return await asyncio.shield(self._refresh)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logging.warning(f"Model health probe round failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        for task in (self._task, self._refresh):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._task = self._refresh = None
+
+    def backend_health(self, name: str) -> Optional[HostHealth]:
+        backend = model_router.backends.get(name)
+        return self.hosts.get(backend.host) if backend is not None else None
+
+    def snapshot(self) -> Dict:
+        now = time.time()
+        backends = {}
+        for name, backend in model_router.backends.items():
+            r = self.hosts.get(backend.host)
+            backends[name] = r.as_dict(now) if r is not None else None
+        return {"interval_s": self.interval, "probes": self.probes, "backends": backends}
+
+health_monitor = HealthMonitor(settings.model_health_interval, settings.model_health_timeout)
+
+metrics.gauge("careeriq_backend_up", "1 when the last health probe of the backend's host succeeded",
+              lambda: {(n,): int(r.ok) for n in model_router.backends if (r := health_monitor.backend_health(n)) is not None},
+              ("backend",))
+metrics.gauge("careeriq_backend_probe_latency_seconds", "Latency of the last health probe",
+              lambda: {(n,): r.latency_ms / 1000 for n in model_router.backends if (r := health_monitor.backend_health(n)) is not None},
+              ("backend",))
@@ -1,21 +1,86 @@
-from langdetect import detect
-from typing import Dict
+from functools import lru_cache
+from typing import Dict, List, Optional
+import re
+from ..core.config import get_settings
+from .metrics import metrics, timed
+
+settings = get_settings()
 
 SUPPORTED = {"en": "English", "hi": "Hindi", "te": "Telugu"}
 
+_SPACES = re.compile(r"\s+")
+_detector_ready = False
+
+def _script_guess(text: str) -> Optional[str]:
+    """Decide from Unicode ranges alone; None when the script doesn't settle it."""
+    devanagari = telugu = latin = other = 0
+    for ch in text:
+        o = ord(ch)
+        if 0x0900 <= o <= 0x097F:
+            devanagari += 1
+        elif 0x0C00 <= o <= 0x0C7F:
+            telugu += 1
+        elif ch.isascii():
+            if ch.isalpha():
+                latin += 1
+        elif ch.isalpha():
+            other += 1
+    if devanagari and devanagari >= telugu:
+        return "hi"
+    if telugu:
+        return "te"
+    if latin and not other:
+        # Latin-only text: langdetect has no Latin-script hi/te profiles, so the answer is always 'en'
+        return "en"
+    if not (latin or other):
+        # Digits/punctuation/emoji only
+        return "en"
+    return None
+
+def _langdetect(text: str) -> str:
+    global _detector_ready
+    # Imported lazily: langdetect loads its profiles on first use, not at app startup
+    from langdetect import DetectorFactory, detect
+    if not _detector_ready:
+        DetectorFactory.seed = 0  # deterministic results for the same text
+        _detector_ready = True
+    try:
+        code = detect(text)
+    except Exception:
+        return "en"
+    if code.startswith("hi"):
+        return "hi"
+    if code.startswith("te"):
+        return "te"
+    return "en"
+
+@lru_cache(maxsize=settings.language_cache_size)
+def _detect_normalized(text: str) -> str:
+    return _script_guess(text) or _langdetect(text)
+
+def normalize_text(text: str) -> str:
+    return _SPACES.sub(" ", text).strip().lower()
+
 # Very lightweight placeholder translation (identity / echo) - extend later
 class TranslationService:
-    def translate(self, text: str, target_lang: str) -> Dict:
+    def translate(self, text: str, target_lang: str, detected: Optional[str] = None) -> Dict:
         # In prototype: just return original unless different language
-        return {"original": text, "translated": text, "detected": self.detect_language(text), "target": target_lang, "confidence": 0.75}
+        if detected is None:
+            detected = self.detect_language(text)
+        return {"original": text, "translated": text, "detected": detected, "target": target_lang, "confidence": 0.75}
 
+    @timed("detect_language")
     def detect_language(self, text: str) -> str:
-        try:
-            code = detect(text)
-            if code.startswith("hi"):
-                return "hi"
-            if code.startswith("te"):
-                return "te"
-            return "en"
-        except Exception:
-            return "en"
+        return _detect_normalized(normalize_text(text))
+
+    def detect_many(self, texts: List[str]) -> List[str]:
+        # Duplicates within the batch hit the cache after the first
+        return [self.detect_language(t) for t in texts]
+
+    @staticmethod
+    def cache_info() -> Dict:
+        info = _detect_normalized.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
+
+metrics.gauge("careeriq_language_cache_hits_total", "Language detection LRU hits", lambda: _detect_normalized.cache_info().hits, kind="counter")
+metrics.gauge("careeriq_language_cache_misses_total", "Language detection LRU misses", lambda: _detect_normalized.cache_info().misses, kind="counter")
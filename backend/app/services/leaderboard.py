@@ -0,0 +1,101 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Set, Tuple
+import heapq
+
+class Leaderboard:
+    """Users ranked by integer points, backed by a Fenwick tree over point values.
+
+    update / rank are O(log P) (P = highest points seen, rounded up to a power of
+    two); top(n) is O(k log P) for the k distinct point values it touches. Ties share
+    a rank (competition ranking: 1, 2, 2, 4); top() orders ties by user_id.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._cap = capacity
+        self._tree = [0] * (capacity + 1)
+        self._buckets: Dict[int, Set[str]] = {}
+        self._points: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def _index(self, points: int) -> int:
+        # Highest points map to index 1 so prefix sums count "users ahead of me"
+        return self._cap - points
+
+    def _add(self, i: int, delta: int):
+        tree, cap = self._tree, self._cap
+        while i <= cap:
+            tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, i: int) -> int:
+        total, tree = 0, self._tree
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def _grow(self, points: int):
+        cap = self._cap
+        while cap <= points:
+            cap *= 2
+        self._cap = cap
+        self._tree = [0] * (cap + 1)
+        for p, users in self._buckets.items():
+            self._add(self._index(p), len(users))
+
+    def update(self, user_id: str, points: int):
+        points = max(0, int(points))
+        old = self._points.get(user_id)
+        if old == points:
+            return
+        if points >= self._cap:
+            self._grow(points)
+        if old is not None:
+            self._remove(user_id, old)
+        self._points[user_id] = points
+        self._buckets.setdefault(points, set()).add(user_id)
+        self._add(self._index(points), 1)
+
+    def _remove(self, user_id: str, points: int):
+        bucket = self._buckets[points]
+        bucket.discard(user_id)
+        if not bucket:
+            del self._buckets[points]
+        self._add(self._index(points), -1)
+
+    def discard(self, user_id: str):
+        old = self._points.pop(user_id, None)
+        if old is not None:
+            self._remove(user_id, old)
+
+    def points(self, user_id: str) -> Optional[int]:
+        return self._points.get(user_id)
+
+    def rank(self, user_id: str) -> Optional[int]:
+        points = self._points.get(user_id)
+        if points is None:
+            return None
+        return self._prefix(self._index(points) - 1) + 1
+
+    def _find(self, k: int) -> int:
+        """Smallest index whose prefix sum reaches k (binary lifting)."""
+        pos, step = 0, 1 << (self._cap.bit_length() - 1)
+        while step:
+            nxt = pos + step
+            if nxt <= self._cap and self._tree[nxt] < k:
+                pos = nxt
+                k -= self._tree[nxt]
+            step >>= 1
+        return pos + 1
+
+    def top(self, n: int) -> List[Tuple[str, int]]:
+        out: List[Tuple[str, int]] = []
+        k = 1
+        while len(out) < n and k <= len(self._points):
+            points = self._cap - self._find(k)
+            bucket = self._buckets[points]
+            out.extend((uid, points) for uid in heapq.nsmallest(n - len(out), bucket))
+            k += len(bucket)
+        return out
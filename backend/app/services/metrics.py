@@ -0,0 +1,211 @@
+from __future__ import annotations
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import time
+from starlette.datastructures import MutableHeaders
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PROFILE_HEADER = "x-careeriq-profile"
+
+LabelValues = Tuple[str, ...]
+
+def _labels(names: Sequence[str], values: LabelValues) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in self.values.items():
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_fmt(value)}"
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> per-bucket counts (non-cumulative, last slot is +Inf), then sum, then count
+        self.series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, *labels: str):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def samples(self) -> Iterator[str]:
+        names = self.labelnames + ("le",)
+        for labels, series in self.series.items():
+            running = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                running += count
+                yield f"{self.name}_bucket{_labels(names, labels + (_fmt(bound),))} {running}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_fmt(series[-2])}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {series[-1]}"
+
+class Gauge:
+    """Read at scrape time from existing service state; no bookkeeping on the hot path.
+
+    ``kind="counter"`` exports a monotonically increasing service counter the same way.
+    """
+
+    def __init__(self, name: str, help: str, fn: Callable[[], Union[float, Dict[LabelValues, float]]], labelnames: Sequence[str] = (), kind: str = "gauge"):
+        self.name, self.help, self.labelnames, self.fn, self.kind = name, help, tuple(labelnames), fn, kind
+
+    def samples(self) -> Iterator[str]:
+        value = self.fn()
+        items = value.items() if isinstance(value, dict) else [((), value)]
+        for labels, v in items:
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_fmt(v)}"
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: Dict[str, Union[Counter, Histogram, Gauge]] = {}
+
+    def _register(self, metric):
+        # Re-registration (e.g. module reload) returns the existing instance
+        return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def gauge(self, name: str, help: str, fn: Callable, labelnames: Sequence[str] = (), kind: str = "gauge") -> Gauge:
+        return self._register(Gauge(name, help, fn, labelnames, kind))
+
+    def render(self) -> str:
+        """Prometheus text exposition format (0.0.4)."""
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            try:
+                lines.extend(metric.samples())
+            except Exception as e:
+                lines.append(f"# error collecting {metric.name}: {e}")
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+REQUEST_SECONDS = metrics.histogram("careeriq_http_request_duration_seconds", "HTTP request latency (until the last body chunk)", ("method", "route"))
+REQUESTS_TOTAL = metrics.counter("careeriq_http_requests_total", "HTTP requests by status", ("method", "route", "status"))
+SPAN_SECONDS = metrics.histogram("careeriq_span_duration_seconds", "Duration of instrumented hot-path sections", ("span",))
+
+# Spans recorded for the current request when profiling was asked for (None = not profiling)
+_profile: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("careeriq_profile", default=None)
+
+def record_span(name: str, seconds: float, histogram: Optional[Histogram] = None, labels: LabelValues = ()):
+    if histogram is None:
+        SPAN_SECONDS.observe(seconds, name)
+    else:
+        histogram.observe(seconds, *labels)
+    profile = _profile.get()
+    if profile is not None:
+        profile.append((name, seconds))
+
+@contextmanager
+def span(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - start)
+
+def timed(name: str):
+    """Decorator form of ``span`` for synchronous hot-path functions."""
+    def wrap(fn):
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record_span(name, time.perf_counter() - start)
+        return inner
+    return wrap
+
+def server_timing(spans: List[Tuple[str, float]], total: float) -> str:
+    # Repeated spans (e.g. detect_language on query and answer) are summed
+    merged: Dict[str, List[float]] = {}
+    for name, seconds in spans:
+        entry = merged.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+    parts = [f'{name.replace(".", "-")};dur={secs * 1000:.3f};desc="x{n}"' for name, (secs, n) in merged.items()]
+    parts.append(f"total;dur={total * 1000:.3f}")
+    return ", ".join(parts)
+
+class MetricsMiddleware:
+    """Per-route latency/status metrics; ``X-CareerIQ-Profile: 1`` adds a Server-Timing breakdown.
+
+    Plain ASGI (not BaseHTTPMiddleware) so streamed responses are timed to their last chunk.
+    Server-Timing goes out with the response headers, so streamed bodies only include spans
+    recorded before the first byte.
+    """
+
+    def __init__(self, app, profiling: bool = True):
+        self.app = app
+        self.profiling = profiling
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        token = None
+        spans: Optional[List[Tuple[str, float]]] = None
+        if self.profiling and self._wants_profile(scope):
+            spans = []
+            token = _profile.set(spans)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if spans is not None:
+                    MutableHeaders(scope=message).append("Server-Timing", server_timing(spans, time.perf_counter() - start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            REQUEST_SECONDS.observe(time.perf_counter() - start, scope["method"], path)
+            REQUESTS_TOTAL.inc(scope["method"], path, str(status))
+            if token is not None:
+                _profile.reset(token)
+
+    @staticmethod
+    def _wants_profile(scope) -> bool:
+        for key, value in scope.get("headers", ()):
+            if key == PROFILE_HEADER.encode():
+                return value.strip().lower() in (b"1", b"true", b"on")
+        return False
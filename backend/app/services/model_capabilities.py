@@ -0,0 +1,103 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import json
+import math
+import os
+from ..core.config import get_settings
+
+settings = get_settings()
+
+DEFAULT_CAPABILITIES_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "model_capabilities.json")
+
+@dataclass(frozen=True)
+class TierRule:
+    name: str
+    min_antutu: int = 0
+    min_ram_mb: int = 0
+    min_cores: int = 0
+
+@dataclass(frozen=True)
+class ModelCapability:
+    name: str
+    ram_mb: int
+    server_tokens_per_sec: float
+    local_tokens_per_sec: Dict[str, float] = field(default_factory=dict)  # device tier -> tokens/s
+    context_tokens: int = 2048  # context window the prompt (history included) must fit in
+
+@dataclass(frozen=True)
+class PlacementPolicy:
+    answer_tokens: int = 200  # typical answer length used to compare placements
+    min_local_tokens_per_sec: float = 5.0  # slower than this is not worth running on-device
+    max_ram_fraction: float = 0.35  # share of device RAM a local model may take
+    server_rtt_s: float = 0.3
+    local_preference: float = 1.5  # run locally unless the server is this much faster (frees shared capacity)
+
+class CapabilityTable:
+    """Per-model RAM footprint and throughput by device tier, loaded from a JSON file."""
+
+    def __init__(self, models: List[ModelCapability], tiers: List[TierRule], policy: PlacementPolicy, default_model: str):
+        self.models: Dict[str, ModelCapability] = {m.name: m for m in models}
+        self.tiers = tiers  # best first; the last rule should match everything
+        self.policy = policy
+        self.default_model = default_model
+        # Tier-only local throughput (no RAM info), precomputed for requests without a registered device
+        self.tier_local: Dict[str, Dict[str, float]] = {t.name: self.local_plan(t.name) for t in tiers}
+
+    @classmethod
+    def from_file(cls, path: str) -> "CapabilityTable":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        models = [
+            ModelCapability(
+                name=m["name"], ram_mb=int(m["ram_mb"]), server_tokens_per_sec=float(m["server_tokens_per_sec"]),
+                local_tokens_per_sec={k: float(v) for k, v in m.get("local_tokens_per_sec", {}).items()},
+                context_tokens=int(m.get("context_tokens", 2048)),
+            )
+            for m in data["models"]
+        ]
+        tiers = [TierRule(**t) for t in data["tiers"]]
+        policy = PlacementPolicy(**data.get("placement", {}))
+        return cls(models, tiers, policy, data.get("default_model") or models[0].name)
+
+    def classify(self, ram_mb: int, cpu_cores: int, antutu: Optional[int] = None) -> str:
+        """First tier whose AnTuTu floor (when given) or RAM and core floors the device meets.
+
+        Without an AnTuTu score this is stricter than the old ``cores * 50000 + ram_mb * 50``
+        estimate: 4096 MB / 4 cores used to be mid_range and is budget here (mid_range needs 6 cores).
+        """
+        for rule in self.tiers:
+            if antutu is not None:
+                if antutu >= rule.min_antutu:
+                    return rule.name
+            elif ram_mb >= rule.min_ram_mb and cpu_cores >= rule.min_cores:
+                return rule.name
+        return self.tiers[-1].name
+
+    def local_plan(self, tier: str, ram_mb: Optional[int] = None) -> Dict[str, float]:
+        """Models this device can run at a useful speed -> expected tokens/s."""
+        plan = {}
+        for m in self.models.values():
+            tps = m.local_tokens_per_sec.get(tier, 0.0)
+            if tps < self.policy.min_local_tokens_per_sec:
+                continue
+            if ram_mb is not None and m.ram_mb > ram_mb * self.policy.max_ram_fraction:
+                continue
+            plan[m.name] = tps
+        return plan
+
+    def context_tokens(self, model: str) -> int:
+        cap = self.models.get(model)
+        return cap.context_tokens if cap is not None else 2048
+
+    def local_seconds(self, tokens_per_sec: float) -> float:
+        return self.policy.answer_tokens / tokens_per_sec if tokens_per_sec > 0 else math.inf
+
+    def server_seconds(self, model: str, load: float) -> float:
+        # Throughput degrades roughly with the backend's share of busy slots
+        cap = self.models.get(model)
+        if cap is None:
+            return math.inf
+        return self.policy.answer_tokens / cap.server_tokens_per_sec * (1 + load) + self.policy.server_rtt_s
+
+capability_table = CapabilityTable.from_file(settings.model_capabilities_path or DEFAULT_CAPABILITIES_PATH)
@@ -1,31 +1,220 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Optional
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional
+import math
 import time
+from ..core.config import get_settings
+from .metrics import metrics, timed
+from .model_capabilities import capability_table
 
-PRIMARY_HEAVY = {"llama3.2:3b", "llama3.2:1b"}
-LIGHT_MODELS = {"smollm:135m", "gemma3:270m"}
+settings = get_settings()
+
+SECONDARY_MODELS = {"smollm:135m"}  # secondary server only hosts the lightest model
+LOCALHOST = "http://127.0.0.1:11434"
+
+def model_tag(name: str) -> str:
+    # Ollama treats "llama3" and "llama3:latest" as the same model
+    return name if ":" in name else f"{name}:latest"
+
+# Circuit breaker states
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
 
 @dataclass
 class ModelDecision:
     model: str
-    route: str  # 'primary' | 'secondary' | 'local'
+    route: str  # 'primary' | 'secondary' | 'localhost' | 'local'
     reason: str
+    host: Optional[str] = None
+
+@dataclass
+class Backend:
+    name: str
+    host: str
+    capacity: int
+    models: Optional[set] = None  # None = any model
+    fallback_only: bool = False  # only used when no regular backend is available
+    in_flight: int = 0
+    ewma_latency: float = 0.0  # seconds, successful requests only
+    outcomes: Deque[bool] = field(default_factory=lambda: deque(maxlen=20))
+    consecutive_failures: int = 0
+    state: str = CLOSED
+    opened_at: float = 0.0
+    trial_in_flight: bool = False
+    last_probe: Optional[Dict] = None
+    # From the health monitor: models pulled on the host (/api/tags; None = not probed yet) and models in memory (/api/ps)
+    installed: Optional[set] = None
+    loaded: set = field(default_factory=set)
+
+    def supports(self, model: str) -> bool:
+        if self.models is not None and model not in self.models:
+            return False
+        return self.installed is None or model_tag(model) in self.installed
+
+    def is_loaded(self, model: str) -> bool:
+        return model_tag(model) in self.loaded
+
+    @property
+    def error_rate(self) -> float:
+        return (self.outcomes.count(False) / len(self.outcomes)) if self.outcomes else 0.0
+
+    @property
+    def saturated(self) -> bool:
+        return self.in_flight >= self.capacity
+
+    def available(self, now: float) -> bool:
+        if self.state == OPEN and now - self.opened_at >= settings.model_server_reset_timeout:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            # Allow a single trial request through
+            return not self.trial_in_flight
+        return self.state == CLOSED
+
+    def stats(self) -> Dict:
+        return {
+            "host": self.host,
+            "state": self.state,
+            "in_flight": self.in_flight,
+            "capacity": self.capacity,
+            "ewma_latency_ms": round(self.ewma_latency * 1000, 1),
+            "error_rate": round(self.error_rate, 3),
+            "consecutive_failures": self.consecutive_failures,
+            "last_probe": self.last_probe,
+            "installed": sorted(self.installed) if self.installed is not None else None,
+            "loaded": sorted(self.loaded),
+        }
 
 class ModelRouter:
-    def __init__(self):
-        self.primary_load = 0
-        self.secondary_load = 0
+    def __init__(self, backends: Optional[List[Backend]] = None):
+        if backends is None:
+            # Secondary listed first so light models prefer it when loads tie (keeps primary free for heavy models)
+            backends = [
+                Backend("secondary", settings.model_server_secondary, settings.model_server_secondary_capacity, models=SECONDARY_MODELS),
+                Backend("primary", settings.model_server_primary, settings.model_server_primary_capacity),
+                Backend("localhost", LOCALHOST, settings.model_server_primary_capacity, fallback_only=True),
+            ]
+        # Secondary may be unset; the same host may also be configured twice (single-laptop setups)
+        self.backends: Dict[str, Backend] = {b.name: b for b in backends if b.host}
+        self.decisions: Deque[Dict] = deque(maxlen=100)
 
-    def decide(self, requested: Optional[str], tier: str, allow_local: bool) -> ModelDecision:
+    def candidates(self, model: str, preferred: Optional[str] = None) -> List[Backend]:
+        """Available backends for ``model``, best first (least loaded, then fastest)."""
         now = time.time()
-        # Basic heuristic: if heavy or not allowed local -> server
-        if requested in PRIMARY_HEAVY:
-            return ModelDecision(model=requested or "llama3.2:1b", route="primary", reason="heavy_model")
-        if allow_local and requested in LIGHT_MODELS and tier in {"premium", "mid_range"}:
-            return ModelDecision(model=requested, route="local", reason="local_capable")
-        # fallback selection
-        if tier in {"legacy", "budget"} and requested == "gemma3:270m":
-            return ModelDecision(model="gemma3:270m", route="primary", reason="needs_server")
-        # default light
-        return ModelDecision(model=requested or "smollm:135m", route="secondary", reason="light_distributed")
+        ranked = sorted(
+            (b for b in self.backends.values() if b.supports(model) and b.available(now)),
+            # A host with the model already in memory skips the cold load
+            key=lambda b: (b.fallback_only, b.saturated, not b.is_loaded(model), b.name != preferred, b.in_flight / b.capacity, b.ewma_latency),
+        )
+        return ranked
+
+    def _route(self, model: str, reason: str, ranked: Optional[List[Backend]] = None) -> ModelDecision:
+        ranked = self.candidates(model) if ranked is None else ranked
+        if ranked:
+            backend = ranked[0]
+            decision = ModelDecision(model=model, route=backend.name, reason=reason, host=backend.host)
+        else:
+            # Every circuit open: still hand out primary so the caller surfaces the error
+            decision = ModelDecision(model=model, route="primary", reason=f"{reason}:no_healthy_backend", host=settings.model_server_primary)
+        return decision
+
+    @timed("router.decide")
+    def decide(
+        self, requested: Optional[str], tier: str, allow_local: bool, local_tps: Optional[Dict[str, float]] = None,
+    ) -> ModelDecision:
+        """Fastest feasible placement: on-device vs the best server backend, from the capability table.
+
+        ``local_tps`` is the user's precomputed device plan (model -> tokens/s); without one the
+        tier-level table row is used.
+        """
+        model = requested or capability_table.default_model
+        ranked = self.candidates(model)
+        if model not in capability_table.models:
+            decision = self._route(model, "unlisted_model", ranked)
+        else:
+            if local_tps is None:
+                local_tps = capability_table.tier_local.get(tier, {})
+            local_s = capability_table.local_seconds(local_tps.get(model, 0.0)) if allow_local else math.inf
+            best = ranked[0] if ranked else None
+            server_s = capability_table.server_seconds(model, best.in_flight / best.capacity) if best else math.inf
+            if local_s < math.inf and local_s <= server_s * capability_table.policy.local_preference:
+                decision = ModelDecision(model=model, route="local", reason="local_faster" if best else "server_unavailable")
+            else:
+                decision = self._route(model, "local_infeasible" if local_s == math.inf else "server_faster", ranked)
+        self.decisions.append({"ts": time.time(), "model": decision.model, "route": decision.route, "reason": decision.reason})
+        return decision
+
+    @asynccontextmanager
+    async def track(self, backend: Backend):
+        """Account one upstream request: in-flight count, latency EWMA, error rate and breaker state."""
+        trial = backend.state == HALF_OPEN
+        if trial:
+            backend.trial_in_flight = True
+        backend.in_flight += 1
+        start = time.perf_counter()
+        try:
+            yield backend
+        except Exception:
+            self.record_failure(backend)
+            raise
+        else:
+            self.record_success(backend, time.perf_counter() - start)
+        finally:
+            backend.in_flight -= 1
+            if trial:
+                backend.trial_in_flight = False
+
+    def record_success(self, backend: Backend, latency: float):
+        alpha = settings.model_server_ewma_alpha
+        backend.ewma_latency = latency if not backend.ewma_latency else alpha * latency + (1 - alpha) * backend.ewma_latency
+        backend.outcomes.append(True)
+        backend.consecutive_failures = 0
+        backend.state = CLOSED
+
+    def record_failure(self, backend: Backend):
+        backend.outcomes.append(False)
+        self._count_failure(backend)
+
+    @staticmethod
+    def _count_failure(backend: Backend):
+        # Requests and health probes share one consecutive-failure count and threshold
+        backend.consecutive_failures += 1
+        if backend.state == HALF_OPEN or backend.consecutive_failures >= settings.model_server_failure_threshold:
+            backend.state = OPEN
+            backend.opened_at = time.time()
+
+    def record_probe(
+        self, name: str, ok: bool, latency: float, error: Optional[str] = None,
+        installed: Optional[set] = None, loaded: Optional[set] = None,
+    ):
+        backend = self.backends.get(name)
+        if backend is None:
+            return
+        backend.last_probe = {"ts": time.time(), "ok": ok, "latency_ms": round(latency * 1000, 1), "error": error}
+        if installed is not None:
+            backend.installed = installed
+        if loaded is not None:
+            backend.loaded = loaded
+        if ok:
+            backend.consecutive_failures = 0
+            if backend.state == OPEN:
+                # Host answers again: let the next real request through as a trial
+                backend.state = HALF_OPEN
+        else:
+            # One slow probe is not an outage; outcomes stay request-only so error_rate isn't skewed
+            self._count_failure(backend)
+
+    def snapshot(self) -> Dict:
+        return {
+            "backends": {name: b.stats() for name, b in self.backends.items()},
+            "recent_decisions": list(self.decisions)[-20:],
+        }
+
+model_router = ModelRouter()
+
+metrics.gauge("careeriq_backend_in_flight", "Generations in flight per model backend",
+              lambda: {(b.name,): b.in_flight for b in model_router.backends.values()}, ("backend",))
+metrics.gauge("careeriq_backend_ewma_latency_seconds", "EWMA latency of successful generations per backend",
+              lambda: {(b.name,): b.ewma_latency for b in model_router.backends.values()}, ("backend",))
+metrics.gauge("careeriq_backend_circuit_open", "1 when the backend's circuit breaker is not closed",
+              lambda: {(b.name,): int(b.state != CLOSED) for b in model_router.backends.values()}, ("backend",))
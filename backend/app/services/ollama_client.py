@@ -1,39 +1,132 @@
+import asyncio
+import json
+import time
 import httpx
-from typing import Optional, Dict
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Optional, Union
 from ..core.config import get_settings
+from .admission import admission, DEFAULT_PRIORITY
+from .metrics import metrics, record_span
+from .model_router import model_router
+from .single_flight import SingleFlight
 
 settings = get_settings()
 
+GENERATION_QUEUE = metrics.histogram("careeriq_generation_queue_seconds", "Wait for a model-server slot", ("backend",))
+GENERATION_TTFB = metrics.histogram("careeriq_generation_ttfb_seconds", "Admission to first token", ("model", "backend"))
+GENERATION_TOTAL = metrics.histogram("careeriq_generation_seconds", "Admission to last token", ("model", "backend", "outcome"))
+
+@dataclass(frozen=True)
+class Served:
+    """Stream marker ahead of the first token: the backend that actually answered."""
+    backend: str
+    fallback: bool  # an earlier backend failed before producing tokens
+
+class GenerationError(Exception):
+    """The model server reported a failure inside a 200 stream (an ``{"error": ...}`` line)."""
+
 class OllamaClient:
     def __init__(self, timeout: float = 60.0):
         self.timeout = timeout
+        # One long-lived keep-alive pool per model host
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        # Identical concurrent (model, prompt) generations share one upstream call
+        self.coalesce = settings.model_server_coalesce
+        self.flights = SingleFlight()
+
+    def client_for(self, base: str) -> httpx.AsyncClient:
+        client = self._clients.get(base)
+        if client is None or client.is_closed:
+            limits = httpx.Limits(
+                max_connections=settings.model_server_max_connections,
+                max_keepalive_connections=settings.model_server_max_keepalive,
+                keepalive_expiry=settings.model_server_keepalive_expiry,
+            )
+            client = httpx.AsyncClient(base_url=base, timeout=self.timeout, limits=limits)
+            self._clients[base] = client
+        return client
+
+    async def startup(self):
+        for backend in model_router.backends.values():
+            self.client_for(backend.host)
 
-    async def generate(self, model: str, prompt: str) -> str:
-        # Decide which server based on model weight
-        base = settings.model_server_primary
-        if model.startswith("smollm"):
-            # attempt secondary first
-            base = settings.model_server_secondary or settings.model_server_primary
-        url = f"{base}/api/generate"
-        payload = {"model": model, "prompt": prompt, "stream": False}
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+    async def aclose(self):
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+
+    async def _stream_from(self, base: str, model: str, prompt: str) -> AsyncIterator[str]:
+        payload = {"model": model, "prompt": prompt, "stream": True}
+        async with self.client_for(base).stream("POST", "/api/generate", json=payload) as r:
+            r.raise_for_status()
+            # Ollama streams NDJSON: {'response': '<token>', 'done': false} ... {'done': true}
+            async for line in r.aiter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    # Model missing, OOM, load failure: fail the attempt so fallback and the breaker see it
+                    raise GenerationError(chunk["error"])
+                if chunk.get("response"):
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    return
+        raise GenerationError("stream ended before done")
+
+    def stream(self, model: str, prompt: str, route: Optional[str] = None, priority: int = DEFAULT_PRIORITY) -> AsyncIterator[Union[Served, str]]:
+        """Answer tokens, preceded by one ``Served`` marker when a backend answers."""
+        if not self.coalesce:
+            return self._stream_routed(model, prompt, route, priority)
+        # Followers join the leader's flight and need no slot of their own
+        return self.flights.stream((model, prompt), lambda: self._stream_routed(model, prompt, route, priority))
+
+    async def _stream_routed(self, model: str, prompt: str, route: Optional[str] = None, priority: int = DEFAULT_PRIORITY) -> AsyncIterator[Union[Served, str]]:
+        # Try the routed backend first, then the next least-loaded healthy one
+        candidates = model_router.candidates(model, preferred=route)
+        if not candidates:
+            yield "(generation error: no healthy model server available)"
+            return
+        # Waits for a slot or raises AdmissionRejected (mapped to 429/503 by the app)
+        queued_at = time.perf_counter()
+        backend = await admission.acquire(candidates, priority)
+        record_span("generate.queue", time.perf_counter() - queued_at, GENERATION_QUEUE, (backend.name,))
+        tried = set()
+        errors = []
+        while backend is not None:
+            tried.add(backend.name)
+            emitted = False
+            outcome = "error"
+            start = time.perf_counter()
             try:
-                r = await client.post(url, json=payload)
-                r.raise_for_status()
-                data = r.json()
-                # Ollama returns {'response': '...'}
-                return data.get("response", "")
+                async with model_router.track(backend):
+                    async for token in self._stream_from(backend.host, model, prompt):
+                        if not emitted:
+                            emitted = True
+                            record_span("generate.ttfb", time.perf_counter() - start, GENERATION_TTFB, (model, backend.name))
+                            yield Served(backend.name, bool(errors))
+                        yield token
+                outcome = "ok"
+                if not emitted:
+                    yield Served(backend.name, bool(errors))
+                return
+            except (GeneratorExit, asyncio.CancelledError):
+                outcome = "cancelled"
+                raise
             except Exception as e:
-                # Fallback attempt to localhost if not already localhost
-                if "127.0.0.1" not in base and "localhost" not in base:
-                    try:
-                        fallback_url = "http://127.0.0.1:11434/api/generate"
-                        r2 = await client.post(fallback_url, json=payload)
-                        r2.raise_for_status()
-                        data2 = r2.json()
-                        return data2.get("response", "") + " (fallback localhost)"
-                    except Exception as e2:
-                        return f"(generation error: {e}; localhost fallback: {e2})"
-                return f"(generation error: {e})"
+                if emitted:
+                    # Tokens already reached the caller; can't replay on another host
+                    yield f" (generation error: {e})"
+                    return
+                errors.append(f"{backend.name}: {e}")
+            finally:
+                admission.release(backend)
+                record_span("generate.total", time.perf_counter() - start, GENERATION_TOTAL, (model, backend.name, outcome))
+            # Fall back only onto backends with a free slot; don't queue twice
+            backend = admission.try_acquire([b for b in candidates if b.name not in tried])
+        yield f"(generation error: {'; '.join(errors)})"
+
+    async def generate(self, model: str, prompt: str, route: Optional[str] = None, priority: int = DEFAULT_PRIORITY) -> str:
+        # Non-streaming callers aggregate the same token stream
+        return "".join([token async for token in self.stream(model, prompt, route, priority) if isinstance(token, str)])
 
 ollama_client = OllamaClient()
@@ -0,0 +1,233 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import asyncio
+import csv
+import json
+import os
+import numpy as np
+from ..core.config import get_settings
+
+settings = get_settings()
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "opportunities.json")
+
+@dataclass
+class CatalogEntry:
+    id: str
+    title: str
+    company: Optional[str] = None
+    location: Optional[str] = None
+    url: Optional[str] = None
+    source: Optional[str] = None
+    required: Dict[str, float] = field(default_factory=dict)  # lowercased skill -> weight
+
+def _parse_required(items: Iterable[str]) -> Dict[str, float]:
+    """'Python:2' -> {'python': 2.0}; weight defaults to 1."""
+    required: Dict[str, float] = {}
+    for item in items:
+        name, sep, weight = item.strip().rpartition(":")
+        try:
+            value = float(weight) if sep else 1.0
+        except ValueError:
+            name, value = item.strip(), 1.0
+        if not sep:
+            name = weight
+        name = name.strip().lower()
+        if name:
+            required[name] = value
+    return required
+
+def load_catalog(path: str) -> List[CatalogEntry]:
+    """Load opportunities from JSON (list of objects) or CSV (required_skills separated by ';')."""
+    entries = []
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        for row in rows:
+            row["required_skills"] = [s for s in (row.get("required_skills") or "").split(";") if s.strip()]
+    else:
+        with open(path, encoding="utf-8") as f:
+            rows = json.load(f)
+    for row in rows:
+        entries.append(CatalogEntry(
+            id=str(row["id"]),
+            title=row["title"],
+            company=row.get("company") or None,
+            location=row.get("location") or None,
+            url=row.get("url") or None,
+            source=row.get("source") or None,
+            required=_parse_required(row.get("required_skills") or []),
+        ))
+    return entries
+
+class OpportunityIndex:
+    """Inverted skill index over the catalog, scored with NumPy.
+
+    Each skill column holds a postings list (opportunity rows + weights). A
+    user's score vector is one ``np.bincount`` over the postings of the skills
+    they have, so cost scales with matching postings, not catalog size.
+    Score = sum(weight * user_skill_score) / sum(weight), i.e. weighted coverage.
+    """
+
+    def __init__(self):
+        self.vocab: Dict[str, int] = {}
+        self.entries: List[Optional[CatalogEntry]] = []
+        self.row_of: Dict[str, int] = {}
+        self._post_rows: List[np.ndarray] = []
+        self._post_weights: List[np.ndarray] = []
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._active = np.zeros(0, dtype=bool)
+        self.tombstones = 0
+
+    def __len__(self) -> int:
+        return len(self.row_of)
+
+    def _column(self, skill: str) -> int:
+        col = self.vocab.get(skill)
+        if col is None:
+            col = self.vocab[skill] = len(self.vocab)
+            self._post_rows.append(np.zeros(0, dtype=np.int32))
+            self._post_weights.append(np.zeros(0, dtype=np.float32))
+        return col
+
+    def apply(self, upserts: Sequence[CatalogEntry], removed: Iterable[str] = ()):
+        """Incrementally add/replace/remove opportunities; only touched skill columns are rebuilt."""
+        for opp_id in removed:
+            self._retire(opp_id)
+        # A catalog may list an id twice: the last entry wins, as with a later upsert
+        upserts = list({entry.id: entry for entry in upserts}.values())
+        start = len(self.entries)
+        new_rows: Dict[int, List[int]] = {}
+        new_weights: Dict[int, List[float]] = {}
+        norms = []
+        for offset, entry in enumerate(upserts):
+            # Changed entries are retired and re-appended as a fresh row
+            self._retire(entry.id)
+            row = start + offset
+            self.entries.append(entry)
+            self.row_of[entry.id] = row
+            norms.append(sum(entry.required.values()))
+            for skill, weight in entry.required.items():
+                col = self._column(skill)
+                new_rows.setdefault(col, []).append(row)
+                new_weights.setdefault(col, []).append(weight)
+        self._norms = np.concatenate([self._norms, np.asarray(norms, dtype=np.float32)])
+        self._active = np.concatenate([self._active, np.ones(len(upserts), dtype=bool)])
+        for col, rows in new_rows.items():
+            self._post_rows[col] = np.concatenate([self._post_rows[col], np.asarray(rows, dtype=np.int32)])
+            self._post_weights[col] = np.concatenate([self._post_weights[col], np.asarray(new_weights[col], dtype=np.float32)])
+        if self.tombstones > max(1000, len(self.entries) // 4):
+            self._compact()
+
+    def _retire(self, opp_id: str):
+        row = self.row_of.pop(opp_id, None)
+        if row is not None:
+            self._active[row] = False
+            self.entries[row] = None
+            self.tombstones += 1
+
+    def _compact(self):
+        live = [e for e in self.entries if e is not None]
+        self.__init__()
+        self.apply(live)
+
+    def user_vector(self, skills: Iterable[Tuple[str, int]]) -> Tuple[np.ndarray, np.ndarray]:
+        """(columns, values) for the skills present in the vocabulary; values are score / 100."""
+        cols, vals = [], []
+        for name, score in skills:
+            col = self.vocab.get(name.lower())
+            if col is not None:
+                cols.append(col)
+                vals.append(score / 100.0)
+        return np.asarray(cols, dtype=np.int64), np.asarray(vals, dtype=np.float32)
+
+    def score_batch(self, users: Sequence[Tuple[np.ndarray, np.ndarray]]) -> np.ndarray:
+        """Scores for many users at once: (n_users, n_rows) weighted coverage in [0, 1]."""
+        n = len(self.entries)
+        flat_idx, flat_w = [], []
+        for u, (cols, vals) in enumerate(users):
+            for col, val in zip(cols, vals):
+                rows = self._post_rows[col]
+                flat_idx.append(rows.astype(np.int64) + u * n)
+                flat_w.append(self._post_weights[col] * val)
+        if flat_idx:
+            totals = np.bincount(np.concatenate(flat_idx), weights=np.concatenate(flat_w), minlength=len(users) * n)
+        else:
+            totals = np.zeros(len(users) * n)
+        scores = totals.reshape(len(users), n)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.where(self._norms > 0, scores / self._norms, 0.0)
+        scores[:, ~self._active] = -1.0
+        return scores
+
+    def top_k(self, scores: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """Best ``k`` active rows for one user's score vector, highest first."""
+        k = min(k, len(self))
+        if k <= 0:
+            return []
+        idx = np.argpartition(-scores, k - 1)[:k]
+        idx = idx[np.argsort(-scores[idx], kind="stable")]
+        # Zero coverage is not a match
+        return [(int(i), float(scores[i])) for i in idx if scores[i] > 0]
+
+class OpportunityMatcher:
+    """Keeps the index in sync with the catalog file (reloaded incrementally on mtime change)."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or DEFAULT_CATALOG_PATH
+        self.index = OpportunityIndex()
+        self._mtime: Optional[float] = None
+        self._signatures: Dict[str, CatalogEntry] = {}
+        self._lock = asyncio.Lock()
+
+    def stale(self) -> bool:
+        try:
+            return os.path.getmtime(self.path) != self._mtime
+        except OSError:
+            return False
+
+    def load_changes(self) -> Tuple[float, List[CatalogEntry], List[str]]:
+        """Parse the catalog and diff it against what is indexed (safe to run in a thread)."""
+        mtime = os.path.getmtime(self.path)
+        entries = load_catalog(self.path)
+        current = {e.id: e for e in entries}
+        upserts = [e for e in current.values() if self._signatures.get(e.id) != e]
+        removed = [opp_id for opp_id in self._signatures if opp_id not in current]
+        return mtime, upserts, removed
+
+    def apply_changes(self, mtime: float, upserts: List[CatalogEntry], removed: List[str]):
+        self.index.apply(upserts, removed)
+        for opp_id in removed:
+            self._signatures.pop(opp_id, None)
+        for entry in upserts:
+            self._signatures[entry.id] = entry
+        self._mtime = mtime
+
+    def refresh(self):
+        if self.stale():
+            self.apply_changes(*self.load_changes())
+
+    async def ensure_fresh(self):
+        """Reload off the event loop when the catalog file changed; concurrent callers wait for one reload."""
+        if not self.stale():
+            return
+        async with self._lock:
+            if self.stale():
+                self.apply_changes(*await asyncio.to_thread(self.load_changes))
+
+    def match_page(self, skills: Iterable[Tuple[str, int]], offset: int, limit: int) -> Tuple[List[Tuple[CatalogEntry, int]], int]:
+        """One page of a user's ranked matches plus the total number of matching opportunities."""
+        scores = self.index.score_batch([self.index.user_vector(skills)])[0]
+        ranked = self.index.top_k(scores, offset + limit)[offset:]
+        return [(self.index.entries[row], int(round(score * 100))) for row, score in ranked], int((scores > 0).sum())
+
+    def match_many(self, users: Sequence[Iterable[Tuple[str, int]]], k: int) -> List[List[Tuple[CatalogEntry, int]]]:
+        vectors = [self.index.user_vector(skills) for skills in users]
+        scores = self.index.score_batch(vectors)
+        return [
+            [(self.index.entries[row], int(round(score * 100))) for row, score in self.index.top_k(user_scores, k)]
+            for user_scores in scores
+        ]
+
+opportunity_matcher = OpportunityMatcher(settings.opportunities_catalog_path or None)
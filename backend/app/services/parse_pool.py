@@ -0,0 +1,58 @@
+import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+from ..core.config import get_settings
+from .metrics import record_span
+from .parsing import SpooledDocument, document_format, parse_document
+
+settings = get_settings()
+
+class ParsePool:
+    """Bounded process pool so resume parsing never blocks the event loop."""
+
+    def __init__(self, workers: int, cache_entries: int):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        # (sha256 of upload, detected format) -> inferred skills; re-uploads skip extraction entirely
+        self._cache: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        self.cache_entries = cache_entries
+        self.cache_hits = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def parse(self, doc: SpooledDocument, filename: str) -> List[Dict]:
+        # The filename decides the format too, so the same bytes as .pdf and .txt parse differently
+        key = f"{doc.digest}:{document_format(doc.path, filename)}"
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return [dict(s) for s in cached]
+        if self._slots is None:
+            # Keep at most two queued documents per worker; extra callers wait here, not in the pool
+            self._slots = asyncio.Semaphore(self.workers * 2)
+        queued_at = time.perf_counter()
+        async with self._slots:
+            record_span("parse.queue", time.perf_counter() - queued_at)
+            loop = asyncio.get_running_loop()
+            skills, timings = await loop.run_in_executor(self._pool(), parse_document, doc.path, filename)
+        for name, seconds in timings.items():
+            record_span(name, seconds)
+        self._cache[key] = skills
+        if len(self._cache) > self.cache_entries:
+            self._cache.popitem(last=False)
+        return [dict(s) for s in skills]
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._slots = None
+
+parse_pool = ParsePool(settings.resume_parse_workers, settings.resume_parse_cache_entries)
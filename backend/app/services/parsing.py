@@ -1,35 +1,150 @@
-from typing import List, Dict
-import re
+from dataclasses import dataclass
+from typing import BinaryIO, List, Dict, Tuple, Union
+import hashlib
+import io
+import os
+import tempfile
+import time
+from ..core.config import get_settings
+from .skill_taxonomy import SkillMatcher
 
-TECH_KEYWORDS = [
-    "python", "sql", "excel", "machine learning", "ml", "data analysis", "c++", "java", "javascript", "react", "cloud", "gcp", "aws", "azure",
-    # Added AI-related terms
-    "ai", "artificial intelligence", "generative ai", "llm", "nlp", "deep learning"
-]
+settings = get_settings()
+
+MAX_POSITIONS_IN_EVIDENCE = 5
+CHUNK_SIZE = 64 * 1024
+
+class DocumentTooLarge(ValueError):
+    pass
+
+class UnreadableDocument(ValueError):
+    """A PDF/DOCX that could not be extracted (corrupt, encrypted or mislabelled)."""
+
+@dataclass
+class SpooledDocument:
+    path: str
+    digest: str  # sha256 of the raw upload, used as the parse-cache key
+    size: int
+
+def spool_to_disk(src: BinaryIO, max_bytes: int) -> SpooledDocument:
+    """Copy ``src`` to a temp file in chunks, hashing as we go and enforcing the size cap."""
+    sha = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(prefix="careeriq-resume-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = src.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise DocumentTooLarge(f"file exceeds {max_bytes} bytes")
+                sha.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return SpooledDocument(path=path, digest=sha.hexdigest(), size=size)
+
+def _detect_format(head: bytes, filename: str) -> str:
+    name = (filename or "").lower()
+    if head.startswith(b"%PDF") or name.endswith(".pdf"):
+        return "pdf"
+    if head.startswith(b"PK") and (name.endswith(".docx") or not name.endswith(".zip")):
+        return "docx"
+    return "text"
+
+def document_format(path: str, filename: str) -> str:
+    """Format ``extract_text`` will use for this file: 'pdf' | 'docx' | 'text'."""
+    with open(path, "rb") as f:
+        return _detect_format(f.read(8), filename)
 
 class ResumeParser:
-    def extract_text(self, content: bytes, filename: str) -> str:
-        # Placeholder: naive decode
+    def __init__(self, matcher: SkillMatcher = None):
+        # Compiled once from the taxonomy file, reused for every resume
+        self.matcher = matcher or SkillMatcher.from_file(settings.skills_taxonomy_path or None)
+
+    def extract_text(self, content: Union[bytes, BinaryIO], filename: str) -> str:
+        """Format-aware text extraction (PDF, DOCX, plain text) from bytes or a seekable file."""
+        handle = io.BytesIO(content) if isinstance(content, (bytes, bytearray)) else content
+        head = handle.read(8)
+        handle.seek(0)
+        kind = _detect_format(head, filename)
         try:
-            return content.decode("utf-8", errors="ignore")
-        except Exception:
-            return ""
+            if kind == "pdf":
+                text = self._extract_pdf(handle)
+            elif kind == "docx":
+                text = self._extract_docx(handle)
+            else:
+                text = self._extract_plain(handle)
+        except (ImportError, DocumentTooLarge):
+            raise
+        except Exception as e:
+            # Decoding the raw binary would only feed garbage to skill extraction
+            raise UnreadableDocument(f"could not read {kind.upper()}: {e}") from e
+        return text[:settings.resume_max_text_chars]
+
+    def _extract_pdf(self, handle: BinaryIO) -> str:
+        from pypdf import PdfReader
+        reader = PdfReader(handle)
+        if len(reader.pages) > settings.resume_max_pages:
+            raise DocumentTooLarge(f"PDF has {len(reader.pages)} pages; limit is {settings.resume_max_pages}")
+        parts, total = [], 0
+        for page in reader.pages:
+            chunk = page.extract_text() or ""
+            parts.append(chunk)
+            total += len(chunk)
+            if total >= settings.resume_max_text_chars:
+                break
+        return "\n".join(parts)
+
+    def _extract_docx(self, handle: BinaryIO) -> str:
+        from docx import Document
+        doc = Document(handle)
+        parts, total = [], 0
+        blocks = [p.text for p in doc.paragraphs]
+        for table in doc.tables:
+            for row in table.rows:
+                blocks.append(" ".join(cell.text for cell in row.cells))
+        for block in blocks:
+            parts.append(block)
+            total += len(block)
+            if total >= settings.resume_max_text_chars:
+                break
+        return "\n".join(parts)
+
+    def _extract_plain(self, handle: BinaryIO) -> str:
+        # Bounded read (worst case 4 bytes per char); utf-8 with lossy decode as before
+        raw = handle.read(settings.resume_max_text_chars * 4)
+        return raw.decode("utf-8", errors="ignore")
 
     def infer_skills(self, text: str) -> List[Dict]:
         found = []
-        lower = re.sub(r"[,.()]", " ", text.lower())
-        seen = set()
-        for kw in TECH_KEYWORDS:
-            pattern = r"\b" + re.escape(kw) + r"\b"
-            if re.search(pattern, lower):
-                key_norm = kw.lower()
-                if key_norm in seen:
-                    continue
-                seen.add(key_norm)
-                found.append({
-                    "name": kw.title(),
-                    "score": 60,
-                    "evidence": ["resume"],
-                    "last_updated": None
-                })
+        for match in self.matcher.scan(text):
+            positions = ",".join(f"{s}-{e}" for s, e in match.positions[:MAX_POSITIONS_IN_EVIDENCE])
+            found.append({
+                "name": match.name,
+                "score": 60,
+                "evidence": ["resume", f"resume:matches={match.count}", f"resume:pos={positions}"],
+                "last_updated": None
+            })
         return found
+
+# Per-process parser for pool workers (taxonomy compiled once per worker)
+_worker_parser = None
+
+def parse_document(path: str, filename: str) -> Tuple[List[Dict], Dict[str, float]]:
+    """Extract text and infer skills from a spooled file; top-level so it can run in a process pool.
+
+    Returns the skills plus per-stage timings (seconds) for the parent to record; metrics
+    recorded inside a worker process would never reach /metrics.
+    """
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = ResumeParser()
+    start = time.perf_counter()
+    with open(path, "rb") as handle:
+        text = _worker_parser.extract_text(handle, filename)
+    extracted = time.perf_counter()
+    skills = _worker_parser.infer_skills(text)
+    return skills, {"parse.extract_text": extracted - start, "parse.infer_skills": time.perf_counter() - extracted}
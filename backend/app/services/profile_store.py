@@ -0,0 +1,344 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+import os
+from sqlalchemy import delete, event, func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from ..core.config import get_settings
+from ..db.models import Base, ProfileRow, SkillRow
+from ..schemas.common import Profile, ProfileCreate, Skill
+from .skill_taxonomy import SkillMatcher
+
+settings = get_settings()
+
+@lru_cache(maxsize=1)
+def _taxonomy() -> SkillMatcher:
+    return SkillMatcher.from_file(settings.skills_taxonomy_path or None)
+
+def canonical_skills(skills: List[Skill]) -> List[Skill]:
+    """Store taxonomy names, so resume matches, user input and older clients ('Sql', 'Ai') share one key."""
+    out = []
+    for skill in skills:
+        name = _taxonomy().canonical(skill.name)
+        out.append(skill if name == skill.name else skill.model_copy(update={"name": name}))
+    return out
+
+class ProfileRepository(ABC):
+    """Storage interface for profiles and their skills."""
+
+    def __init__(self):
+        self._listeners: List[Callable[[str], None]] = []
+
+    def on_change(self, callback: Callable[[str], None]):
+        """Call ``callback(user_id)`` after a profile is created, restored or its skills change (this process only)."""
+        self._listeners.append(callback)
+
+    def _changed(self, user_id: str):
+        for callback in self._listeners:
+            callback(user_id)
+
+    async def startup(self):
+        pass
+
+    async def aclose(self):
+        pass
+
+    @abstractmethod
+    async def get(self, user_id: str) -> Optional[Profile]:
+        ...
+
+    @abstractmethod
+    async def exists(self, user_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def create(self, payload: ProfileCreate) -> Profile:
+        """Create the profile, or return the existing one for this user_id."""
+
+    @abstractmethod
+    async def upsert_skills(self, user_id: str, skills: List[Skill]) -> Optional[List[Skill]]:
+        """Insert/replace only the given skills (case-insensitive by name); returns the full list."""
+
+    @abstractmethod
+    async def list_skills(self, user_id: str) -> Optional[List[Skill]]:
+        ...
+
+    @abstractmethod
+    async def restore(self, profile: Profile):
+        """Replace the stored profile (fields, skills, career paths) wholesale, creating it if needed."""
+
+    @abstractmethod
+    async def list_profiles(self) -> List[Profile]:
+        """Every stored profile with its skills (startup rebuilds, e.g. leaderboards)."""
+
+class InMemoryProfileRepository(ProfileRepository):
+    """Process-local dict backend (prototype default; single worker only)."""
+
+    def __init__(self):
+        super().__init__()
+        self.profiles: Dict[str, Profile] = {}
+        # user_id -> lowercased skill name -> index into profile.skills
+        self._skill_index: Dict[str, Dict[str, int]] = {}
+
+    async def get(self, user_id: str) -> Optional[Profile]:
+        return self.profiles.get(user_id)
+
+    async def exists(self, user_id: str) -> bool:
+        return user_id in self.profiles
+
+    async def create(self, payload: ProfileCreate) -> Profile:
+        if payload.user_id in self.profiles:
+            return self.profiles[payload.user_id]
+        profile = Profile(**payload.model_dump())
+        self.profiles[payload.user_id] = profile
+        self._skill_index[payload.user_id] = {}
+        self._changed(payload.user_id)
+        return profile
+
+    async def upsert_skills(self, user_id: str, skills: List[Skill]) -> Optional[List[Skill]]:
+        profile = self.profiles.get(user_id)
+        if profile is None:
+            return None
+        index = self._skill_index.setdefault(user_id, {})
+        for skill in canonical_skills(skills):
+            key = skill.name.lower()
+            pos = index.get(key)
+            if pos is None:
+                index[key] = len(profile.skills)
+                profile.skills.append(skill)
+            else:
+                profile.skills[pos] = skill
+        self._changed(user_id)
+        return profile.skills
+
+    async def list_skills(self, user_id: str) -> Optional[List[Skill]]:
+        profile = self.profiles.get(user_id)
+        return profile.skills if profile is not None else None
+
+    async def restore(self, profile: Profile):
+        latest = {s.name.lower(): s for s in canonical_skills(profile.skills)}
+        profile.skills = list(latest.values())
+        self.profiles[profile.user_id] = profile
+        self._skill_index[profile.user_id] = {key: i for i, key in enumerate(latest)}
+        self._changed(profile.user_id)
+
+    async def list_profiles(self) -> List[Profile]:
+        return list(self.profiles.values())
+
+PROFILES_T = ProfileRow.__table__
+SKILLS_T = SkillRow.__table__
+
+class SQLProfileRepository(ProfileRepository):
+    """SQLAlchemy async backend (SQLite via aiosqlite by default).
+
+    Uses Core statements on pooled connections: each call is one or two
+    round trips to the database thread, no ORM identity-map overhead.
+    """
+
+    def __init__(self, url: str, auto_create: bool = True):
+        super().__init__()
+        self.url = url
+        self.auto_create = auto_create
+        self._engine: Optional[AsyncEngine] = None
+
+    async def startup(self):
+        if self._engine is not None:
+            return
+        kwargs = {}
+        if self.url.startswith("sqlite"):
+            path = self.url.split("///", 1)[-1]
+            if path and path != ":memory:" and os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            if ":memory:" not in self.url:
+                # aiosqlite defaults to NullPool: a new connection (and thread) per call
+                kwargs = {"poolclass": AsyncAdaptedQueuePool, "pool_size": 5, "max_overflow": 10}
+        engine = create_async_engine(self.url, **kwargs)
+        if engine.dialect.name == "sqlite":
+            @event.listens_for(engine.sync_engine, "connect")
+            def _pragmas(dbapi_conn, _):
+                cur = dbapi_conn.cursor()
+                # WAL lets several uvicorn workers read while one writes
+                cur.execute("PRAGMA journal_mode=WAL")
+                cur.execute("PRAGMA synchronous=NORMAL")
+                cur.execute("PRAGMA foreign_keys=ON")
+                cur.close()
+        if self.auto_create:
+            # Dev convenience; production schemas are managed with `alembic upgrade head`
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+        self._engine = engine
+
+    async def aclose(self):
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+
+    async def engine(self) -> AsyncEngine:
+        """The started engine; other repositories keep their tables next to the profiles on it."""
+        if self._engine is None:
+            await self.startup()
+        return self._engine
+
+    @staticmethod
+    def _skill(row) -> Skill:
+        return Skill(name=row.name, score=row.score, evidence=row.evidence or [], last_updated=row.last_updated)
+
+    async def _skills(self, conn, user_id: str) -> List[Skill]:
+        rows = await conn.execute(
+            select(SKILLS_T.c.name, SKILLS_T.c.score, SKILLS_T.c.evidence, SKILLS_T.c.last_updated)
+            .where(SKILLS_T.c.user_id == user_id)
+            .order_by(SKILLS_T.c.position)
+        )
+        return [self._skill(r) for r in rows]
+
+    async def get(self, user_id: str) -> Optional[Profile]:
+        engine = await self.engine()
+        # One round trip: profile columns repeated on each skill row (LEFT JOIN keeps skill-less profiles)
+        stmt = (
+            select(
+                PROFILES_T,
+                SKILLS_T.c.name.label("skill_name"),
+                SKILLS_T.c.score,
+                SKILLS_T.c.evidence,
+                SKILLS_T.c.last_updated,
+            )
+            .select_from(PROFILES_T.outerjoin(SKILLS_T, SKILLS_T.c.user_id == PROFILES_T.c.user_id))
+            .where(PROFILES_T.c.user_id == user_id)
+            .order_by(SKILLS_T.c.position)
+        )
+        async with engine.connect() as conn:
+            rows = (await conn.execute(stmt)).all()
+        if not rows:
+            return None
+        skills = [
+            Skill(name=r.skill_name, score=r.score, evidence=r.evidence or [], last_updated=r.last_updated)
+            for r in rows if r.skill_name is not None
+        ]
+        return self._profile(rows[0], skills)
+
+    @staticmethod
+    def _profile(row, skills: List[Skill]) -> Profile:
+        return Profile(
+            user_id=row.user_id,
+            name=row.name,
+            degree=row.degree,
+            semester=row.semester,
+            interests=row.interests or [],
+            language=row.language,
+            nickname=row.nickname,
+            skills=skills,
+            career_paths=row.career_paths or [],
+        )
+
+    async def list_profiles(self) -> List[Profile]:
+        engine = await self.engine()
+        skills: Dict[str, List[Skill]] = {}
+        async with engine.connect() as conn:
+            profiles = (await conn.execute(select(PROFILES_T))).all()
+            rows = await conn.execute(
+                select(SKILLS_T.c.user_id, SKILLS_T.c.name, SKILLS_T.c.score, SKILLS_T.c.evidence, SKILLS_T.c.last_updated)
+                .order_by(SKILLS_T.c.user_id, SKILLS_T.c.position)
+            )
+            for r in rows:
+                skills.setdefault(r.user_id, []).append(self._skill(r))
+        return [self._profile(row, skills.get(row.user_id, [])) for row in profiles]
+
+    async def exists(self, user_id: str) -> bool:
+        engine = await self.engine()
+        async with engine.connect() as conn:
+            found = await conn.scalar(select(PROFILES_T.c.user_id).where(PROFILES_T.c.user_id == user_id))
+        return found is not None
+
+    async def create(self, payload: ProfileCreate) -> Profile:
+        engine = await self.engine()
+        async with engine.begin() as conn:
+            await conn.execute(
+                insert(PROFILES_T).values(**payload.model_dump(), career_paths=[]).on_conflict_do_nothing()
+            )
+        self._changed(payload.user_id)
+        return await self.get(payload.user_id)
+
+    async def upsert_skills(self, user_id: str, skills: List[Skill]) -> Optional[List[Skill]]:
+        engine = await self.engine()
+        async with engine.begin() as conn:
+            next_pos = await conn.scalar(
+                select(func.coalesce(func.max(SKILLS_T.c.position), -1)).where(SKILLS_T.c.user_id == user_id)
+            )
+            if next_pos == -1 and await conn.scalar(select(PROFILES_T.c.user_id).where(PROFILES_T.c.user_id == user_id)) is None:
+                return None
+            if skills:
+                # Last occurrence wins within one request, as with the dict backend
+                latest = {s.name.lower(): s for s in canonical_skills(skills)}
+                rows = [
+                    {
+                        "user_id": user_id,
+                        "name_key": key,
+                        "name": s.name,
+                        "score": s.score,
+                        "evidence": s.evidence,
+                        "last_updated": s.last_updated,
+                        "position": next_pos + 1 + i,
+                    }
+                    for i, (key, s) in enumerate(latest.items())
+                ]
+                stmt = insert(SKILLS_T).values(rows)
+                # Only the touched rows are written; existing skills keep their position
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[SKILLS_T.c.user_id, SKILLS_T.c.name_key],
+                    set_={
+                        "name": stmt.excluded.name,
+                        "score": stmt.excluded.score,
+                        "evidence": stmt.excluded.evidence,
+                        "last_updated": stmt.excluded.last_updated,
+                    },
+                )
+                await conn.execute(stmt)
+            result = await self._skills(conn, user_id)
+        self._changed(user_id)
+        return result
+
+    async def list_skills(self, user_id: str) -> Optional[List[Skill]]:
+        engine = await self.engine()
+        async with engine.connect() as conn:
+            skills = await self._skills(conn, user_id)
+            if not skills and await conn.scalar(select(PROFILES_T.c.user_id).where(PROFILES_T.c.user_id == user_id)) is None:
+                return None
+        return skills
+
+    async def restore(self, profile: Profile):
+        engine = await self.engine()
+        fields = profile.model_dump(exclude={"skills", "career_paths"})
+        fields["career_paths"] = [p.model_dump() for p in profile.career_paths]
+        latest = {s.name.lower(): s for s in canonical_skills(profile.skills)}
+        async with engine.begin() as conn:
+            stmt = insert(PROFILES_T).values(**fields)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[PROFILES_T.c.user_id],
+                set_={k: stmt.excluded[k] for k in fields if k != "user_id"},
+            )
+            await conn.execute(stmt)
+            await conn.execute(delete(SKILLS_T).where(SKILLS_T.c.user_id == profile.user_id))
+            if latest:
+                await conn.execute(insert(SKILLS_T).values([
+                    {
+                        "user_id": profile.user_id,
+                        "name_key": key,
+                        "name": s.name,
+                        "score": s.score,
+                        "evidence": s.evidence,
+                        "last_updated": s.last_updated,
+                        "position": i,
+                    }
+                    for i, (key, s) in enumerate(latest.items())
+                ]))
+        self._changed(profile.user_id)
+
+def build_profile_store() -> ProfileRepository:
+    if settings.profile_store_backend == "sqlite":
+        return SQLProfileRepository(settings.database_url, settings.database_auto_create)
+    return InMemoryProfileRepository()
+
+profile_store = build_profile_store()
@@ -0,0 +1,231 @@
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from rapidfuzz import fuzz, process
+from ..core.config import get_settings
+from .metrics import metrics
+from .retrieval import STOPWORDS
+
+settings = get_settings()
+
+_PUNCT = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+def normalize_query(text: str) -> str:
+    return _SPACES.sub(" ", _PUNCT.sub(" ", text.lower())).strip()
+
+def content_terms(norm: str) -> frozenset:
+    """Non-stopword words of a normalized query, plural 's' folded; fuzzy hits must agree on these."""
+    return frozenset(w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w for w in norm.split() if w not in STOPWORDS)
+
+def context_fingerprint(context: str) -> str:
+    # Short stable digest of the skill/interest summary baked into the prompt
+    return hashlib.sha1(context.encode("utf-8")).hexdigest()[:16]
+
+@dataclass
+class CacheEntry:
+    answer: str
+    created_at: float
+
+class QueryIndex:
+    """Normalized queries per (model, fingerprint) bucket, kept in memory for the fuzzy tier."""
+
+    def __init__(self):
+        self._buckets: Dict[Tuple[str, str], set] = {}
+
+    def add(self, key: Tuple[str, str, str]):
+        self._buckets.setdefault(key[:2], set()).add(key[2])
+
+    def discard(self, key: Tuple[str, str, str]):
+        bucket = self._buckets.get(key[:2])
+        if bucket is not None:
+            bucket.discard(key[2])
+            if not bucket:
+                del self._buckets[key[:2]]
+
+    def queries(self, model: str, fingerprint: str) -> List[str]:
+        return list(self._buckets.get((model, fingerprint), ()))
+
+class MemoryCacheBackend:
+    """In-process LRU keyed on (model, fingerprint, normalized query)."""
+
+    blocking = False
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Tuple[str, str, str], CacheEntry]" = OrderedDict()
+        self.index = QueryIndex()
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[CacheEntry]:
+        entry = self._data.get(key)
+        if entry is not None:
+            self._data.move_to_end(key)
+        return entry
+
+    def put(self, key: Tuple[str, str, str], entry: CacheEntry) -> int:
+        self._data[key] = entry
+        self._data.move_to_end(key)
+        self.index.add(key)
+        evicted = 0
+        while len(self._data) > self.max_entries:
+            old, _ = self._data.popitem(last=False)
+            self.index.discard(old)
+            evicted += 1
+        return evicted
+
+    def delete(self, key: Tuple[str, str, str]):
+        if self._data.pop(key, None) is not None:
+            self.index.discard(key)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+class SQLiteCacheBackend:
+    """Local-disk LRU so cached answers survive restarts.
+
+    Calls block on disk, so ResponseCache runs them in a worker thread (``blocking``). The fuzzy
+    tier reads the in-memory query index, loaded once at startup, instead of scanning the table.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, max_entries: int):
+        self.max_entries = max_entries
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " model TEXT NOT NULL, fingerprint TEXT NOT NULL, query TEXT NOT NULL,"
+            " answer TEXT NOT NULL, created_at REAL NOT NULL, last_access REAL NOT NULL,"
+            " PRIMARY KEY (model, fingerprint, query))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_responses_last_access ON responses (last_access)")
+        self.index = QueryIndex()
+        for key in self._conn.execute("SELECT model, fingerprint, query FROM responses"):
+            self.index.add(key)
+        self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT answer, created_at FROM responses WHERE model=? AND fingerprint=? AND query=?", key
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE responses SET last_access=? WHERE model=? AND fingerprint=? AND query=?", (time.time(), *key)
+            )
+        return CacheEntry(answer=row[0], created_at=row[1])
+
+    def put(self, key: Tuple[str, str, str], entry: CacheEntry) -> int:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, entry.answer, entry.created_at, time.time()),
+            )
+            self.index.add(key)
+            self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            excess = self._count - self.max_entries
+            if excess > 0:
+                old = self._conn.execute(
+                    "SELECT rowid, model, fingerprint, query FROM responses ORDER BY last_access LIMIT ?", (excess,)
+                ).fetchall()
+                self._conn.executemany("DELETE FROM responses WHERE rowid=?", [(r[0],) for r in old])
+                for r in old:
+                    self.index.discard(r[1:])
+                self._count -= len(old)
+        return max(excess, 0)
+
+    def delete(self, key: Tuple[str, str, str]):
+        with self._lock:
+            if self._conn.execute("DELETE FROM responses WHERE model=? AND fingerprint=? AND query=?", key).rowcount:
+                self.index.discard(key)
+                self._count -= 1
+
+    def __len__(self) -> int:
+        return self._count
+
+class ResponseCache:
+    def __init__(self, backend, ttl: float, fuzzy_threshold: int = 0):
+        self.backend = backend
+        self.ttl = ttl
+        self.fuzzy_threshold = fuzzy_threshold  # 0 disables the fuzzy tier
+        self.hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def _call(self, fn, *args):
+        # Keep disk-backed lookups off the event loop
+        return await asyncio.to_thread(fn, *args) if self.backend.blocking else fn(*args)
+
+    async def _fresh(self, key: Tuple[str, str, str]) -> Optional[CacheEntry]:
+        entry = await self._call(self.backend.get, key)
+        if entry is not None and time.time() - entry.created_at > self.ttl:
+            await self._call(self.backend.delete, key)
+            self.evictions += 1
+            return None
+        return entry
+
+    async def get(self, model: str, fingerprint: str, query: str) -> Optional[str]:
+        norm = normalize_query(query)
+        entry = await self._fresh((model, fingerprint, norm))
+        if entry is not None:
+            self.hits += 1
+            return entry.answer
+        if self.fuzzy_threshold:
+            # Only rephrasings of the same question: one different meaningful word ("india" vs "usa") is a miss
+            terms = content_terms(norm)
+            candidates = [q for q in self.backend.index.queries(model, fingerprint) if content_terms(q) == terms]
+            match = process.extractOne(norm, candidates, scorer=fuzz.token_sort_ratio, score_cutoff=self.fuzzy_threshold) if candidates else None
+            if match is not None:
+                entry = await self._fresh((model, fingerprint, match[0]))
+                if entry is not None:
+                    self.fuzzy_hits += 1
+                    return entry.answer
+        self.misses += 1
+        return None
+
+    async def put(self, model: str, fingerprint: str, query: str, answer: str):
+        key = (model, fingerprint, normalize_query(query))
+        self.evictions += await self._call(self.backend.put, key, CacheEntry(answer=answer, created_at=time.time()))
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.fuzzy_hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "fuzzy_hits": self.fuzzy_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.fuzzy_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+def build_response_cache() -> Optional[ResponseCache]:
+    kind = settings.response_cache_backend
+    if kind == "off":
+        return None
+    if kind == "sqlite":
+        backend = SQLiteCacheBackend(settings.response_cache_path, settings.response_cache_max_entries)
+    else:
+        backend = MemoryCacheBackend(settings.response_cache_max_entries)
+    return ResponseCache(backend, settings.response_cache_ttl, settings.response_cache_fuzzy_threshold)
+
+response_cache = build_response_cache()
+
+if response_cache is not None:
+    metrics.gauge("careeriq_response_cache_lookups_total", "Chat response cache lookups by result",
+                  lambda: {("hit",): response_cache.hits, ("fuzzy_hit",): response_cache.fuzzy_hits, ("miss",): response_cache.misses},
+                  ("result",), kind="counter")
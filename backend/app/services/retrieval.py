@@ -0,0 +1,347 @@
+"""Local BM25 retrieval over the project documents and the career resource corpus.
+
+Build the index offline (from backend/):
+    python -m app.services.retrieval build
+The server memory-maps it on first use; rebuilds are picked up on restart.
+"""
+from __future__ import annotations
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import mmap
+import os
+import re
+import shutil
+import threading
+import time
+import numpy as np
+from ..core.config import get_settings
+from .metrics import metrics, span
+
+settings = get_settings()
+
+DEFAULT_DOCUMENTS_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "..", "documents")
+DEFAULT_RESOURCES_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "career_resources.json")
+INDEX_VERSION = 1
+TEXT_SUFFIXES = (".md", ".markdown", ".txt")
+BINARY_SUFFIXES = (".pdf", ".docx")
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+_MARKUP = re.compile(r"[*_`>|]+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from has have how i if in into is it its me my of on or "
+    "should so than that the their them then there these they this to was we what when where which who why "
+    "will with you your".split()
+)
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+@dataclass
+class Passage:
+    source: str  # document / corpus file name
+    title: str  # section heading / resource title
+    text: str
+    url: Optional[str] = None
+
+    @property
+    def citation(self) -> str:
+        return f"{self.title} ({self.url})" if self.url else f"{self.source} › {self.title}"
+
+def _chunks(words: List[str], size: int) -> Iterator[str]:
+    start = 0
+    while start < len(words):
+        end = start + size
+        if len(words) - end < size // 4:
+            end = len(words)  # fold a short tail into this chunk instead of emitting a fragment
+        yield " ".join(words[start:end])
+        start = end
+
+def markdown_passages(name: str, text: str, chunk_words: int) -> Iterator[Passage]:
+    """Prose under each heading, split into ~chunk_words passages; fenced code is skipped."""
+    title, words, in_code = name, [], False
+    for line in text.splitlines():
+        if line.lstrip().startswith("```"):
+            in_code = not in_code
+            continue
+        if in_code:
+            continue
+        heading = _HEADING.match(line)
+        if heading:
+            yield from (Passage(name, title, c) for c in _chunks(words, chunk_words))
+            title = re.sub(r"^\W+", "", _MARKUP.sub("", heading.group(2))).strip() or title
+            words = []
+            continue
+        words.extend(_MARKUP.sub(" ", line).split())
+    yield from (Passage(name, title, c) for c in _chunks(words, chunk_words))
+
+def document_passages(directory: str, chunk_words: int) -> Iterator[Passage]:
+    if not os.path.isdir(directory):
+        return
+    names = sorted(os.listdir(directory))
+    text_stems = {os.path.splitext(n)[0] for n in names if n.lower().endswith(TEXT_SUFFIXES)}
+    parser = None
+    for name in names:
+        path = os.path.join(directory, name)
+        stem, suffix = os.path.splitext(name)
+        suffix = suffix.lower()
+        if suffix in TEXT_SUFFIXES:
+            with open(path, encoding="utf-8", errors="ignore") as f:
+                text = f.read()
+        elif suffix in BINARY_SUFFIXES and stem not in text_stems:
+            # Exported copies of a markdown/text document would only duplicate its passages
+            if parser is None:
+                from .parsing import ResumeParser, UnreadableDocument
+                parser = ResumeParser()
+            try:
+                with open(path, "rb") as f:
+                    text = parser.extract_text(f, name)
+            except UnreadableDocument as e:
+                logging.warning(f"Skipping {name}: {e}")
+                continue
+        else:
+            continue
+        if suffix in (".md", ".markdown"):
+            yield from markdown_passages(name, text, chunk_words)
+        else:
+            yield from (Passage(name, stem, c) for c in _chunks(text.split(), chunk_words))
+
+def resource_passages(path: str) -> Iterator[Passage]:
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        rows = json.load(f)
+    source = os.path.basename(path)
+    for row in rows:
+        yield Passage(source, row["title"], row["text"], row.get("url") or None)
+
+def build_index(passages: Iterable[Passage], out: str, k1: float = 1.2, b: float = 0.75) -> Dict:
+    """Write a BM25 index directory: CSR postings as .npy files + passages as JSON lines with byte offsets.
+
+    The directory is written next to ``out`` and swapped in at the end so a running
+    reader never sees a half-written index.
+    """
+    base = out.rstrip("/\\")
+    tmp = base + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    vocab: Dict[str, int] = {}
+    terms: List[int] = []
+    docs: List[int] = []
+    tfs: List[int] = []
+    lengths: List[int] = []
+    offsets = [0]
+    sources: Counter = Counter()
+    digest = hashlib.sha1()
+    with open(os.path.join(tmp, "passages.jsonl"), "wb") as f:
+        for doc, passage in enumerate(passages):
+            counts = Counter(tokenize(f"{passage.title} {passage.text}"))
+            for term, tf in counts.items():
+                terms.append(vocab.setdefault(term, len(vocab)))
+                docs.append(doc)
+                tfs.append(tf)
+            lengths.append(sum(counts.values()))
+            sources[passage.source] += 1
+            line = (json.dumps({"source": passage.source, "title": passage.title, "text": passage.text, "url": passage.url}, ensure_ascii=False) + "\n").encode("utf-8")
+            f.write(line)
+            digest.update(line)
+            offsets.append(offsets[-1] + len(line))
+    n = len(lengths)
+    term_arr = np.asarray(terms, dtype=np.int32)
+    doc_arr = np.asarray(docs, dtype=np.int32)
+    order = np.lexsort((doc_arr, term_arr))
+    df = np.bincount(term_arr, minlength=len(vocab))
+    dl = np.asarray(lengths, dtype=np.float32)
+    avgdl = float(dl.mean()) if n else 0.0
+    arrays = {
+        "postings_docs": doc_arr[order],
+        "postings_tf": np.asarray(tfs, dtype=np.float32)[order],
+        "term_offsets": np.concatenate(([0], np.cumsum(df))).astype(np.int64),
+        "idf": np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32),
+        # Per-passage length normalisation, precomputed so a query only does the tf part
+        "norm": (k1 * (1 - b + b * dl / avgdl) if n else dl).astype(np.float32),
+        "passage_offsets": np.asarray(offsets, dtype=np.int64),
+    }
+    for name, arr in arrays.items():
+        np.save(os.path.join(tmp, f"{name}.npy"), arr)
+    with open(os.path.join(tmp, "vocab.json"), "w", encoding="utf-8") as f:
+        json.dump(sorted(vocab, key=vocab.get), f, ensure_ascii=False)
+    meta = {
+        "version": INDEX_VERSION, "build_id": digest.hexdigest()[:12], "built_at": time.time(),
+        "passages": n, "terms": len(vocab), "postings": len(terms), "k1": k1, "b": b, "avgdl": round(avgdl, 2),
+        "sources": dict(sources),
+    }
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    if os.path.exists(out):
+        # Renaming over a non-empty directory is not portable; move the old one aside first
+        old = f"{base}.old-{int(time.time())}"
+        os.replace(out, old)
+        shutil.rmtree(old, ignore_errors=True)
+    os.replace(tmp, out)
+    return meta
+
+class BM25Index:
+    """Read side of ``build_index``: arrays and passages are memory-mapped, not loaded."""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"retrieval index version {self.meta.get('version')} != {INDEX_VERSION}; rebuild it")
+        with open(os.path.join(path, "vocab.json"), encoding="utf-8") as f:
+            self.vocab: Dict[str, int] = {t: i for i, t in enumerate(json.load(f))}
+        load = lambda name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+        self.post_docs = load("postings_docs")
+        self.post_tf = load("postings_tf")
+        self.term_offsets = load("term_offsets")
+        self.idf = load("idf")
+        self.norm = load("norm")
+        self.passage_offsets = load("passage_offsets")
+        self.k1 = float(self.meta["k1"])
+        self._file = open(os.path.join(path, "passages.jsonl"), "rb")
+        self._passages = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.meta["passages"] else b""
+
+    def __len__(self) -> int:
+        return int(self.meta["passages"])
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """Top-k (passage row, BM25 score); cost scales with the query terms' postings, not corpus size."""
+        ids = {self.vocab[t] for t in tokenize(query) if t in self.vocab}
+        if not ids or k <= 0:
+            return []
+        doc_parts, score_parts = [], []
+        for t in ids:
+            lo, hi = self.term_offsets[t], self.term_offsets[t + 1]
+            docs = self.post_docs[lo:hi]
+            tf = self.post_tf[lo:hi]
+            doc_parts.append(docs)
+            score_parts.append(self.idf[t] * tf * (self.k1 + 1) / (tf + self.norm[docs]))
+        if len(doc_parts) == 1:
+            docs, scores = np.asarray(doc_parts[0]), score_parts[0]
+        else:
+            all_docs, all_scores = np.concatenate(doc_parts), np.concatenate(score_parts)
+            if len(all_docs) * 8 >= len(self):
+                # Common terms touch much of the corpus: one dense bincount beats sorting the postings
+                scores = np.bincount(all_docs, weights=all_scores, minlength=len(self))
+                docs = None  # row == passage id
+            else:
+                docs, inverse = np.unique(all_docs, return_inverse=True)
+                scores = np.bincount(inverse, weights=all_scores)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(docs[i]) if docs is not None else int(i), float(scores[i])) for i in top if scores[i] > 0]
+
+    def passage(self, row: int) -> Passage:
+        lo, hi = self.passage_offsets[row], self.passage_offsets[row + 1]
+        data = json.loads(self._passages[lo:hi])
+        return Passage(data["source"], data["title"], data["text"], data.get("url"))
+
+    def close(self):
+        if isinstance(self._passages, mmap.mmap):
+            self._passages.close()
+        self._file.close()
+
+class Retriever:
+    """Loads the index lazily on first use; searches run off the event loop under a latency budget."""
+
+    def __init__(self, path: str, top_k: int = 3, budget_ms: float = 50.0, min_score: float = 1.0, enabled: bool = True):
+        self.path = path
+        self.top_k = top_k
+        self.budget = budget_ms / 1000
+        self.min_score = min_score
+        self.enabled = enabled
+        self.index: Optional[BM25Index] = None
+        self.queries = 0
+        self.timeouts = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._missing_logged = False
+
+    def load(self) -> Optional[BM25Index]:
+        if self.index is not None or not self.enabled:
+            return self.index
+        with self._lock:
+            if self.index is None:
+                if not os.path.exists(os.path.join(self.path, "meta.json")):
+                    if not self._missing_logged:
+                        logging.warning(f"No retrieval index at {self.path}; run `python -m app.services.retrieval build`")
+                        self._missing_logged = True
+                    return None
+                self.index = BM25Index(self.path)
+        return self.index
+
+    async def warm(self):
+        try:
+            await asyncio.to_thread(self.load)
+        except Exception as e:
+            logging.warning(f"Retrieval index failed to load: {e}")
+
+    def _search(self, query: str) -> List[Passage]:
+        index = self.load()
+        if index is None:
+            return []
+        return [index.passage(row) for row, score in index.search(query, self.top_k) if score >= self.min_score]
+
+    async def retrieve(self, query: str) -> List[Passage]:
+        if not self.enabled or self.top_k <= 0:
+            return []
+        self.queries += 1
+        with span("chat.retrieve"):
+            try:
+                # A slow disk or huge posting list must not hold up the answer: go without passages
+                return await asyncio.wait_for(asyncio.to_thread(self._search, query), self.budget)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+            except Exception as e:
+                self.errors += 1
+                logging.warning(f"Retrieval failed: {e}")
+        return []
+
+    def stats(self) -> Dict:
+        meta = self.index.meta if self.index is not None else None
+        return {
+            "enabled": self.enabled, "loaded": self.index is not None, "path": self.path, "index": meta,
+            "queries": self.queries, "timeouts": self.timeouts, "errors": self.errors,
+        }
+
+    def close(self):
+        if self.index is not None:
+            self.index.close()
+            self.index = None
+
+retriever = Retriever(
+    settings.retrieval_index_path, settings.retrieval_top_k, settings.retrieval_budget_ms,
+    settings.retrieval_min_score, settings.retrieval_enabled,
+)
+
+metrics.gauge("careeriq_retrieval_passages", "Passages in the loaded retrieval index",
+              lambda: len(retriever.index) if retriever.index is not None else 0)
+metrics.gauge("careeriq_retrieval_timeouts_total", "Retrievals dropped for exceeding the latency budget",
+              lambda: retriever.timeouts, kind="counter")
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(prog="python -m app.services.retrieval", description="Build the local retrieval index")
+    sub = ap.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build")
+    build.add_argument("--documents", default=settings.retrieval_documents_path or DEFAULT_DOCUMENTS_PATH)
+    build.add_argument("--resources", default=settings.retrieval_resources_path or DEFAULT_RESOURCES_PATH)
+    build.add_argument("--out", default=settings.retrieval_index_path)
+    build.add_argument("--chunk-words", type=int, default=settings.retrieval_chunk_words)
+    args = ap.parse_args(argv)
+    start = time.perf_counter()
+    passages = [*document_passages(args.documents, args.chunk_words), *resource_passages(args.resources)]
+    meta = build_index(passages, args.out)
+    print(f"indexed {meta['passages']} passages, {meta['terms']} terms -> {args.out} in {time.perf_counter() - start:.2f}s")
+    for source, count in sorted(meta["sources"].items(), key=lambda kv: -kv[1])[:10]:
+        print(f"  {count:5d}  {source}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+from __future__ import annotations
+import asyncio
+from typing import AsyncIterator, Callable, Dict, Hashable, List, Optional
+
+class _Flight:
+    """One shared upstream stream, replayed to every subscriber from the start."""
+
+    def __init__(self, source: AsyncIterator[str], release: Callable[[], None]):
+        self.items: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self._release = release
+        self._changed = asyncio.Event()
+        self._task = asyncio.create_task(self._pump(source))
+
+    async def _pump(self, source: AsyncIterator[str]):
+        try:
+            async for item in source:
+                self.items.append(item)
+                self._notify()
+        except asyncio.CancelledError:
+            self.error = RuntimeError("upstream generation cancelled")
+            raise
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            self._release()
+            self._notify()
+
+    def _notify(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        self.subscribers += 1
+        i = 0
+        try:
+            while True:
+                changed = self._changed
+                while i < len(self.items):
+                    yield self.items[i]
+                    i += 1
+                if self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                await changed.wait()
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0 and not self.done:
+                # Last interested caller left: stop the upstream call and let new callers start fresh
+                self._release()
+                self._task.cancel()
+
+class SingleFlight:
+    """Coalesces concurrent identical streams so they share one upstream call."""
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.started = 0
+        self.joined = 0
+
+    def stream(self, key: Hashable, factory: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        flight = self._flights.get(key)
+        if flight is None:
+            self.started += 1
+
+            def release():
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+            flight = _Flight(factory(), release)
+            self._flights[key] = flight
+        else:
+            self.joined += 1
+        return flight.subscribe()
+
+    def stats(self) -> Dict:
+        return {"in_flight": len(self._flights), "started": self.started, "joined": self.joined}
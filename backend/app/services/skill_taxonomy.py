@@ -0,0 +1,108 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import json
+import os
+import re
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "skills_taxonomy.json")
+
+_SPACES = re.compile(r"\s+")
+_WORD_CHAR = re.compile(r"\w")
+
+def _norm(term: str) -> str:
+    return _SPACES.sub(" ", term.strip().lower())
+
+@dataclass
+class SkillMatch:
+    name: str
+    count: int = 0
+    positions: List[Tuple[int, int]] = field(default_factory=list)  # (start, end) offsets in the lowercased text
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """Factor the terms into a prefix trie and emit it as one regex.
+
+    A trie-shaped alternation lets ``re`` discard non-matching branches after a
+    character or two instead of trying every term at every position.
+    """
+    trie: Dict = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def emit(node: Dict) -> str:
+        terminal = "" in node
+        branches = []
+        for ch in sorted(k for k in node if k):
+            atom = r"\s+" if ch == " " else re.escape(ch)
+            branches.append(atom + emit(node[ch]))
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            # Greedy optional: prefer the longer term, backtrack to the shorter one
+            return "(?:" + body + ")?"
+        return body
+
+    return emit(trie)
+
+class SkillMatcher:
+    """Single-pass matcher over a skills taxonomy with aliases."""
+
+    def __init__(self, aliases: Dict[str, str]):
+        # alias (normalized) -> canonical skill name
+        self.aliases = {_norm(a): name for a, name in aliases.items() if a.strip()}
+        pattern = _trie_pattern(self.aliases)
+        # Lookarounds instead of \b so terms ending in symbols (c++) still match. The match is
+        # zero-width (term captured in a lookahead), so every word start is tried and terms
+        # starting inside a longer term ("ai" in "generative ai") are found too. A term right
+        # after a dot is part of a dotted name ("js" in "node.js"), not a mention of its own.
+        self._regex = re.compile(r"(?<![\w.])(?=(" + pattern + r")(?!\w))") if self.aliases else None
+
+    @classmethod
+    def from_file(cls, path: Optional[str] = None) -> "SkillMatcher":
+        with open(path or DEFAULT_TAXONOMY_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+        aliases: Dict[str, str] = {}
+        for skill in data.get("skills", []):
+            aliases[skill["name"]] = skill["name"]
+            for alias in skill.get("aliases", []):
+                aliases[alias] = skill["name"]
+        return cls(aliases)
+
+    def canonical(self, name: str) -> str:
+        """Taxonomy name for a known skill or alias ('Sql' -> 'SQL', 'ml' -> 'Machine Learning'); others unchanged."""
+        return self.aliases.get(_norm(name), name)
+
+    def scan(self, text: str) -> List[SkillMatch]:
+        """Matches per canonical skill, in order of first occurrence.
+
+        Like the per-keyword search this replaced, terms nested in a longer term count as well
+        ("google cloud platform" is GCP and Cloud), but one span counts once per skill.
+        """
+        if self._regex is None:
+            return []
+        found: Dict[str, SkillMatch] = {}
+        reach: Dict[str, int] = {}  # skill -> end of the furthest span already counted
+        for m in self._regex.finditer(text.lower()):
+            start, term = m.start(), m.group(1)
+            for end in _term_ends(term):
+                name = self.aliases.get(_norm(term[:end]))
+                if name is None or reach.get(name, -1) >= start + end:
+                    continue
+                reach[name] = start + end
+                match = found.get(name)
+                if match is None:
+                    match = found[name] = SkillMatch(name=name)
+                match.count += 1
+                match.positions.append((start, start + end))
+        return list(found.values())
+
+def _term_ends(term: str) -> Iterator[int]:
+    """Ends of the prefixes of a matched term that could be terms themselves, longest first."""
+    yield len(term)
+    for end in range(len(term) - 1, 0, -1):
+        if not term[end - 1].isspace() and _WORD_CHAR.match(term, end) is None:
+            yield end
@@ -0,0 +1,193 @@
+"""Encrypted client-state sync.
+
+The user's state (profile, skills, career paths, conversation) is serialised as one JSON
+record per line and cut into content-defined chunks. Each chunk is zlib-compressed and
+Fernet-encrypted with the user's key, and it is addressed by a keyed hash of its plaintext.
+Boundaries depend only on line content, so editing one skill or adding a turn changes one or
+two chunks. Clients keep the chunks they hold and only exchange the ones whose hashes differ.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import hashlib
+import zlib
+import orjson
+from cryptography.fernet import InvalidToken
+from pydantic import ValidationError
+from ..core.config import get_settings
+from ..schemas.common import Profile
+from .conversation import conversation_memory
+from .encryption import EncryptionService, encryption_service
+from .profile_store import profile_store
+
+settings = get_settings()
+
+SYNC_VERSION = 1
+
+class SyncError(Exception):
+    def __init__(self, status_code: int, detail, missing: Optional[List[str]] = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.missing = missing or []
+
+@dataclass
+class SyncChunk:
+    hash: str
+    plain: bytes
+
+def state_records(profile: Profile, conversation: Dict) -> List[bytes]:
+    """One JSON line per record, in a stable order."""
+    head = profile.model_dump(exclude={"skills", "career_paths"})
+    records = [{"k": "profile", **head}]
+    records += [{"k": "skill", **s.model_dump()} for s in profile.skills]
+    records += [{"k": "path", **p.model_dump()} for p in profile.career_paths]
+    records.append({"k": "conv", "summary": conversation.get("summary", ""), "summarized_turns": conversation.get("summarized_turns", 0)})
+    records += [{"k": "turn", **t} for t in conversation.get("turns", [])]
+    return [orjson.dumps(r, option=orjson.OPT_SORT_KEYS) + b"\n" for r in records]
+
+def chunk_records(lines: Iterable[bytes], target: int) -> Iterator[bytes]:
+    """Content-defined chunking on record boundaries: cut after a line whose checksum hits, once past half the target."""
+    buf: List[bytes] = []
+    size = 0
+    for line in lines:
+        buf.append(line)
+        size += len(line)
+        if size >= target * 2 or (size >= target // 2 and zlib.crc32(line) % 4 == 0):
+            yield b"".join(buf)
+            buf, size = [], 0
+    if buf:
+        yield b"".join(buf)
+
+def parse_records(data: bytes, user_id: str) -> Tuple[Profile, Dict]:
+    head: Dict = {}
+    skills, paths, turns = [], [], []
+    conversation: Dict = {"summary": "", "summarized_turns": 0}
+    for line in data.splitlines():
+        if not line:
+            continue
+        record = orjson.loads(line)
+        if not isinstance(record, dict):
+            raise SyncError(422, "Sync record is not an object")
+        kind = record.pop("k", None)
+        if kind == "profile":
+            head = record
+        elif kind == "skill":
+            skills.append(record)
+        elif kind == "path":
+            paths.append(record)
+        elif kind == "conv":
+            conversation.update(record)
+        elif kind == "turn":
+            turns.append({"role": record["role"], "content": record["content"]})
+    if not head:
+        raise SyncError(422, "Sync state has no profile record")
+    # Chunks are keyed to the user, but never let a blob rename its owner
+    profile = Profile(**{**head, "user_id": user_id}, skills=skills, career_paths=paths)
+    conversation["turns"] = turns
+    return profile, conversation
+
+def _strings(value) -> bool:
+    return isinstance(value, list) and all(isinstance(v, str) for v in value)
+
+def state_hash(order: List[str]) -> str:
+    return hashlib.sha256("".join(order).encode()).hexdigest()[:32]
+
+class SyncService:
+    def __init__(self, crypto: EncryptionService, chunk_bytes: int = 4096, max_bytes: int = 5 * 1024 * 1024):
+        self.crypto = crypto
+        self.chunk_bytes = chunk_bytes
+        self.max_bytes = max_bytes
+
+    async def snapshot(self, user_id: str) -> Optional[List[SyncChunk]]:
+        profile = await profile_store.get(user_id)
+        if profile is None:
+            return None
+        conv = await conversation_memory.get(user_id)
+        keys = self.crypto.for_user(user_id)
+        return [SyncChunk(keys.content_hash(c), c) for c in chunk_records(state_records(profile, conv.state()), self.chunk_bytes)]
+
+    @staticmethod
+    def manifest(chunks: List[SyncChunk]) -> Dict:
+        order = [c.hash for c in chunks]
+        return {
+            "version": SYNC_VERSION,
+            "state_hash": state_hash(order),
+            "chunks": order,
+            "sizes": [len(c.plain) for c in chunks],
+        }
+
+    def export_events(self, user_id: str, chunks: List[SyncChunk], have: Set[str]) -> Iterator[bytes]:
+        """NDJSON: the manifest, then only the chunks the client does not hold, encrypted lazily."""
+        yield orjson.dumps({"type": "manifest", **self.manifest(chunks)}) + b"\n"
+        wanted = [c for c in chunks if c.hash not in have]
+        tokens = self.crypto.encrypt_chunks(user_id, (zlib.compress(c.plain, 6) for c in wanted))
+        for chunk, token in zip(wanted, tokens):
+            yield orjson.dumps({"type": "chunk", "hash": chunk.hash, "data": token.decode()}) + b"\n"
+        yield orjson.dumps({"type": "done", "sent": len(wanted), "total": len(chunks)}) + b"\n"
+
+    def _open(self, user_id: str, claimed: str, token: str) -> bytes:
+        keys = self.crypto.for_user(user_id)
+        try:
+            plain = zlib.decompress(keys.fernet.decrypt(token.encode()))
+        except (InvalidToken, zlib.error):
+            raise SyncError(400, f"Chunk {claimed} does not decrypt for this user")
+        if keys.content_hash(plain) != claimed:
+            raise SyncError(400, f"Chunk {claimed} content does not match its hash")
+        return plain
+
+    async def import_events(self, user_id: str, lines: AsyncIterator[bytes]) -> Dict:
+        """Apply an uploaded state: a manifest line, then chunk lines for hashes the server lacks.
+
+        Chunks the server already has (same hash in its current state) are reused; if any are
+        missing the import is rejected with their hashes so the client can resend just those.
+        """
+        manifest: Optional[Dict] = None
+        received: Dict[str, bytes] = {}
+        total = 0
+        async for line in lines:
+            total += len(line)
+            if total > self.max_bytes:
+                raise SyncError(413, f"Sync upload exceeds {self.max_bytes} bytes")
+            if not line.strip():
+                continue
+            try:
+                event = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                raise SyncError(400, "Malformed sync line")
+            if not isinstance(event, dict):
+                raise SyncError(400, "Sync line is not an object")
+            if event.get("type") == "manifest":
+                if event.get("version") != SYNC_VERSION:
+                    raise SyncError(400, f"Unsupported sync version {event.get('version')}")
+                if not _strings(event.get("chunks")):
+                    raise SyncError(400, "Manifest 'chunks' must be a list of hashes")
+                manifest = event
+            elif event.get("type") == "chunk":
+                claimed, token = event.get("hash"), event.get("data")
+                if not isinstance(claimed, str) or not isinstance(token, str):
+                    raise SyncError(400, "Chunk line needs string 'hash' and 'data'")
+                received[claimed] = self._open(user_id, claimed, token)
+        if manifest is None:
+            raise SyncError(400, "Sync upload has no manifest")
+        order: List[str] = manifest["chunks"]
+        current = {c.hash: c.plain for c in (await self.snapshot(user_id) or [])}
+        missing = [h for h in order if h not in received and h not in current]
+        if missing:
+            raise SyncError(409, "Missing chunks", missing)
+        data = b"".join(received.get(h) or current[h] for h in order)
+        try:
+            profile, conversation = parse_records(data, user_id)
+        except (ValidationError, orjson.JSONDecodeError, KeyError, TypeError) as e:
+            raise SyncError(422, f"Invalid sync state: {e}")
+        await profile_store.restore(profile)
+        await conversation_memory.restore(user_id, conversation)
+        return {
+            "user_id": user_id,
+            "state_hash": state_hash(order),
+            "received": len(received),
+            "reused": sum(1 for h in order if h not in received),
+            "skills": len(profile.skills),
+        }
+
+sync_service = SyncService(encryption_service, settings.sync_chunk_bytes, settings.sync_max_bytes)
@@ -0,0 +1,45 @@
+"""Prompt size and assembly time as a conversation grows (should stay flat past the ring buffer).
+
+Usage (from backend/): python -m benchmarks.bench_conversation --turns 1000
+"""
+import argparse
+import asyncio
+import random
+import time
+from app.schemas.common import Profile, Skill
+from app.services.conversation import (
+    ContextPrefixCache, ConversationMemory, InMemoryConversationRepository, assemble_prompt, estimate_tokens,
+)
+
+MODEL = "smollm:135m"
+WORDS = "career data python sql project internship resume skills learn cloud analytics interview portfolio".split()
+
+def _sentence(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+async def main(turns: int, report_every: int):
+    rng = random.Random(7)
+    profile = Profile(
+        user_id="bench", interests=["data", "ai"],
+        skills=[Skill(name=w.title(), score=rng.randint(10, 90)) for w in WORDS[:8]],
+    )
+    memory = ConversationMemory(InMemoryConversationRepository())
+    prefixes = ContextPrefixCache()
+    print(f"{'turn':>6} {'prompt_tokens':>14} {'assemble_us':>12} {'buffered':>9} {'summarized':>11}")
+    for turn in range(1, turns + 1):
+        query = _sentence(rng, rng.randint(8, 30))
+        start = time.perf_counter()
+        conv = await memory.get(profile.user_id)
+        prompt, _, _ = assemble_prompt(prefixes.get(profile), conv, query, MODEL)
+        elapsed = time.perf_counter() - start
+        if turn == 1 or turn % report_every == 0:
+            print(f"{turn:6d} {estimate_tokens(prompt):14d} {elapsed * 1e6:12.1f} {len(conv.turns):9d} {conv.summarized_turns:11d}")
+        await memory.append(profile.user_id, query, " ".join(_sentence(rng, rng.randint(10, 25)) for _ in range(4)))
+    print(f"prefix cache hits={prefixes.hits} misses={prefixes.misses}")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--turns", type=int, default=1000)
+    ap.add_argument("--report-every", type=int, default=100)
+    args = ap.parse_args()
+    asyncio.run(main(args.turns, args.report_every))
@@ -0,0 +1,61 @@
+"""Event ingestion and leaderboard query cost for the incremental gamification engine.
+
+Usage (from backend/): python -m benchmarks.bench_gamification --events 1000000 --users 100000
+"""
+import argparse
+import random
+import time
+from app.services.gamification import (
+    CHALLENGE_ATTEMPTED, CHAT_SESSION, SKILL_UPSERTED, GameEvent, GamificationEngine, cohort_key,
+)
+
+DEGREES = ["BTech", "BSc", "BCom", "BA", "MCA"]
+SKILLS = ["Python", "SQL", "Excel", "Machine Learning", "Java", "React", "AWS", "NLP", "C++", "Azure"]
+
+def main(n_events: int, n_users: int, queries: int):
+    rng = random.Random(5)
+    engine = GamificationEngine()
+    start = time.perf_counter()
+    for i in range(n_users):
+        engine.register_user(f"user-{i}", rng.choice(DEGREES), str(rng.randint(1, 8)))
+    register = time.perf_counter() - start
+
+    events = []
+    for _ in range(n_events):
+        uid = f"user-{rng.randrange(n_users)}"
+        roll = rng.random()
+        if roll < 0.5:
+            events.append(GameEvent(uid, SKILL_UPSERTED, {"skills": [(rng.choice(SKILLS), rng.randint(0, 100))]}))
+        elif roll < 0.8:
+            events.append(GameEvent(uid, CHALLENGE_ATTEMPTED, {"correct": rng.random() < 0.6, "score_delta": 5}))
+        else:
+            events.append(GameEvent(uid, CHAT_SESSION, {}))
+
+    start = time.perf_counter()
+    for event in events:
+        engine.apply(event)
+    ingest = time.perf_counter() - start
+
+    cohorts = ["all"] + [cohort_key(d) for d in DEGREES] + [cohort_key(d, "5") for d in DEGREES]
+    start = time.perf_counter()
+    for _ in range(queries):
+        engine.top(rng.choice(cohorts), 10)
+    top = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(queries):
+        engine.rank(f"user-{rng.randrange(n_users)}")
+    rank = time.perf_counter() - start
+
+    print(f"users={n_users} events={n_events} cohorts={len(engine.boards)}")
+    print(f"register users:   {n_users / register:10.0f} users/s")
+    print(f"event ingestion:  {n_events / ingest:10.0f} events/s ({ingest * 1e6 / n_events:.1f} us/event incl. leaderboard updates)")
+    print(f"top-10 query:     {top * 1e6 / queries:10.1f} us")
+    print(f"rank-of-user:     {rank * 1e6 / queries:10.1f} us")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--events", type=int, default=1_000_000)
+    ap.add_argument("--users", type=int, default=100_000)
+    ap.add_argument("--queries", type=int, default=10_000)
+    args = ap.parse_args()
+    main(args.events, args.users, args.queries)
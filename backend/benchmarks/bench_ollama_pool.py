@@ -0,0 +1,60 @@
+"""Throughput of OllamaClient.generate with the pooled client vs a fresh client per call.
+
+Usage (from backend/): python -m benchmarks.bench_ollama_pool --requests 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import time
+import httpx
+
+PORT = int(os.environ.get("STUB_OLLAMA_PORT", "11500"))
+# Point both model servers at the stub before the app settings are loaded
+os.environ["MODEL_SERVER_PRIMARY"] = os.environ["MODEL_SERVER_SECONDARY"] = f"http://127.0.0.1:{PORT}"
+# Measure the client itself: lift admission limits so the burst isn't queued or shed
+os.environ.setdefault("ADMISSION_MAX_QUEUE", "100000")
+os.environ.setdefault("ADMISSION_QUEUE_TIMEOUT", "600")
+
+from app.services.ollama_client import OllamaClient  # noqa: E402
+from benchmarks.stub_ollama import StubServer  # noqa: E402
+
+MODEL = "smollm:135m"
+
+async def _unpooled_generate(base: str, prompt: str) -> str:
+    # Previous behaviour: new AsyncClient (and TCP connection) per request
+    async with httpx.AsyncClient(timeout=60.0) as client:
+        r = await client.post(f"{base}/api/generate", json={"model": MODEL, "prompt": prompt, "stream": False})
+        r.raise_for_status()
+        return r.json().get("response", "")
+
+async def _run(call, total: int, concurrency: int) -> float:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with sem:
+            await call(f"prompt {i}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return time.perf_counter() - start
+
+async def main(total: int, concurrency: int, latency: float):
+    async with StubServer(port=PORT, latency=latency) as stub:
+        client = OllamaClient()
+        await client.startup()
+        try:
+            pooled = await _run(lambda p: client.generate(MODEL, p), total, concurrency)
+        finally:
+            await client.aclose()
+        unpooled = await _run(lambda p: _unpooled_generate(stub.url, p), total, concurrency)
+    print(f"requests={total} concurrency={concurrency} stub_latency={latency}s")
+    print(f"pooled:   {total / pooled:8.1f} req/s ({pooled:.2f}s)")
+    print(f"unpooled: {total / unpooled:8.1f} req/s ({unpooled:.2f}s)")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=1000)
+    ap.add_argument("--concurrency", type=int, default=50)
+    ap.add_argument("--latency", type=float, default=0.0)
+    args = ap.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.latency))
@@ -0,0 +1,68 @@
+"""Opportunity matching latency over a synthetic catalog (default 50k opportunities).
+
+Usage (from backend/): python -m benchmarks.bench_opportunity_matching --opportunities 50000 --users 200
+"""
+import argparse
+import random
+import statistics
+import time
+from app.services.opportunity_matching import CatalogEntry, OpportunityMatcher
+
+def build_catalog(n: int, vocab_size: int, rng: random.Random):
+    vocab = [f"skill-{i}" for i in range(vocab_size)]
+    # Skewed popularity so common skills have long postings lists, like real catalogs
+    weights = [1.0 / (i + 1) ** 0.8 for i in range(vocab_size)]
+    entries = []
+    for i in range(n):
+        picked = set(rng.choices(vocab, weights=weights, k=rng.randint(3, 8)))
+        entries.append(CatalogEntry(
+            id=f"opp-{i}", title=f"Opportunity {i}", company=f"Company {i % 997}",
+            required={s: rng.choice((0.5, 1.0, 1.0, 2.0)) for s in picked},
+        ))
+    return vocab, weights, entries
+
+def _pct(samples, p):
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * p))] * 1000
+
+def main(n: int, vocab_size: int, users: int, k: int):
+    rng = random.Random(11)
+    vocab, weights, entries = build_catalog(n, vocab_size, rng)
+    matcher = OpportunityMatcher()
+
+    start = time.perf_counter()
+    matcher.index.apply(entries)
+    build = time.perf_counter() - start
+
+    profiles = [
+        [(s, rng.randint(20, 100)) for s in set(rng.choices(vocab, weights=weights, k=rng.randint(5, 25)))]
+        for _ in range(users)
+    ]
+    latencies = []
+    for skills in profiles:
+        t = time.perf_counter()
+        matcher.match_page(skills, 0, k)
+        latencies.append(time.perf_counter() - t)
+
+    start = time.perf_counter()
+    matcher.match_many(profiles[:100], k)
+    batch = time.perf_counter() - start
+
+    changed = [CatalogEntry(id=f"opp-{i}", title="Updated", required={vocab[0]: 1.0, vocab[1]: 2.0}) for i in range(500)]
+    start = time.perf_counter()
+    matcher.index.apply(changed, removed=[f"opp-{i}" for i in range(500, 1000)])
+    incremental = time.perf_counter() - start
+
+    print(f"opportunities={n} vocab={vocab_size} users={users} k={k}")
+    print(f"index build:         {build * 1000:8.1f} ms")
+    print(f"single-user match:   p50 {_pct(latencies, 0.5):6.2f} ms  p95 {_pct(latencies, 0.95):6.2f} ms  mean {statistics.mean(latencies) * 1000:6.2f} ms")
+    print(f"batched (100 users): {batch * 1000:8.1f} ms total, {batch * 10:.2f} ms/user")
+    print(f"incremental update (500 changed, 500 removed): {incremental * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--opportunities", type=int, default=50_000)
+    ap.add_argument("--vocab", type=int, default=2000)
+    ap.add_argument("--users", type=int, default=200)
+    ap.add_argument("--k", type=int, default=20)
+    args = ap.parse_args()
+    main(args.opportunities, args.vocab, args.users, args.k)
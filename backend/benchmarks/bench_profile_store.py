@@ -0,0 +1,72 @@
+"""Profile read / skill-upsert throughput for the in-memory and SQLite profile stores.
+
+Usage (from backend/): python -m benchmarks.bench_profile_store --profiles 100000 --ops 5000
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from app.schemas.common import ProfileCreate, Skill
+from app.services.profile_store import PROFILES_T, InMemoryProfileRepository, SQLProfileRepository
+
+SKILL_NAMES = ["Python", "SQL", "Excel", "Machine Learning", "Data Analysis", "Java", "React", "AWS", "Azure", "NLP"]
+
+def _payload(i: int) -> ProfileCreate:
+    return ProfileCreate(user_id=f"user-{i}", name=f"Student {i}", degree="BTech", semester="5")
+
+async def _seed(store, n: int, sample: int):
+    """Bulk-load ``n`` profiles; returns create() throughput measured on the last ``sample`` of them."""
+    bulk = n - sample
+    if isinstance(store, SQLProfileRepository):
+        # Bulk insert so seeding 100k rows doesn't dominate the run; create() is timed below
+        engine = await store.engine()
+        async with engine.begin() as conn:
+            for offset in range(0, bulk, 10_000):
+                rows = [{**_payload(i).model_dump(), "career_paths": []} for i in range(offset, min(offset + 10_000, bulk))]
+                await conn.execute(PROFILES_T.insert(), rows)
+    else:
+        for i in range(bulk):
+            await store.create(_payload(i))
+    start = time.perf_counter()
+    for i in range(bulk, n):
+        await store.create(_payload(i))
+    return sample / (time.perf_counter() - start)
+
+async def _measure(store, n: int, ops: int, rng: random.Random):
+    ids = [f"user-{rng.randrange(n)}" for _ in range(ops)]
+    start = time.perf_counter()
+    for uid in ids:
+        await store.get(uid)
+    reads = time.perf_counter() - start
+    start = time.perf_counter()
+    for uid in ids:
+        picked = rng.sample(SKILL_NAMES, 3)
+        await store.upsert_skills(uid, [Skill(name=name, score=rng.randint(0, 100), evidence=["bench"]) for name in picked])
+    upserts = time.perf_counter() - start
+    return ops / reads, ops / upserts
+
+async def main(n: int, ops: int):
+    rng = random.Random(3)
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = {
+            "memory": InMemoryProfileRepository(),
+            "sqlite": SQLProfileRepository(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.sqlite3')}"),
+        }
+        print(f"profiles={n} ops={ops}")
+        for label, store in stores.items():
+            await store.startup()
+            try:
+                creates = await _seed(store, n, min(ops, n))
+                reads, upserts = await _measure(store, n, ops, rng)
+            finally:
+                await store.aclose()
+            print(f"{label:7s} create {creates:9.0f} ops/s | get {reads:9.0f} ops/s | upsert(3 skills) {upserts:9.0f} ops/s")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--profiles", type=int, default=100_000)
+    ap.add_argument("--ops", type=int, default=5000)
+    args = ap.parse_args()
+    asyncio.run(main(args.profiles, args.ops))
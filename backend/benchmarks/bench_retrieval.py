@@ -0,0 +1,56 @@
+"""Retrieval query latency against corpus size (synthetic Zipf-distributed passages).
+
+Usage (from backend/): python -m benchmarks.bench_retrieval --sizes 1000,10000,100000 --queries 500
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+from app.services.retrieval import BM25Index, Passage, build_index
+
+def synthetic_passages(n: int, vocab_size: int, words: int, rng: np.random.Generator):
+    # Zipf-like word frequencies so common terms have long postings, as in real text
+    ids = (rng.zipf(1.3, size=(n, words)) - 1) % vocab_size
+    for i, row in enumerate(ids):
+        yield Passage(f"doc-{i // 50}.md", f"Section {i}", " ".join(f"w{j}" for j in row))
+
+def _pct(samples, p):
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * p))] * 1000
+
+def _dir_mb(path: str) -> float:
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)) / 1e6
+
+def main(sizes, vocab_size: int, words: int, queries: int, k: int):
+    rng = np.random.default_rng(3)
+    print(f"{'passages':>9} {'build_s':>8} {'index_mb':>9} {'load_ms':>8} {'p50_ms':>7} {'p95_ms':>7} {'p99_ms':>7}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, "index")
+            start = time.perf_counter()
+            build_index(synthetic_passages(n, vocab_size, words, rng), out)
+            build_s = time.perf_counter() - start
+            start = time.perf_counter()
+            index = BM25Index(out)
+            load_ms = (time.perf_counter() - start) * 1000
+            # 2-6 term queries mixing common and rare words
+            terms = (rng.zipf(1.3, size=(queries, 6)) - 1) % vocab_size
+            samples = []
+            for q, row in enumerate(terms):
+                query = " ".join(f"w{j}" for j in row[: 2 + q % 5])
+                start = time.perf_counter()
+                for row_id, _ in index.search(query, k):
+                    index.passage(row_id)
+                samples.append(time.perf_counter() - start)
+            index.close()
+            print(f"{n:9d} {build_s:8.2f} {_dir_mb(out):9.1f} {load_ms:8.1f} {_pct(samples, 0.5):7.2f} {_pct(samples, 0.95):7.2f} {_pct(samples, 0.99):7.2f}")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="1000,10000,100000")
+    ap.add_argument("--vocab", type=int, default=50000)
+    ap.add_argument("--words", type=int, default=100)
+    ap.add_argument("--queries", type=int, default=500)
+    ap.add_argument("--k", type=int, default=3)
+    args = ap.parse_args()
+    main([int(s) for s in args.sizes.split(",")], args.vocab, args.words, args.queries, args.k)
@@ -0,0 +1,80 @@
+"""Response serialization cost for large profiles and opportunity lists.
+
+Compares, through a real ASGI round trip, the same payload served as:
+  default  - JSONResponse + response_model (validate, jsonable_encoder, json.dumps)
+  orjson   - ORJSONResponse + response_model (validate, jsonable_encoder, orjson)
+  model    - ModelResponse (pydantic-core dump, no re-validation) as used by the hot GETs
+
+Usage (from backend/): python -m benchmarks.bench_serialization --skills 300 --paths 200 --opportunities 2000
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import List
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
+from app.api.responses import ModelResponse
+from app.schemas.common import CareerPath, Opportunity, Profile, Skill
+
+def build_profile(skills: int, paths: int, rng: random.Random) -> Profile:
+    return Profile(
+        user_id="bench", name="Bench User", degree="B.Tech", semester="6", interests=["data", "ai", "cloud"],
+        skills=[
+            Skill(name=f"Skill {i}", score=rng.randint(0, 100), evidence=["resume", f"quiz:q{i}", f"resume:matches={rng.randint(1, 9)}"],
+                  last_updated="2024-06-01T10:00:00")
+            for i in range(skills)
+        ],
+        career_paths=[
+            CareerPath(name=f"Path {i}", description="Role overview " * 8, relevance=rng.randint(0, 100),
+                       required_skills=[f"Skill {rng.randrange(skills or 1)}" for _ in range(6)])
+            for i in range(paths)
+        ],
+    )
+
+def build_opportunities(n: int, rng: random.Random) -> List[Opportunity]:
+    return [
+        Opportunity(id=f"opp-{i}", title=f"Opportunity {i}", company=f"Company {i % 97}", location="Remote",
+                    match_score=rng.randint(0, 100), source="sample", url=f"https://example.com/{i}")
+        for i in range(n)
+    ]
+
+def build_app(profile: Profile, opportunities: List[Opportunity]) -> FastAPI:
+    app = FastAPI()
+    for name, cls in (("default", JSONResponse), ("orjson", ORJSONResponse)):
+        app.add_api_route(f"/{name}/profile", lambda: profile, response_model=Profile, response_class=cls)
+        app.add_api_route(f"/{name}/opportunities", lambda: opportunities, response_model=List[Opportunity], response_class=cls)
+    app.add_api_route("/model/profile", lambda: ModelResponse(profile), response_model=Profile)
+    app.add_api_route("/model/opportunities", lambda: ModelResponse(opportunities), response_model=List[Opportunity])
+    return app
+
+async def main(skills: int, paths: int, n_opps: int, rounds: int):
+    rng = random.Random(5)
+    app = build_app(build_profile(skills, paths, rng), build_opportunities(n_opps, rng))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for payload in ("profile", "opportunities"):
+            bodies = {}
+            print(f"{payload}: {'variant':>8} {'mean_ms':>8} {'p95_ms':>7} {'bytes':>9}")
+            for variant in ("default", "orjson", "model"):
+                url = f"/{variant}/{payload}"
+                await client.get(url)  # warm up adapters / route compilation
+                samples = []
+                for _ in range(rounds):
+                    start = time.perf_counter()
+                    r = await client.get(url)
+                    samples.append(time.perf_counter() - start)
+                bodies[variant] = r.json()
+                samples.sort()
+                mean = sum(samples) / len(samples) * 1000
+                print(f"{'':{len(payload) + 1}} {variant:>8} {mean:8.2f} {samples[int(len(samples) * 0.95)] * 1000:7.2f} {len(r.content):9d}")
+            assert bodies["default"] == bodies["orjson"] == bodies["model"], "variants must produce identical JSON"
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--skills", type=int, default=300)
+    ap.add_argument("--paths", type=int, default=200)
+    ap.add_argument("--opportunities", type=int, default=2000)
+    ap.add_argument("--rounds", type=int, default=200)
+    args = ap.parse_args()
+    asyncio.run(main(args.skills, args.paths, args.opportunities, args.rounds))
@@ -0,0 +1,48 @@
+"""Upstream call count for a burst of identical concurrent generations, with and without coalescing.
+
+Usage (from backend/): python -m benchmarks.bench_single_flight --burst 200 --distinct 5 --latency 0.5
+"""
+import argparse
+import asyncio
+import os
+import time
+
+PORT = int(os.environ.get("STUB_OLLAMA_PORT", "11500"))
+# Point both model servers at the stub before the app settings are loaded
+os.environ["MODEL_SERVER_PRIMARY"] = os.environ["MODEL_SERVER_SECONDARY"] = f"http://127.0.0.1:{PORT}"
+# Measure the client itself: lift admission limits so the burst isn't queued or shed
+os.environ.setdefault("ADMISSION_MAX_QUEUE", "100000")
+os.environ.setdefault("ADMISSION_QUEUE_TIMEOUT", "600")
+
+from app.services.ollama_client import OllamaClient  # noqa: E402
+from benchmarks.stub_ollama import StubServer  # noqa: E402
+
+MODEL = "smollm:135m"
+
+async def _burst(coalesce: bool, burst: int, distinct: int, latency: float):
+    async with StubServer(port=PORT, latency=latency) as stub:
+        client = OllamaClient()
+        client.coalesce = coalesce
+        try:
+            start = time.perf_counter()
+            answers = await asyncio.gather(*(client.generate(MODEL, f"daily challenge hint {i % distinct}") for i in range(burst)))
+            elapsed = time.perf_counter() - start
+        finally:
+            await client.aclose()
+        errors = sum(1 for a in answers if "(generation error" in a)
+        return stub.app.state.calls, elapsed, errors
+
+async def main(burst: int, distinct: int, latency: float):
+    print(f"burst={burst} distinct_prompts={distinct} stub_latency={latency}s")
+    for coalesce in (False, True):
+        calls, elapsed, errors = await _burst(coalesce, burst, distinct, latency)
+        label = "coalesced:  " if coalesce else "independent:"
+        print(f"{label} upstream_calls={calls:5d} wall={elapsed:.2f}s errors={errors}")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--burst", type=int, default=200)
+    ap.add_argument("--distinct", type=int, default=5)
+    ap.add_argument("--latency", type=float, default=0.5)
+    args = ap.parse_args()
+    asyncio.run(main(args.burst, args.distinct, args.latency))
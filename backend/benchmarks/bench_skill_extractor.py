@@ -0,0 +1,76 @@
+"""Skill extraction: per-keyword re.search loop (previous implementation) vs the compiled taxonomy matcher.
+
+Usage (from backend/): python -m benchmarks.bench_skill_extractor --terms 5000 --resumes 100
+"""
+import argparse
+import random
+import re
+import string
+import time
+from app.services.skill_taxonomy import SkillMatcher
+
+def _legacy_infer(text: str, keywords):
+    # Previous ResumeParser.infer_skills: one freshly built regex per keyword over the full text
+    found = []
+    lower = re.sub(r"[,.()]", " ", text.lower())
+    seen = set()
+    for kw in keywords:
+        pattern = r"\b" + re.escape(kw) + r"\b"
+        if re.search(pattern, lower):
+            if kw in seen:
+                continue
+            seen.add(kw)
+            found.append(kw.title())
+    return found
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10)))
+
+def build_corpus(n_terms: int, n_resumes: int, words_per_resume: int, seed: int = 7):
+    rng = random.Random(seed)
+    terms = set()
+    while len(terms) < n_terms:
+        terms.add(" ".join(_word(rng) for _ in range(rng.choice((1, 1, 2, 3)))))
+    terms = sorted(terms)
+    resumes = []
+    for _ in range(n_resumes):
+        words = [_word(rng) for _ in range(words_per_resume)]
+        # Sprinkle ~30 real skill mentions into each resume
+        for _ in range(30):
+            words.insert(rng.randrange(len(words)), rng.choice(terms))
+        resumes.append(" ".join(words))
+    return terms, resumes
+
+def main(n_terms: int, n_resumes: int, words_per_resume: int):
+    terms, resumes = build_corpus(n_terms, n_resumes, words_per_resume)
+
+    start = time.perf_counter()
+    matcher = SkillMatcher({t: t.title() for t in terms})
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled_sets = [{m.name for m in matcher.scan(r)} for r in resumes]
+    compiled = time.perf_counter() - start
+
+    re.purge()
+    start = time.perf_counter()
+    legacy_sets = [set(_legacy_infer(r, terms)) for r in resumes]
+    legacy = time.perf_counter() - start
+
+    print(f"terms={n_terms} resumes={n_resumes} words/resume={words_per_resume}")
+    print(f"compiled matcher: build {build * 1000:.1f} ms, scan {compiled * 1000 / n_resumes:.2f} ms/resume, skills found={sum(map(len, compiled_sets))}")
+    print(f"legacy loop:      {legacy * 1000 / n_resumes:.2f} ms/resume, skills found={sum(map(len, legacy_sets))}")
+    print(f"speedup: {legacy / compiled:.1f}x")
+    # Both find every term wherever it occurs, nested terms included, so the sets should agree
+    diffs = [(i, c - l, l - c) for i, (c, l) in enumerate(zip(compiled_sets, legacy_sets)) if c != l]
+    print(f"identical skill sets: {n_resumes - len(diffs)}/{n_resumes} resumes")
+    for i, only_compiled, only_legacy in diffs[:5]:
+        print(f"  resume {i}: only compiled={sorted(only_compiled)} only legacy={sorted(only_legacy)}")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--terms", type=int, default=5000)
+    ap.add_argument("--resumes", type=int, default=100)
+    ap.add_argument("--words", type=int, default=600)
+    args = ap.parse_args()
+    main(args.terms, args.resumes, args.words)
@@ -0,0 +1,65 @@
+"""Sync bandwidth and CPU: full export vs incremental after small edits, plus per-user key caching.
+
+Usage (from backend/): python -m benchmarks.bench_sync --skills 300 --paths 200 --turns 20
+"""
+import argparse
+import asyncio
+import random
+import time
+from app.schemas.common import CareerPath, Profile, Skill
+from app.services.conversation import conversation_memory
+from app.services.encryption import encryption_service
+from app.services.profile_store import profile_store
+from app.services.sync import sync_service
+
+def _wire_bytes(events) -> int:
+    return sum(len(e) for e in events)
+
+async def main(skills: int, paths: int, turns: int, edits: int):
+    rng = random.Random(9)
+    profile = Profile(
+        user_id="bench", name="Bench User", interests=["data", "cloud"],
+        skills=[Skill(name=f"Skill {i}", score=rng.randint(0, 100), evidence=["resume", f"quiz:q{i}"]) for i in range(skills)],
+        career_paths=[CareerPath(id=f"path-{i}", name=f"Path {i}", description="Role overview " * 6, relevance=rng.randint(0, 100)) for i in range(paths)],
+    )
+    await profile_store.restore(profile)
+    for i in range(turns // 2):
+        await conversation_memory.append("bench", f"Question {i} about my next skill?", "Advisor answer " * 20)
+
+    start = time.perf_counter()
+    chunks = await sync_service.snapshot("bench")
+    full = list(sync_service.export_events("bench", chunks, set()))
+    full_ms = (time.perf_counter() - start) * 1000
+    raw = sum(len(c.plain) for c in chunks)
+    print(f"state: {raw} bytes plaintext in {len(chunks)} chunks; full export {_wire_bytes(full)} bytes on the wire ({full_ms:.1f} ms)")
+
+    have = {c.hash for c in chunks}
+    print(f"{'edit':>24} {'chunks_sent':>12} {'wire_bytes':>11} {'vs_full':>8}")
+    for label, change in (
+        ("one skill score", lambda: profile_store.upsert_skills("bench", [Skill(name=f"Skill {rng.randrange(skills)}", score=rng.randint(0, 100))])),
+        ("new skill", lambda: profile_store.upsert_skills("bench", [Skill(name=f"New skill {rng.random()}", score=50)])),
+        ("new chat turn", lambda: conversation_memory.append("bench", "One more question?", "Another answer " * 20)),
+    ):
+        for _ in range(edits):
+            await change()
+        chunks = await sync_service.snapshot("bench")
+        events = list(sync_service.export_events("bench", chunks, have))
+        sent = sum(1 for c in chunks if c.hash not in have)
+        print(f"{label + f' x{edits}':>24} {sent:12d} {_wire_bytes(events):11d} {_wire_bytes(events) / _wire_bytes(full):8.1%}")
+        have = {c.hash for c in chunks}
+
+    users = [f"user-{i}" for i in range(2000)]
+    for label in ("derive (cold)", "derive (cached)"):
+        start = time.perf_counter()
+        for u in users:
+            encryption_service.for_user(u)
+        print(f"{label}: {(time.perf_counter() - start) / len(users) * 1e6:.1f} us/user")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--skills", type=int, default=300)
+    ap.add_argument("--paths", type=int, default=200)
+    ap.add_argument("--turns", type=int, default=20)
+    ap.add_argument("--edits", type=int, default=1)
+    args = ap.parse_args()
+    asyncio.run(main(args.skills, args.paths, args.turns, args.edits))
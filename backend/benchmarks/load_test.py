@@ -0,0 +1,332 @@
+"""Load test: scripted user journeys against the API, with p50/p95/p99 latency and RPS per endpoint.
+
+By default the app is served by uvicorn inside this process (real HTTP, so streaming and
+first-token times are measured as clients see them) against the stub Ollama server.
+``--base-url`` targets an already running server instead; start the stub there with
+``python -m benchmarks.stub_ollama`` and point MODEL_SERVER_PRIMARY/SECONDARY at it.
+In-process runs share one event loop between load generator and app, which is fine for
+run-to-run comparison; for absolute capacity numbers, drive a separately started server.
+
+Each run is saved as JSON under data/loadtest/. ``--compare latest`` (or a file path) diffs the
+run against the previous one for the same scenario and flags p95/error regressions.
+
+Usage (from backend/):
+    python -m benchmarks.load_test --scenario journey --users 200 --concurrency 50
+    python -m benchmarks.load_test --scenario chat --users 100 --stub-latency 0.2 --stub-token-latency 0.01 --compare latest
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+import httpx
+import uvicorn
+
+PORT = int(os.environ.get("STUB_OLLAMA_PORT", "11500"))
+os.environ.setdefault("MODEL_SERVER_PRIMARY", f"http://127.0.0.1:{PORT}")
+os.environ.setdefault("MODEL_SERVER_SECONDARY", f"http://127.0.0.1:{PORT}")
+# Virtual users chat far faster than people; per-user rate limiting would measure only 429s
+os.environ.setdefault("RATE_LIMIT_PER_MINUTE", "0")
+
+API = "/api/v1"
+MODEL_ERROR = "(generation error"  # chat answers 200 with this marker when every backend failed
+RESULTS_DIR = os.path.join("data", "loadtest")
+QUERIES = [
+    "What should I learn next to become a data analyst?",
+    "How do I prepare for a backend developer internship?",
+    "Which cloud certification is good for beginners?",
+    "Suggest projects to build a machine learning portfolio",
+    "How can I improve my resume for product roles?",
+    "Where can I learn docker and kubernetes?",
+]
+SKILLS = ["Python", "SQL", "Excel", "Data Analysis", "Machine Learning", "AWS", "Docker", "Communication", "Git", "React"]
+RESUME = (
+    "Final year B.Tech student. Projects: sales dashboard in Python and SQL with pandas; "
+    "image classifier with machine learning; deployed a Flask API with Docker on AWS. "
+    "Skills: python, sql, excel, git, communication, data analysis."
+)
+
+class Recorder:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.status: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.degraded: Dict[str, int] = defaultdict(int)  # 200s carrying a model failure in the answer
+
+    def add(self, name: str, seconds: float, status: int, degraded: bool = False):
+        self.samples[name].append(seconds)
+        self.status[name][status] += 1
+        if status >= 400:
+            self.errors[name] += 1
+        if degraded:
+            self.degraded[name] += 1
+
+    async def timed(self, name: str, call: Awaitable[httpx.Response]) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            r = await call
+        except httpx.HTTPError:
+            self.add(name, time.perf_counter() - start, 599)  # transport failure
+            return None
+        self.add(name, time.perf_counter() - start, r.status_code, MODEL_ERROR in r.text)
+        return r
+
+class VirtualUser:
+    """One simulated client; steps share its id so later calls hit the profile it created."""
+
+    def __init__(self, client: httpx.AsyncClient, rec: Recorder, user_id: str, rng: random.Random):
+        self.client = client
+        self.rec = rec
+        self.user_id = user_id
+        self.rng = rng
+
+    async def device_register(self):
+        body = {"user_id": self.user_id, "ram_mb": self.rng.choice([1024, 3072, 4096, 8192]), "cpu_cores": self.rng.choice([4, 6, 8])}
+        await self.rec.timed("POST /device/register", self.client.post(f"{API}/device/register", json=body))
+
+    async def profile_create(self):
+        body = {"user_id": self.user_id, "name": "Load Test", "degree": "B.Tech", "semester": str(self.rng.randint(1, 8)), "interests": ["data", "ai"]}
+        await self.rec.timed("POST /profile/create", self.client.post(f"{API}/profile/create", json=body))
+
+    async def profile_get(self):
+        await self.rec.timed("GET /profile/{user_id}", self.client.get(f"{API}/profile/{self.user_id}"))
+
+    async def skills_upsert(self):
+        skills = [{"name": s, "score": self.rng.randint(10, 90)} for s in self.rng.sample(SKILLS, 4)]
+        await self.rec.timed("POST /skills/upsert", self.client.post(f"{API}/skills/upsert", json={"user_id": self.user_id, "skills": skills}))
+
+    async def skills_list(self):
+        await self.rec.timed("GET /skills/{user_id}", self.client.get(f"{API}/skills/{self.user_id}"))
+
+    async def chat_ask(self):
+        body = {"user_id": self.user_id, "query": self.rng.choice(QUERIES)}
+        await self.rec.timed("POST /chat/ask", self.client.post(f"{API}/chat/ask", json=body))
+
+    async def chat_stream(self):
+        body = {"user_id": self.user_id, "query": self.rng.choice(QUERIES)}
+        start = time.perf_counter()
+        try:
+            async with self.client.stream("POST", f"{API}/chat/stream", json=body) as r:
+                first, degraded = None, False
+                async for line in r.aiter_lines():
+                    if first is None and '"token"' in line:
+                        first = time.perf_counter() - start
+                        self.rec.add("POST /chat/stream [first token]", first, r.status_code)
+                    degraded = degraded or MODEL_ERROR in line
+            self.rec.add("POST /chat/stream", time.perf_counter() - start, r.status_code, degraded)
+        except httpx.HTTPError:
+            self.rec.add("POST /chat/stream", time.perf_counter() - start, 599)
+
+    async def opportunities_match(self):
+        await self.rec.timed("GET /opportunities/match/{user_id}", self.client.get(f"{API}/opportunities/match/{self.user_id}"))
+
+    async def challenges_daily(self):
+        await self.rec.timed("GET /challenges/daily", self.client.get(f"{API}/challenges/daily", params={"user_id": self.user_id}))
+
+    async def resume_parse(self):
+        files = {"file": ("resume.txt", f"{RESUME} Ref {self.user_id}".encode(), "text/plain")}
+        await self.rec.timed("POST /parse/resume", self.client.post(f"{API}/parse/resume", params={"user_id": self.user_id}, files=files))
+
+    async def gamification_status(self):
+        await self.rec.timed("GET /gamification/status/{user_id}", self.client.get(f"{API}/gamification/status/{self.user_id}"))
+
+SCENARIOS: Dict[str, List[str]] = {
+    # Onboarding flow a new student goes through, then one question
+    "journey": ["device_register", "profile_create", "skills_upsert", "chat_ask", "opportunities_match", "resume_parse"],
+    # Returning users mostly chatting
+    "chat": ["profile_create", "chat_ask", "chat_stream", "chat_ask", "chat_stream"],
+    # Dashboard reads, no model calls
+    "read": ["profile_create", "skills_upsert", "profile_get", "skills_list", "opportunities_match", "challenges_daily", "gamification_status"],
+}
+
+def _pct(samples: List[float], p: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * p))] * 1000
+
+def summarize(rec: Recorder, wall: float) -> Dict:
+    endpoints = {}
+    for name, samples in sorted(rec.samples.items()):
+        samples = sorted(samples)
+        endpoints[name] = {
+            "count": len(samples),
+            "errors": rec.errors[name],
+            "degraded": rec.degraded[name],
+            "status": {str(k): v for k, v in sorted(rec.status[name].items())},
+            "rps": round(len(samples) / wall, 2),
+            "mean_ms": round(sum(samples) / len(samples) * 1000, 2),
+            "p50_ms": round(_pct(samples, 0.50), 2),
+            "p95_ms": round(_pct(samples, 0.95), 2),
+            "p99_ms": round(_pct(samples, 0.99), 2),
+            "max_ms": round(samples[-1] * 1000, 2),
+        }
+    # "[first token]" rows are a second view of the same requests
+    requests = sum(e["count"] for n, e in endpoints.items() if not n.endswith("]"))
+    errors = sum(e["errors"] for n, e in endpoints.items() if not n.endswith("]"))
+    degraded = sum(e["degraded"] for n, e in endpoints.items() if not n.endswith("]"))
+    return {"requests": requests, "errors": errors, "degraded": degraded, "rps": round(requests / wall, 2), "endpoints": endpoints}
+
+def print_report(result: Dict):
+    cfg = result["config"]
+    print(f"scenario={result['scenario']} target={cfg['target']} users={cfg['users']} concurrency={cfg['concurrency']} "
+          f"iterations={cfg['iterations']} wall={result['duration_s']}s")
+    print(f"{'endpoint':40} {'count':>6} {'err':>5} {'degr':>5} {'rps':>8} {'p50_ms':>8} {'p95_ms':>8} {'p99_ms':>8}")
+    for name, e in result["endpoints"].items():
+        print(f"{name:40} {e['count']:6d} {e['errors']:5d} {e['degraded']:5d} {e['rps']:8.1f} {e['p50_ms']:8.2f} {e['p95_ms']:8.2f} {e['p99_ms']:8.2f}")
+    print(f"{'total':40} {result['requests']:6d} {result['errors']:5d} {result['degraded']:5d} {result['rps']:8.1f}")
+
+def find_baseline(spec: str, out_dir: str, scenario: str, exclude: str) -> Optional[str]:
+    if spec != "latest":
+        return spec
+    runs = sorted(p for p in glob.glob(os.path.join(out_dir, f"{scenario}-*.json")) if os.path.abspath(p) != os.path.abspath(exclude))
+    return runs[-1] if runs else None
+
+def compare(result: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Print per-endpoint deltas; return the endpoints whose p95 or error rate regressed."""
+    regressions = []
+    print(f"\nvs baseline {baseline['started_at']} ({baseline.get('git_commit') or '?'}):")
+    print(f"{'endpoint':40} {'p50_ms':>16} {'p95_ms':>16} {'rps':>14} {'err%':>12}")
+    for name, e in result["endpoints"].items():
+        b = baseline["endpoints"].get(name)
+        if b is None:
+            print(f"{name:40} (new)")
+            continue
+        dp95 = (e["p95_ms"] - b["p95_ms"]) / b["p95_ms"] if b["p95_ms"] else 0.0
+        err = (e["errors"] + e.get("degraded", 0)) / e["count"]
+        berr = (b["errors"] + b.get("degraded", 0)) / b["count"]
+        # Ignore sub-millisecond noise on very fast endpoints
+        flag = (dp95 > threshold and e["p95_ms"] - b["p95_ms"] > 1.0) or err > berr + 0.01
+        if flag:
+            regressions.append(name)
+        print(f"{name:40} {b['p50_ms']:7.2f}->{e['p50_ms']:7.2f} {b['p95_ms']:7.2f}->{e['p95_ms']:7.2f} "
+              f"{b['rps']:6.1f}->{e['rps']:6.1f} {berr:5.1%}->{err:5.1%}{'  REGRESSION' if flag else ''}")
+    return regressions
+
+class AppServer:
+    """The API under uvicorn in this event loop (lifespan included), like ``StubServer``."""
+
+    def __init__(self, app, port: int):
+        self.url = f"http://127.0.0.1:{port}"
+        self._server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+        self._task = None
+
+    async def __aenter__(self):
+        self._task = asyncio.create_task(self._server.serve())
+        while not self._server.started:
+            if self._task.done():
+                raise RuntimeError("API server failed to start")
+            await asyncio.sleep(0.01)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._server.should_exit = True
+        await self._task
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+async def run_users(client: httpx.AsyncClient, steps: List[Callable], users: int, concurrency: int, iterations: int, seed: int, tag: str = "") -> Recorder:
+    rec = Recorder()
+    sem = asyncio.Semaphore(concurrency)
+    run_id = f"{int(time.time())}-{seed}{tag}"
+
+    async def one(i: int):
+        async with sem:
+            vu = VirtualUser(client, rec, f"lt-{run_id}-{i}", random.Random(seed * 100_003 + i))
+            for _ in range(iterations):
+                for step in steps:
+                    await step(vu)
+
+    await asyncio.gather(*(one(i) for i in range(users)))
+    return rec
+
+async def main(args) -> int:
+    steps = [getattr(VirtualUser, name) for name in SCENARIOS[args.scenario]]
+    # One connection per active virtual user, as with real devices
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    started = datetime.now(timezone.utc)
+
+    async def drive(base_url: str):
+        async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+            if args.warmup:
+                # Discarded: process-pool spawn, index loads and connection setup would skew the first samples
+                await run_users(client, steps, args.warmup, args.concurrency, 1, args.seed, tag="w")
+            start = time.perf_counter()
+            rec = await run_users(client, steps, args.users, args.concurrency, args.iterations, args.seed)
+            return rec, time.perf_counter() - start
+
+    if args.base_url:
+        rec, wall = await drive(args.base_url)
+    else:
+        from app.main import app
+        from benchmarks.stub_ollama import StubServer
+        stub_options = {"jitter": args.stub_jitter, "tokens": args.stub_tokens, "error_rate": args.stub_error_rate}
+        async with StubServer(port=PORT, latency=args.stub_latency, token_latency=args.stub_token_latency, **stub_options):
+            async with AppServer(app, args.app_port) as server:
+                rec, wall = await drive(server.url)
+
+    result = {
+        "format": 1,
+        "scenario": args.scenario,
+        "started_at": started.isoformat(timespec="seconds"),
+        "duration_s": round(wall, 3),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "config": {
+            "target": args.base_url or "in-process", "users": args.users, "concurrency": args.concurrency,
+            "iterations": args.iterations, "warmup": args.warmup, "seed": args.seed, "steps": SCENARIOS[args.scenario],
+            "stub": None if args.base_url else {
+                "latency": args.stub_latency, "token_latency": args.stub_token_latency, "jitter": args.stub_jitter,
+                "tokens": args.stub_tokens, "error_rate": args.stub_error_rate,
+            },
+        },
+        **summarize(rec, wall),
+    }
+    print_report(result)
+    os.makedirs(args.out_dir, exist_ok=True)
+    path = os.path.join(args.out_dir, f"{args.scenario}-{started.strftime('%Y%m%dT%H%M%SZ')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"saved {path}")
+
+    if args.compare:
+        baseline_path = find_baseline(args.compare, args.out_dir, args.scenario, path)
+        if baseline_path is None:
+            print("no baseline run to compare with")
+            return 0
+        with open(baseline_path, encoding="utf-8") as f:
+            regressions = compare(result, json.load(f), args.threshold)
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scenario", choices=sorted(SCENARIOS), default="journey")
+    ap.add_argument("--users", type=int, default=100, help="virtual users in total")
+    ap.add_argument("--concurrency", type=int, default=20, help="virtual users active at once")
+    ap.add_argument("--iterations", type=int, default=1, help="times each user repeats the scenario")
+    ap.add_argument("--warmup", type=int, default=10, help="virtual users run first and not recorded")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--timeout", type=float, default=60.0)
+    ap.add_argument("--base-url", default="", help="target a running server instead of the in-process app")
+    ap.add_argument("--app-port", type=int, default=8765, help="port for the in-process app")
+    ap.add_argument("--stub-latency", type=float, default=0.05, help="stub time to first token (s)")
+    ap.add_argument("--stub-token-latency", type=float, default=0.0, help="stub delay per streamed token (s)")
+    ap.add_argument("--stub-jitter", type=float, default=0.2, help="+/- fraction applied to stub delays")
+    ap.add_argument("--stub-tokens", type=int, default=0, help="answer length in tokens (0 = short default answer)")
+    ap.add_argument("--stub-error-rate", type=float, default=0.0)
+    ap.add_argument("--out-dir", default=RESULTS_DIR)
+    ap.add_argument("--compare", default="", help="baseline JSON path, or 'latest' for the previous run of this scenario")
+    ap.add_argument("--threshold", type=float, default=0.2, help="p95 growth that counts as a regression")
+    ap.add_argument("--fail-on-regression", action="store_true")
+    sys.exit(asyncio.run(main(ap.parse_args())))
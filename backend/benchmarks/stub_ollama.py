@@ -0,0 +1,97 @@
+"""Minimal stand-in for an Ollama server, used by the benchmark scripts.
+
+Run standalone with ``python -m benchmarks.stub_ollama --port 11500 --latency 0.05``.
+``--jitter`` spreads each delay by +/- that fraction, ``--tokens`` sets the answer length and
+``--error-rate`` makes that share of generations fail with HTTP 500.
+"""
+import argparse
+import asyncio
+import json
+import random
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+
+STUB_MODELS = ("llama3.2:3b", "llama3.2:1b", "gemma3:270m", "smollm:135m")
+
+def create_stub_app(
+    latency: float = 0.0, token_latency: float = 0.0, response: str = "stub answer from the model",
+    jitter: float = 0.0, tokens: int = 0, error_rate: float = 0.0, seed: int = 0,
+) -> FastAPI:
+    stub = FastAPI()
+    stub.state.calls = 0
+    stub.state.errors = 0
+    stub.state.loaded = set()
+    rng = random.Random(seed)
+    if tokens:
+        words = response.split(" ")
+        response = " ".join(words[i % len(words)] for i in range(tokens))
+
+    def delay(base: float) -> float:
+        return base * (1 + rng.uniform(-jitter, jitter)) if jitter else base
+
+    @stub.post("/api/generate")
+    async def generate(payload: dict):
+        stub.state.calls += 1
+        model = payload.get("model")
+        stub.state.loaded.add(model)
+        if latency:
+            await asyncio.sleep(delay(latency))
+        if error_rate and rng.random() < error_rate:
+            stub.state.errors += 1
+            return JSONResponse({"error": "stub failure"}, status_code=500)
+        if not payload.get("stream", True):
+            return {"model": model, "response": response, "done": True}
+
+        async def chunks():
+            for word in response.split(" "):
+                if token_latency:
+                    await asyncio.sleep(delay(token_latency))
+                yield json.dumps({"model": model, "response": word + " ", "done": False}) + "\n"
+            yield json.dumps({"model": model, "response": "", "done": True}) + "\n"
+
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    @stub.get("/api/tags")
+    async def tags():
+        return {"models": [{"name": m} for m in STUB_MODELS]}
+
+    @stub.get("/api/ps")
+    async def ps():
+        return {"models": [{"name": m} for m in sorted(stub.state.loaded)]}
+
+    return stub
+
+class StubServer:
+    """Runs the stub app with uvicorn inside the current event loop."""
+
+    def __init__(self, port: int = 11500, latency: float = 0.0, token_latency: float = 0.0, **options):
+        self.app = create_stub_app(latency=latency, token_latency=token_latency, **options)
+        self.port = port
+        self.url = f"http://127.0.0.1:{port}"
+        self._server = uvicorn.Server(uvicorn.Config(self.app, host="127.0.0.1", port=port, log_level="warning"))
+        self._task = None
+
+    async def __aenter__(self):
+        self._task = asyncio.create_task(self._server.serve())
+        while not self._server.started:
+            await asyncio.sleep(0.01)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._server.should_exit = True
+        await self._task
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=11500)
+    ap.add_argument("--latency", type=float, default=0.0)
+    ap.add_argument("--token-latency", type=float, default=0.0)
+    ap.add_argument("--jitter", type=float, default=0.0)
+    ap.add_argument("--tokens", type=int, default=0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    args = ap.parse_args()
+    app = create_stub_app(
+        latency=args.latency, token_latency=args.token_latency, jitter=args.jitter, tokens=args.tokens, error_rate=args.error_rate,
+    )
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
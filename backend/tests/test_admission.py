@@ -0,0 +1,137 @@
+import asyncio
+import pytest
+from app.services.admission import AdmissionController, AdmissionRejected, BackendGate, priority_for
+
+class FakeBackend:
+    def __init__(self, name, capacity, fallback_only=False):
+        self.name = name
+        self.capacity = capacity
+        self.fallback_only = fallback_only
+        self.ewma_latency = 0.5
+
+def test_fills_free_slots_then_queues():
+    async def run():
+        ctl = AdmissionController(max_queue=10, queue_timeout=1.0, rate_per_minute=0)
+        a, b = FakeBackend("a", 1), FakeBackend("b", 1)
+        first = await ctl.acquire([a, b])
+        second = await ctl.acquire([a, b])
+        waiter = asyncio.create_task(ctl.acquire([a, b]))
+        await asyncio.sleep(0)
+        assert not waiter.done() and ctl.queue_depth == 1
+        ctl.release(first)
+        return first, second, await waiter, ctl
+
+    first, second, third, ctl = asyncio.run(run())
+    assert (first.name, second.name, third.name) == ("a", "b", "a")
+    assert ctl.gates["a"].active == 1 and ctl.queued_total == 1
+
+def test_sheds_when_queue_full():
+    async def run():
+        ctl = AdmissionController(max_queue=2, queue_timeout=5.0, rate_per_minute=0)
+        a = FakeBackend("a", 1)
+        await ctl.acquire([a])
+        waiters = [asyncio.create_task(ctl.acquire([a])) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as exc:
+            await ctl.acquire([a])
+        for w in waiters:
+            w.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        return ctl, exc.value
+
+    ctl, rejected = asyncio.run(run())
+    assert rejected.status_code == 503 and rejected.retry_after >= 1
+    assert ctl.rejected["queue_full"] == 1
+
+def test_queue_timeout_rejects_with_503():
+    async def run():
+        ctl = AdmissionController(max_queue=5, queue_timeout=0.05, rate_per_minute=0)
+        a = FakeBackend("a", 1)
+        await ctl.acquire([a])
+        with pytest.raises(AdmissionRejected) as exc:
+            await ctl.acquire([a])
+        return ctl, exc.value
+
+    ctl, rejected = asyncio.run(run())
+    assert rejected.status_code == 503
+    assert ctl.rejected["queue_timeout"] == 1 and ctl.queue_depth == 0
+
+def test_waiters_served_by_priority_then_arrival():
+    async def run():
+        gate = BackendGate("a", 1)
+        assert gate.try_acquire()
+        order = []
+
+        async def wait(tag, priority):
+            await gate.acquire(priority, timeout=5.0)
+            order.append(tag)
+
+        tasks = []
+        for tag, priority in [("bg", 9), ("mid1", 1), ("budget", 0), ("mid2", 1)]:
+            tasks.append(asyncio.create_task(wait(tag, priority)))
+            await asyncio.sleep(0)
+        for _ in tasks:
+            gate.release()
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        return order, gate
+
+    order, gate = asyncio.run(run())
+    assert order == ["budget", "mid1", "mid2", "bg"]
+    assert gate.active == 1 and gate.queued == 0
+
+def test_try_acquire_does_not_jump_the_queue():
+    async def run():
+        gate = BackendGate("a", 1)
+        assert gate.try_acquire()
+        waiter = asyncio.create_task(gate.acquire(1, timeout=5.0))
+        await asyncio.sleep(0)
+        gate.release()  # slot goes to the waiter, not to a later try_acquire
+        got = gate.try_acquire()
+        await waiter
+        return got, gate
+
+    got, gate = asyncio.run(run())
+    assert not got and gate.active == 1
+
+def test_cancelled_waiter_hands_slot_on():
+    async def run():
+        gate = BackendGate("a", 1)
+        gate.try_acquire()
+        leaving = asyncio.create_task(gate.acquire(0, timeout=5.0))
+        staying = asyncio.create_task(gate.acquire(1, timeout=5.0))
+        await asyncio.sleep(0)
+        leaving.cancel()
+        await asyncio.gather(leaving, return_exceptions=True)
+        gate.release()
+        await asyncio.wait_for(staying, 1.0)
+        return gate
+
+    gate = asyncio.run(run())
+    assert gate.active == 1 and gate.queued == 0
+
+def test_fallback_only_backend_takes_no_overflow_while_regular_is_up():
+    async def run():
+        ctl = AdmissionController(max_queue=5, queue_timeout=0.05, rate_per_minute=0)
+        regular, fallback = FakeBackend("primary", 1), FakeBackend("localhost", 4, fallback_only=True)
+        await ctl.acquire([regular, fallback])
+        with pytest.raises(AdmissionRejected):
+            await ctl.acquire([regular, fallback])
+        # With no regular backend available, the fallback host is used
+        return await ctl.acquire([fallback])
+
+    assert asyncio.run(run()).name == "localhost"
+
+def test_rate_limit_per_user():
+    ctl = AdmissionController(rate_per_minute=60, burst=2)
+    ctl.check_rate("u1")
+    ctl.check_rate("u1")
+    with pytest.raises(AdmissionRejected) as exc:
+        ctl.check_rate("u1")
+    assert exc.value.status_code == 429
+    ctl.check_rate("u2")  # buckets are per user
+    assert ctl.rejected["rate_limited"] == 1
+
+def test_priority_for_tiers():
+    assert priority_for("budget") < priority_for("mid_range") < priority_for("premium")
+    assert priority_for(None) == priority_for("unknown") == 1
@@ -0,0 +1,88 @@
+import asyncio
+import json
+import uuid
+import pytest
+from httpx import AsyncClient
+from app.main import app
+from app.schemas.common import ProfileCreate
+from app.services.challenges import DEFAULT_BANK_PATH, BankChallenge, SQLAttemptRepository, challenge_service, clean_keywords, grade
+from app.services.profile_store import SQLProfileRepository
+
+def challenge(cid):
+    return challenge_service.get(cid)
+
+def test_every_expected_answer_passes():
+    with open(DEFAULT_BANK_PATH, encoding="utf-8") as f:
+        rows = json.load(f)
+    for row in rows:
+        assert grade(challenge(row["id"]), row["expected_answer"]), row["id"]
+
+@pytest.mark.parametrize("cid, answer", [
+    ("sql-easy-1", "I don't know at all"),
+    ("sql-easy-1", "all of them"),
+    ("sql-easy-2", "nowhere"),
+    ("sql-easy-2", ""),
+    ("data-analysis-easy-2", "no idea"),
+    ("data-analysis-easy-2", "a missing value"),
+    ("sql-medium-2", "group"),  # one keyword of three
+    ("python-easy-2", "listed"),
+])
+def test_wrong_answers_fail(cid, answer):
+    assert not grade(challenge(cid), answer)
+
+@pytest.mark.parametrize("cid, answer", [
+    ("sql-easy-1", "It returns every column"),
+    ("sql-easy-2", "the where clause"),
+    ("sql-medium-2", "It filters the groups after aggregation"),
+    ("python-hard-2", "Lots of concurrent I/O on one thread with an event loop"),
+    ("data-analysis-easy-2", "A field that is empty or null"),
+])
+def test_right_answers_pass(cid, answer):
+    assert grade(challenge(cid), answer)
+
+def test_stopword_keywords_are_dropped():
+    assert clean_keywords(["No", "all", "all|every", " Data "]) == ("all|every", "data")
+    assert all(k not in ("no", "all") for c in challenge_service.pools.by_id.values() for k in c.keywords)
+
+def test_keywords_fall_back_to_expected_answer():
+    c = BankChallenge(id="x", topic="t", difficulty="easy", question="q", expected_answer="Lists are mutable")
+    assert grade(c, "lists are mutable")
+    assert not grade(c, "are they?")
+
+async def _submit_flow():
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        user_id = str(uuid.uuid4())
+        r = await ac.post("/api/v1/profile/create", json={"user_id": user_id, "name": "Quiz"})
+        assert r.status_code == 200
+        daily = (await ac.get("/api/v1/challenges/daily", params={"user_id": user_id})).json()
+        own = {c["id"] for c in daily}
+        other = next(cid for cid in challenge_service.pools.by_id if cid not in own)
+        r = await ac.post("/api/v1/challenges/submit", json={"user_id": user_id, "challenge_id": other, "answer": "x"})
+        assert r.status_code == 403
+        target = challenge_service.get(daily[0]["id"])
+        body = {"user_id": user_id, "challenge_id": target.id, "answer": target.expected_answer}
+        r = await ac.post("/api/v1/challenges/submit", json=body)
+        assert r.status_code == 200 and r.json()["correct"] and r.json()["score_delta"] > 0
+        r = await ac.post("/api/v1/challenges/submit", json=body)
+        assert r.status_code == 409
+        status = (await ac.get(f"/api/v1/gamification/status/{user_id}")).json()
+        return status
+
+def test_submit_only_own_daily_set_once():
+    status = asyncio.run(_submit_flow())
+    assert status["points"] > 0
+
+def test_attempts_survive_a_restart(tmp_path):
+    async def run():
+        store = SQLProfileRepository(f"sqlite+aiosqlite:///{tmp_path / 'attempts.sqlite3'}")
+        try:
+            await store.create(ProfileCreate(user_id="u1"))
+            first = await SQLAttemptRepository(store).add("u1", "2026-10-17", "sql-easy-1", True)
+            # A fresh repository, as after a restart or on another worker, sees the stored attempt
+            repeat = await SQLAttemptRepository(store).add("u1", "2026-10-17", "sql-easy-1", False)
+            next_day = await SQLAttemptRepository(store).add("u1", "2026-10-18", "sql-easy-1", False)
+        finally:
+            await store.aclose()
+        return first, repeat, next_day
+
+    assert asyncio.run(run()) == (True, False, True)
@@ -0,0 +1,32 @@
+import asyncio
+from app.schemas.common import Profile
+from app.services.conversation import ContextPrefixCache, ConversationMemory, InMemoryConversationRepository, assemble_prompt
+from app.services.retrieval import Passage
+
+MODEL = "llama3.2:1b"
+QUERY = "Tell me more about the second one"
+NOTES = [Passage(source="roadmap.md", title="SQL", text="Start with SELECT and JOIN.")]
+
+def test_cache_key_covers_history():
+    async def run():
+        memory = ConversationMemory(InMemoryConversationRepository())
+        prefixes = ContextPrefixCache()
+        # Same skills and interests: the two users share a profile fingerprint
+        alice = prefixes.get(Profile(user_id="alice", interests=["data"]))
+        bob = prefixes.get(Profile(user_id="bob", interests=["data"]))
+        first = assemble_prompt(alice, await memory.get("alice"), QUERY, MODEL)
+        await memory.append("alice", "Which careers fit me?", "Data analyst or ML engineer.")
+        await memory.append("bob", "Which careers fit me?", "Backend developer or SRE.")
+        followup_a = assemble_prompt(alice, await memory.get("alice"), QUERY, MODEL)
+        followup_b = assemble_prompt(bob, await memory.get("bob"), QUERY, MODEL)
+        again_a = assemble_prompt(alice, await memory.get("alice"), QUERY, MODEL)
+        with_notes = assemble_prompt(alice, await memory.get("alice"), QUERY, MODEL, NOTES)
+        return alice, first, followup_a, followup_b, again_a, with_notes
+
+    alice, first, followup_a, followup_b, again_a, with_notes = asyncio.run(run())
+    assert first[1] == alice.fingerprint
+    assert "ML engineer" in followup_a[0] and followup_a[1] != first[1]
+    # A follow-up never reuses another conversation's answer
+    assert followup_a[1] != followup_b[1]
+    assert again_a[1] == followup_a[1]
+    assert with_notes[1] != followup_a[1]
@@ -0,0 +1,104 @@
+import asyncio
+import json
+import uuid
+from httpx import AsyncClient
+from app.api import routes_chat
+from app.main import app
+from app.services.device_registry import DeviceRegistry, SQLDeviceRepository
+from app.services.model_capabilities import capability_table
+from app.services.model_router import ModelDecision
+from app.services.ollama_client import Served
+from app.services.profile_store import SQLProfileRepository
+
+MODEL = "smollm:135m"
+
+def prefer_local(requested, tier, allow_local, local_tps=None):
+    if allow_local:
+        return ModelDecision(model=MODEL, route="local", reason="local_faster")
+    return ModelDecision(model=MODEL, route="primary", reason="local_infeasible", host="http://primary")
+
+def route_local(monkeypatch):
+    monkeypatch.setattr(routes_chat.model_router, "decide", prefer_local)
+
+    async def no_server(*args, **kwargs):
+        raise AssertionError("a 'local' placement must not generate on a server")
+        yield
+
+    monkeypatch.setattr(routes_chat.ollama_client, "stream", no_server)
+
+async def new_user(ac) -> str:
+    user_id = str(uuid.uuid4())
+    r = await ac.post("/api/v1/profile/create", json={"user_id": user_id, "name": "Dev", "interests": ["data"], "language": "en"})
+    assert r.status_code == 200
+    return user_id
+
+def test_local_ask_returns_prompt_for_the_device(monkeypatch):
+    route_local(monkeypatch)
+
+    async def run():
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            user_id = await new_user(ac)
+            query = f"What should I learn next? {uuid.uuid4().hex}"
+            r = await ac.post("/api/v1/chat/ask", json={"user_id": user_id, "query": query, "language": "en", "accept_local": True})
+            # The device posts back what it generated so the next prompt includes it
+            recorded = await ac.post(f"/api/v1/chat/history/{user_id}", json={"query": query, "answer": "Try SQL."})
+            history = await ac.get(f"/api/v1/chat/history/{user_id}")
+            return r, recorded, history.json()
+
+    r, recorded, history = asyncio.run(run())
+    body = r.json()
+    assert r.status_code == 200
+    assert body["route"] == "local" and body["answer"] == "" and body["used_model"] == MODEL
+    assert "What should I learn next?" in body["prompt"]
+    assert recorded.status_code == 200
+    assert [t["content"] for t in history["turns"]][-1] == "Try SQL."
+
+def test_local_stream_sends_prompt_event(monkeypatch):
+    route_local(monkeypatch)
+
+    async def run():
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            user_id = await new_user(ac)
+            query = f"Which career fits me? {uuid.uuid4().hex}"
+            r = await ac.post("/api/v1/chat/stream", json={"user_id": user_id, "query": query, "language": "en", "accept_local": True})
+            return [json.loads(line) for line in r.text.splitlines()]
+
+    events = asyncio.run(run())
+    assert [e["type"] for e in events] == ["meta", "local", "done"]
+    assert events[0]["route"] == "local" and "served_by" not in events[0]
+    assert events[1]["model"] == MODEL and "Which career fits me?" in events[1]["prompt"]
+
+def test_server_answers_unless_client_accepts_local(monkeypatch):
+    monkeypatch.setattr(routes_chat.model_router, "decide", prefer_local)
+
+    async def server(model, prompt, route, priority):
+        yield Served(backend=route, fallback=False)
+        yield "Learn SQL."
+
+    monkeypatch.setattr(routes_chat.ollama_client, "stream", server)
+
+    async def run():
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            user_id = await new_user(ac)
+            query = f"Any tips? {uuid.uuid4().hex}"
+            return await ac.post("/api/v1/chat/ask", json={"user_id": user_id, "query": query, "language": "en"})
+
+    body = asyncio.run(run()).json()
+    assert body["route"] == "primary" and body["prompt"] is None
+    assert body["answer"] == f"[Model {MODEL} via primary] Learn SQL."
+
+def test_device_plans_persist_next_to_profiles(tmp_path):
+    async def run():
+        store = SQLProfileRepository(f"sqlite+aiosqlite:///{tmp_path / 'devices.sqlite3'}")
+        try:
+            plan = await DeviceRegistry(capability_table, SQLDeviceRepository(store)).register("u1", 4096, 4)
+            # A fresh registry (as after a restart) reads the plan back from the database
+            loaded = await DeviceRegistry(capability_table, SQLDeviceRepository(store)).get("u1")
+            missing = await DeviceRegistry(capability_table, SQLDeviceRepository(store)).get("u2")
+        finally:
+            await store.aclose()
+        return plan, loaded, missing
+
+    plan, loaded, missing = asyncio.run(run())
+    assert loaded == plan and loaded.local_models == plan.local_models
+    assert missing is None
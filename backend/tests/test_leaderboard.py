@@ -0,0 +1,106 @@
+import asyncio
+import random
+from app.schemas.common import ProfileCreate, Skill
+from app.services.gamification import CHALLENGE_ATTEMPTED, CHAT_SESSION, GamificationEngine, SQLGameStatsRepository
+from app.services.leaderboard import Leaderboard
+from app.services.profile_store import SQLProfileRepository
+
+def reference_rank(points, user_id):
+    """Competition ranking by brute force: 1 + users with strictly more points."""
+    return 1 + sum(1 for p in points.values() if p > points[user_id])
+
+def reference_top(points, n):
+    return sorted(points.items(), key=lambda kv: (-kv[1], kv[0]))[:n]
+
+def test_ties_share_a_rank():
+    board = Leaderboard()
+    for uid, pts in [("a", 50), ("b", 80), ("c", 80), ("d", 10)]:
+        board.update(uid, pts)
+    assert [board.rank(u) for u in "bcad"] == [1, 1, 3, 4]
+    # Ties are listed by user_id
+    assert board.top(3) == [("b", 80), ("c", 80), ("a", 50)]
+    assert board.rank("missing") is None
+
+def test_updates_move_users_and_discard_removes_them():
+    board = Leaderboard()
+    board.update("a", 10)
+    board.update("b", 20)
+    board.update("a", 30)
+    assert (board.rank("a"), board.rank("b")) == (1, 2)
+    board.update("a", 30)  # unchanged points are a no-op
+    assert len(board) == 2
+    board.discard("a")
+    assert board.rank("a") is None and board.rank("b") == 1 and len(board) == 1
+    board.update("c", -5)  # negative points clamp to zero
+    assert board.points("c") == 0 and board.rank("c") == 2
+
+def test_grows_past_capacity():
+    board = Leaderboard(capacity=4)
+    board.update("a", 3)
+    board.update("b", 1000)
+    board.update("c", 5000)
+    assert [board.rank(u) for u in "cba"] == [1, 2, 3]
+    assert board.top(2) == [("c", 5000), ("b", 1000)]
+
+def test_matches_brute_force_under_random_updates():
+    rng = random.Random(12)
+    board, points = Leaderboard(capacity=8), {}
+    for _ in range(3000):
+        uid = f"u{rng.randrange(200)}"
+        if rng.random() < 0.05:
+            board.discard(uid)
+            points.pop(uid, None)
+        else:
+            pts = rng.choice([rng.randrange(50), rng.randrange(5000)])  # many ties at low values
+            board.update(uid, pts)
+            points[uid] = pts
+    assert len(board) == len(points)
+    for uid in points:
+        assert board.rank(uid) == reference_rank(points, uid)
+    for n in (1, 10, 57, 500):
+        assert board.top(n) == reference_top(points, n)
+
+def test_engine_top_and_rank_agree_on_ties():
+    engine = GamificationEngine()
+    for uid in ("x", "y", "z"):
+        engine.register_user(uid, degree="BTech", semester="5")
+    engine.emit("y", CHALLENGE_ATTEMPTED, {"correct": True, "score_delta": 10})
+    engine.emit("z", CHALLENGE_ATTEMPTED, {"correct": True, "score_delta": 10})
+    top = engine.top("degree:btech", 3)
+    assert [(r["user_id"], r["rank"]) for r in top] == [("y", 1), ("z", 1), ("x", 3)]
+    assert [engine.rank(u, "degree:btech") for u in ("y", "z", "x")] == [1, 1, 3]
+
+def test_engine_moves_user_between_cohorts():
+    engine = GamificationEngine()
+    engine.register_user("a", degree="BTech", semester="5")
+    engine.register_user("a", degree="BSc", semester="5")
+    assert engine.cohort_size("degree:btech") == 0
+    assert engine.cohort_size("degree:bsc") == 1
+    assert engine.cohort_size("semester:5") == 1 and engine.cohort_size("all") == 1
+
+def test_engine_rebuilds_from_store_after_restart(tmp_path):
+    async def run():
+        store = SQLProfileRepository(f"sqlite+aiosqlite:///{tmp_path / 'game.sqlite3'}")
+        try:
+            for uid, degree in (("a", "BTech"), ("b", "BSc")):
+                await store.create(ProfileCreate(user_id=uid, degree=degree))
+            await store.upsert_skills("a", [Skill(name="Python", score=50)])
+            before = GamificationEngine(repo=SQLGameStatsRepository(store))
+            await before.startup(store)
+            await before.record("b", CHALLENGE_ATTEMPTED, {"correct": True, "score_delta": 10})
+            await before.record("b", CHAT_SESSION)
+            # A new process (restart or another worker) starts from the database alone
+            after = GamificationEngine(repo=SQLGameStatsRepository(store))
+            await after.startup(store)
+        finally:
+            await store.aclose()
+        return before, after
+
+    before, after = asyncio.run(run())
+    assert after.top() == before.top() == [
+        {"rank": 1, "user_id": "a", "points": 500},
+        {"rank": 2, "user_id": "b", "points": 12},
+    ]
+    stats = after.stats["b"]
+    assert (stats.challenges_attempted, stats.challenges_correct, stats.chat_sessions) == (1, 1, 1)
+    assert stats.badges == ["challenge_start"] and after.cohort_size("degree:bsc") == 1
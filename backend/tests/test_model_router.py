@@ -0,0 +1,42 @@
+from app.core.config import get_settings
+from app.services.model_router import CLOSED, HALF_OPEN, OPEN, Backend, ModelRouter
+
+THRESHOLD = get_settings().model_server_failure_threshold
+
+def router():
+    return ModelRouter([Backend("primary", "http://primary", 4)])
+
+def test_one_failed_probe_keeps_backend_in_rotation():
+    r = router()
+    r.record_probe("primary", ok=False, latency=2.0, error="timeout")
+    backend = r.backends["primary"]
+    assert backend.state == CLOSED and backend.consecutive_failures == 1
+    assert r.candidates("llama3.2:1b") == [backend]
+
+def test_probe_failures_open_the_breaker_at_the_threshold():
+    r = router()
+    for _ in range(THRESHOLD):
+        r.record_probe("primary", ok=False, latency=2.0, error="timeout")
+    backend = r.backends["primary"]
+    assert backend.state == OPEN and r.candidates("llama3.2:1b") == []
+    # Probes don't count toward the request error rate
+    assert backend.error_rate == 0.0
+
+def test_probe_and_request_failures_share_the_count():
+    r = router()
+    backend = r.backends["primary"]
+    for _ in range(THRESHOLD - 1):
+        r.record_failure(backend)
+    r.record_probe("primary", ok=False, latency=2.0, error="timeout")
+    assert backend.state == OPEN
+
+def test_successful_probe_resets_and_half_opens():
+    r = router()
+    backend = r.backends["primary"]
+    r.record_probe("primary", ok=False, latency=2.0)
+    r.record_probe("primary", ok=True, latency=0.01)
+    assert backend.consecutive_failures == 0 and backend.state == CLOSED
+    for _ in range(THRESHOLD):
+        r.record_failure(backend)
+    r.record_probe("primary", ok=True, latency=0.01)
+    assert backend.state == HALF_OPEN
@@ -0,0 +1,63 @@
+import asyncio
+import json
+import httpx
+import pytest
+from app.services.model_router import CLOSED, model_router
+from app.services.ollama_client import GenerationError, OllamaClient, Served
+
+MODEL = "llama3.2:1b"
+
+def ndjson(*chunks) -> bytes:
+    return "".join(json.dumps(c) + "\n" for c in chunks).encode()
+
+def mock_client(handlers) -> OllamaClient:
+    """OllamaClient whose per-host pools answer from ``handlers`` (host -> NDJSON body)."""
+    client = OllamaClient()
+    client.coalesce = False
+    for host, body in handlers.items():
+        transport = httpx.MockTransport(lambda request, body=body: httpx.Response(200, content=body))
+        client._clients[host] = httpx.AsyncClient(base_url=host, transport=transport)
+    return client
+
+@pytest.fixture(autouse=True)
+def reset_router():
+    yield
+    for backend in model_router.backends.values():
+        backend.state, backend.consecutive_failures, backend.ewma_latency = CLOSED, 0, 0.0
+        backend.outcomes.clear()
+
+def test_error_line_raises():
+    host = model_router.backends["primary"].host
+    client = mock_client({host: ndjson({"response": "partial "}, {"error": "model requires more system memory"})})
+
+    async def run():
+        return [t async for t in client._stream_from(host, MODEL, "hi")]
+
+    with pytest.raises(GenerationError, match="more system memory"):
+        asyncio.run(run())
+
+def test_truncated_stream_raises():
+    host = model_router.backends["primary"].host
+    client = mock_client({host: ndjson({"response": "partial ", "done": False})})
+
+    async def run():
+        return [t async for t in client._stream_from(host, MODEL, "hi")]
+
+    with pytest.raises(GenerationError, match="before done"):
+        asyncio.run(run())
+
+def test_error_line_falls_back_and_counts_failure():
+    primary, localhost = model_router.backends["primary"], model_router.backends["localhost"]
+    client = mock_client({
+        primary.host: ndjson({"error": "model 'llama3.2:1b' not found"}),
+        localhost.host: ndjson({"response": "hello "}, {"response": "world", "done": True}),
+    })
+
+    async def run():
+        return [t async for t in client.stream(MODEL, "hi", route="primary")]
+
+    items = asyncio.run(run())
+    # Fallback is reported out of band, never in the answer text
+    assert items == [Served("localhost", fallback=True), "hello ", "world"]
+    assert primary.consecutive_failures == 1 and list(primary.outcomes) == [False]
+    assert list(localhost.outcomes) == [True]
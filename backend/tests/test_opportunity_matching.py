@@ -0,0 +1,43 @@
+import json
+from app.services.opportunity_matching import CatalogEntry, OpportunityIndex, OpportunityMatcher, _parse_required
+
+def entry(opp_id, title, **required):
+    return CatalogEntry(id=opp_id, title=title, required=required)
+
+def test_parse_required_weights():
+    assert _parse_required(["Python:2", "SQL", " Data Analysis :0.5"]) == {"python": 2.0, "sql": 1.0, "data analysis": 0.5}
+
+def test_ranks_by_weighted_coverage():
+    index = OpportunityIndex()
+    index.apply([entry("a", "Analyst", sql=1, excel=1), entry("b", "Dev", python=2, sql=1), entry("c", "Designer", figma=1)])
+    scores = index.score_batch([index.user_vector([("Python", 90), ("SQL", 60)])])[0]
+    ranked = [(index.entries[row].id, round(score, 2)) for row, score in index.top_k(scores, 3)]
+    assert ranked == [("b", 0.8), ("a", 0.3)]
+
+def test_duplicate_ids_in_one_batch_keep_the_last():
+    index = OpportunityIndex()
+    index.apply([entry("a", "Old", sql=1), entry("b", "Dev", python=1), entry("a", "New", python=1)])
+    assert len(index) == 2 and index.entries[index.row_of["a"]].title == "New"
+    scores = index.score_batch([index.user_vector([("SQL", 100)])])[0]
+    assert index.top_k(scores, 5) == []
+
+def test_replace_and_remove():
+    index = OpportunityIndex()
+    index.apply([entry("a", "Analyst", sql=1), entry("b", "Dev", python=1)])
+    index.apply([entry("a", "Analyst", python=1)], removed=["b"])
+    scores = index.score_batch([index.user_vector([("python", 100)])])[0]
+    assert [index.entries[row].id for row, _ in index.top_k(scores, 5)] == ["a"]
+    assert index.tombstones == 2
+
+def test_matcher_loads_catalog_with_duplicate_ids(tmp_path):
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps([
+        {"id": "x", "title": "First", "required_skills": ["SQL"]},
+        {"id": "x", "title": "Second", "required_skills": ["Python"]},
+    ]))
+    matcher = OpportunityMatcher(str(path))
+    matcher.refresh()
+    page, total = matcher.match_page([("Python", 80)], 0, 10)
+    assert total == 1 and [(e.title, score) for e, score in page] == [("Second", 80)]
+    # Reloading the unchanged file is a no-op
+    assert matcher.load_changes()[1:] == ([], [])
@@ -0,0 +1,60 @@
+import asyncio
+import io
+import uuid
+import pytest
+from httpx import AsyncClient
+from app.main import app
+from app.services.parse_pool import ParsePool, parse_pool
+from app.services.parsing import ResumeParser, UnreadableDocument, spool_to_disk
+
+RESUME = b"Experienced with Python and SQL, some Docker."
+
+@pytest.fixture(scope="module")
+def parser():
+    return ResumeParser()
+
+def test_plain_text_extracts(parser):
+    assert parser.extract_text(RESUME, "resume.txt") == RESUME.decode()
+
+@pytest.mark.parametrize("filename, content", [
+    ("resume.pdf", b"%PDF-1.4 this is not really a pdf"),
+    ("resume.docx", b"PK\x03\x04 truncated archive"),
+    ("resume.pdf", RESUME),  # mislabelled text
+])
+def test_broken_binary_formats_raise(parser, filename, content):
+    with pytest.raises(UnreadableDocument):
+        parser.extract_text(content, filename)
+
+def test_cache_key_includes_format(tmp_path):
+    async def run():
+        pool = ParsePool(workers=1, cache_entries=8)
+        try:
+            results = []
+            for filename in ("resume.txt", "resume.txt", "resume.pdf"):
+                doc = spool_to_disk(io.BytesIO(RESUME), 1 << 20)
+                try:
+                    results.append(await pool.parse(doc, filename))
+                except UnreadableDocument as e:
+                    results.append(e)
+            return pool.cache_hits, results
+        finally:
+            pool.shutdown()
+
+    hits, (first, again, as_pdf) = asyncio.run(run())
+    assert {s["name"] for s in first} >= {"Python", "SQL"} and again == first
+    # Same bytes named .pdf are not served the cached text parse
+    assert hits == 1 and isinstance(as_pdf, UnreadableDocument)
+
+def test_resume_route_rejects_unreadable_pdf():
+    async def run():
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            user_id = str(uuid.uuid4())
+            await ac.post("/api/v1/profile/create", json={"user_id": user_id, "name": "Parse"})
+            files = {"file": ("resume.pdf", b"%PDF-1.4 garbage", "application/pdf")}
+            return await ac.post("/api/v1/parse/resume", params={"user_id": user_id}, files=files)
+
+    try:
+        r = asyncio.run(run())
+    finally:
+        parse_pool.shutdown()
+    assert r.status_code == 422 and "PDF" in r.json()["detail"]
@@ -0,0 +1,58 @@
+import asyncio
+import os
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from app.schemas.common import CareerPath, Profile, ProfileCreate, Skill
+from app.services.profile_store import SQLProfileRepository
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def migrate(url: str):
+    config = Config(os.path.join(BACKEND, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND, "alembic"))
+    config.set_main_option("sqlalchemy.url", url)
+    command.upgrade(config, "head")
+
+def test_migrated_schema_round_trips_profiles(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'profiles.sqlite3'}"
+    migrate(url)
+
+    async def run():
+        store = SQLProfileRepository(url, auto_create=False)
+        changed = []
+        store.on_change(changed.append)
+        try:
+            engine = await store.engine()
+            async with engine.connect() as conn:
+                tables = set(await conn.run_sync(lambda c: inspect(c).get_table_names()))
+            created = await store.create(ProfileCreate(user_id="u1", name="Ana", degree="BTech", interests=["data"]))
+            await store.upsert_skills("u1", [Skill(name="Python", score=40), Skill(name="sql", score=55)])
+            # Case-insensitive upsert keeps the position; names come back canonical
+            await store.upsert_skills("u1", [Skill(name="python", score=70, evidence=["quiz:python-easy-1"])])
+            upserted = await store.get("u1")
+            missing = await store.upsert_skills("nobody", [Skill(name="Go", score=10)])
+            await store.restore(Profile(
+                user_id="u1", name="Ana B", degree="BTech", semester="6",
+                skills=[Skill(name="Docker", score=30), Skill(name="docker", score=35)],
+                career_paths=[CareerPath(name="Data Engineer", relevance=70)],
+            ))
+            restored = await store.get("u1")
+            listed = await store.list_profiles()
+        finally:
+            await store.aclose()
+        return tables, created, upserted, missing, restored, listed, changed
+
+    tables, created, upserted, missing, restored, listed, changed = asyncio.run(run())
+    assert {"profiles", "skills", "conversations", "devices", "game_stats", "challenge_attempts", "alembic_version"} <= tables
+    assert created.user_id == "u1" and created.skills == []
+    assert [(s.name, s.score) for s in upserted.skills] == [("Python", 70), ("SQL", 55)]
+    assert upserted.skills[0].evidence == ["quiz:python-easy-1"]
+    assert missing is None
+    assert (restored.name, restored.semester) == ("Ana B", "6")
+    # Duplicate names in a restored profile collapse to the last one
+    assert [(s.name, s.score) for s in restored.skills] == [("docker", 35)]
+    assert [p.name for p in restored.career_paths] == ["Data Engineer"]
+    assert [p.user_id for p in listed] == ["u1"] and listed[0].skills == restored.skills
+    # create, two upserts and the restore; the failed upsert does not notify
+    assert changed == ["u1"] * 4
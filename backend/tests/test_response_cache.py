@@ -0,0 +1,57 @@
+import asyncio
+from app.services.response_cache import MemoryCacheBackend, ResponseCache, SQLiteCacheBackend
+
+def test_sqlite_cache_exact_and_fuzzy_hits(tmp_path):
+    cache = ResponseCache(SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"), max_entries=10), ttl=60, fuzzy_threshold=95)
+
+    async def run():
+        await cache.put("m", "fp", "How do I learn SQL?", "Practice joins.")
+        return (
+            await cache.get("m", "fp", "how do i learn sql"),
+            await cache.get("m", "fp", "How do I learn SQLs?"),
+            await cache.get("m", "other", "How do I learn SQL?"),
+        )
+
+    exact, fuzzy, other_context = asyncio.run(run())
+    assert exact == "Practice joins."
+    assert fuzzy == "Practice joins."
+    assert other_context is None
+    assert (cache.hits, cache.fuzzy_hits, cache.misses) == (1, 1, 1)
+
+def test_sqlite_query_index_survives_restart_and_tracks_eviction(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = ResponseCache(SQLiteCacheBackend(path, max_entries=2), ttl=60)
+
+    async def fill():
+        for q in ("first question", "second question", "third question"):
+            await cache.put("m", "fp", q, q.upper())
+
+    asyncio.run(fill())
+    assert cache.evictions == 1 and len(cache.backend) == 2
+    assert sorted(cache.backend.index.queries("m", "fp")) == ["second question", "third question"]
+    reopened = SQLiteCacheBackend(path, max_entries=2)
+    assert sorted(reopened.index.queries("m", "fp")) == ["second question", "third question"]
+
+def test_expired_entry_leaves_the_fuzzy_index():
+    cache = ResponseCache(MemoryCacheBackend(10), ttl=-1, fuzzy_threshold=90)
+
+    async def run():
+        await cache.put("m", "fp", "what is docker", "Containers.")
+        return await cache.get("m", "fp", "what is docker")
+
+    assert asyncio.run(run()) is None
+    assert cache.backend.index.queries("m", "fp") == []
+
+def test_fuzzy_tier_needs_the_same_content_words():
+    cache = ResponseCache(MemoryCacheBackend(10), ttl=60, fuzzy_threshold=95)
+
+    async def run():
+        await cache.put("m", "fp", "What is the salary of a data scientist in india", "INR answer.")
+        return (
+            await cache.get("m", "fp", "What is the salary of a data scientist in usa"),
+            await cache.get("m", "fp", "What is the salary of data scientists in India?"),
+        )
+
+    other_country, rephrased = asyncio.run(run())
+    assert other_country is None
+    assert rephrased == "INR answer."
@@ -0,0 +1,135 @@
+import asyncio
+import pytest
+from app.services.single_flight import SingleFlight
+
+class Upstream:
+    """Fake generation: counts starts, emits tokens once ``release`` is set."""
+
+    def __init__(self, tokens=("a", "b", "c"), fail: bool = False):
+        self.tokens = tokens
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = 0
+        self.release = asyncio.Event()
+
+    async def stream(self):
+        self.calls += 1
+        try:
+            await self.release.wait()
+            for token in self.tokens:
+                yield token
+                await asyncio.sleep(0)
+            if self.fail:
+                raise RuntimeError("upstream failed")
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+async def collect(stream):
+    return [t async for t in stream]
+
+def test_identical_concurrent_calls_share_one_upstream():
+    async def run():
+        flights, up = SingleFlight(), Upstream()
+        tasks = [asyncio.create_task(collect(flights.stream("k", up.stream))) for _ in range(50)]
+        await asyncio.sleep(0)
+        up.release.set()
+        return flights, up, await asyncio.gather(*tasks)
+
+    flights, up, results = asyncio.run(run())
+    assert up.calls == 1
+    assert results == [["a", "b", "c"]] * 50
+    assert flights.stats() == {"in_flight": 0, "started": 1, "joined": 49}
+
+def test_distinct_keys_and_later_calls_start_new_flights():
+    async def run():
+        flights, up = SingleFlight(), Upstream()
+        up.release.set()
+        await asyncio.gather(*(collect(flights.stream(k, up.stream)) for k in ("x", "y", "x", "y")))
+        # The first flight has finished, so the same key goes upstream again
+        await collect(flights.stream("x", up.stream))
+        return up
+
+    assert asyncio.run(run()).calls == 3
+
+def test_late_joiner_replays_from_the_first_token():
+    async def run():
+        flights, up = SingleFlight(), Upstream()
+        first = flights.stream("k", up.stream)
+        up.release.set()
+        assert await anext(first) == "a"
+        late = await collect(flights.stream("k", up.stream))
+        return up, late, ["a"] + await collect(first)
+
+    up, late, leader = asyncio.run(run())
+    assert up.calls == 1
+    assert late == leader == ["a", "b", "c"]
+
+def test_upstream_error_reaches_every_subscriber():
+    async def run():
+        flights, up = SingleFlight(), Upstream(fail=True)
+        tasks = [asyncio.create_task(collect(flights.stream("k", up.stream))) for _ in range(3)]
+        await asyncio.sleep(0)
+        up.release.set()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+def test_last_subscriber_leaving_cancels_upstream():
+    async def run():
+        flights, up = SingleFlight(), Upstream()
+        tasks = [asyncio.create_task(collect(flights.stream("k", up.stream))) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        tasks[0].cancel()
+        await asyncio.sleep(0.01)
+        assert up.cancelled == 0  # one caller still waiting
+        tasks[1].cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.sleep(0.01)
+        assert up.cancelled == 1
+        # A new caller starts fresh instead of joining the abandoned flight
+        up.release.set()
+        return up, await collect(flights.stream("k", up.stream))
+
+    up, tokens = asyncio.run(run())
+    assert up.calls == 2 and tokens == ["a", "b", "c"]
+
+def test_subscriber_sees_tokens_in_order_under_interleaving():
+    async def run():
+        flights, up = SingleFlight(), Upstream(tokens=tuple(str(i) for i in range(100)))
+        tasks = []
+        for _ in range(10):
+            tasks.append(asyncio.create_task(collect(flights.stream("k", up.stream))))
+            await asyncio.sleep(0)
+            up.release.set()
+        return up, await asyncio.gather(*tasks)
+
+    up, results = asyncio.run(run())
+    assert up.calls == 1
+    assert all(r == [str(i) for i in range(100)] for r in results)
+
+@pytest.mark.parametrize("coalesce, expected_calls", [(True, 1), (False, 20)])
+def test_client_coalesces_identical_generations(coalesce, expected_calls):
+    from app.services.ollama_client import OllamaClient
+
+    async def run():
+        client = OllamaClient()
+        client.coalesce = coalesce
+        up = Upstream()
+        calls = []
+
+        async def routed(model, prompt, route=None, priority=None):
+            calls.append(prompt)
+            async for token in up.stream():
+                yield token
+
+        client._stream_routed = routed
+        tasks = [asyncio.create_task(client.generate("m", "same prompt")) for _ in range(20)]
+        await asyncio.sleep(0)
+        up.release.set()
+        return calls, await asyncio.gather(*tasks)
+
+    calls, answers = asyncio.run(run())
+    assert len(calls) == expected_calls
+    assert set(answers) == {"abc"}
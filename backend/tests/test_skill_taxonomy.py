@@ -0,0 +1,36 @@
+from app.services.skill_taxonomy import SkillMatcher
+
+matcher = SkillMatcher.from_file()
+
+def names(text):
+    return {m.name: m.count for m in matcher.scan(text)}
+
+def test_nested_terms_are_reported():
+    assert names("Deployed on Google Cloud") == {"GCP": 1, "Cloud": 1}
+    assert names("Built generative AI demos") == {"Generative AI": 1, "Artificial Intelligence": 1}
+    assert names("google cloud platform") == {"GCP": 1, "Cloud": 1}
+
+def test_span_counts_once_per_skill():
+    # "microsoft azure" contains the alias "azure"; one mention, one count
+    assert names("Microsoft Azure, then azure again") == {"Azure": 2}
+    assert names("python, Python3 and python") == {"Python": 3}
+
+def test_symbols_and_word_boundaries():
+    assert names("c++ and reactjs") == {"C++": 1, "React": 1}
+    assert names("javascripting pythonic aws-lambda") == {"AWS": 1}
+
+def test_positions_point_at_the_text():
+    text = "Skills: Google   Cloud"
+    [gcp, cloud] = matcher.scan(text)
+    assert [text.lower()[s:e] for s, e in gcp.positions] == ["google   cloud"]
+    assert [text.lower()[s:e] for s, e in cloud.positions] == ["cloud"]
+
+def test_dotted_names_do_not_count_as_javascript():
+    assert names("react.js and node.js") == {"React": 1}
+    assert names("JS, Python.") == {"JavaScript": 1, "Python": 1}
+
+def test_canonical_names_cover_the_old_title_case():
+    old = {"Sql": "SQL", "Ml": "Machine Learning", "Ai": "Artificial Intelligence", "Javascript": "JavaScript",
+           "Generative Ai": "Generative AI", "Gcp": "GCP", "Llm": "LLM", "Nlp": "NLP", "Aws": "AWS"}
+    assert {name: matcher.canonical(name) for name in old} == old
+    assert matcher.canonical("Kubernetes") == "Kubernetes"
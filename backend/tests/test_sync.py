@@ -0,0 +1,48 @@
+import asyncio
+import json
+import uuid
+import pytest
+from httpx import AsyncClient
+from app.main import app
+from app.services.gamification import gamification_engine
+
+async def new_user(ac, skills) -> str:
+    user_id = str(uuid.uuid4())
+    r = await ac.post("/api/v1/profile/create", json={"user_id": user_id, "name": "Sync", "degree": "BTech", "language": "en"})
+    assert r.status_code == 200
+    r = await ac.post("/api/v1/skills/upsert", json={"user_id": user_id, "skills": skills})
+    assert r.status_code == 200
+    return user_id
+
+@pytest.mark.parametrize("body", [
+    b"[1, 2]\n",
+    b'{"type": "chunk", "data": "x"}\n',
+    b'{"type": "chunk", "hash": 7, "data": "x"}\n',
+    b'{"type": "manifest", "version": 1, "chunks": "abc"}\n',
+    b'{"type": "manifest", "version": 1, "chunks": [["a"]]}\n',
+    b"not json\n",
+])
+def test_malformed_import_is_400(body):
+    async def run():
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            user_id = await new_user(ac, [{"name": "Python", "score": 80}])
+            return await ac.post(f"/api/v1/sync/{user_id}/import", content=body)
+
+    assert asyncio.run(run()).status_code == 400
+
+def test_import_rebuilds_gamification_state():
+    async def run():
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            user_id = await new_user(ac, [{"name": "Python", "score": 80}])
+            exported = await ac.post(f"/api/v1/sync/{user_id}/export", json={"have": []})
+            await ac.post("/api/v1/skills/upsert", json={"user_id": user_id, "skills": [{"name": "Go", "score": 20}]})
+            before = dict(gamification_engine.stats[user_id].skill_scores)
+            upload = "\n".join(line for line in exported.text.splitlines() if json.loads(line)["type"] != "done")
+            r = await ac.post(f"/api/v1/sync/{user_id}/import", content=upload.encode())
+            return user_id, before, r
+
+    user_id, before, r = asyncio.run(run())
+    assert r.status_code == 200, r.text
+    assert before == {"python": 80, "go": 20}
+    stats = gamification_engine.stats[user_id]
+    assert stats.skill_scores == {"python": 80} and stats.points == 800